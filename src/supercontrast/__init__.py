@@ -3,6 +3,7 @@ from supercontrast.metrics.metrics_enum import Metric
 from supercontrast.optimizer.optimizer_enum import Optimizer
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_factory import get_supported_tasks_for_provider
+from supercontrast.task.request_mode_enum import RequestMode
 from supercontrast.task.task_enum import Task
 from supercontrast.task.task_factory import get_supported_providers_for_task
 from supercontrast.task.task_handler import TaskHandler
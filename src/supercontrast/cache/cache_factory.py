@@ -0,0 +1,29 @@
+from typing import Optional
+
+from supercontrast.cache.cache_handler import CacheHandler
+from supercontrast.cache.handlers.disk import DiskCache
+from supercontrast.cache.handlers.memory import MemoryCache
+
+# Constants
+
+DEFAULT_CACHE_PATH = ".supercontrast_cache.db"
+
+
+def cache_factory(**config) -> Optional[CacheHandler]:
+    cache = config.get("cache")
+    if cache is None or isinstance(cache, CacheHandler):
+        return cache
+    elif cache == "memory":
+        return MemoryCache(
+            max_bytes=config.get("cache_max_bytes", 64 * 1024 * 1024),
+            ttl=config.get("cache_ttl"),
+        )
+    elif cache == "disk":
+        return DiskCache(
+            path=config.get("cache_path", DEFAULT_CACHE_PATH),
+            max_bytes=config.get("cache_max_bytes", 1024 * 1024 * 1024),
+            ttl=config.get("cache_ttl"),
+            read_only=config.get("cache_read_only", False),
+        )
+    else:
+        raise ValueError(f"Unsupported cache: {cache}")
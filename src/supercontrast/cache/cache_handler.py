@@ -0,0 +1,37 @@
+import threading
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class CacheHandler(ABC):
+    # byte-level response cache; keys are hex digests from get_cache_key and
+    # values are serialized response models
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stats_lock = threading.Lock()
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._get(key)
+        with self.stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+
+from pydantic import BaseModel
+from typing import Any, Dict, Optional, Type, Union
+
+from supercontrast.provider.provider_enum import Provider
+from supercontrast.task.task_enum import Task
+from supercontrast.task.types.document_reconstruction_types import (
+    DocumentReconstructionResponse,
+)
+from supercontrast.task.types.ocr_types import OCRResponse
+from supercontrast.task.types.sentiment_analysis_types import SentimentAnalysisResponse
+from supercontrast.task.types.transcription_types import TranscriptionResponse
+from supercontrast.task.types.translation_types import TranslationResponse
+from supercontrast.utils.http import get_shared_session
+
+# Constants
+
+RESPONSE_TYPES: Dict[Task, Type[BaseModel]] = {
+    Task.DOCUMENT_RECONSTRUCTION: DocumentReconstructionResponse,
+    Task.OCR: OCRResponse,
+    Task.SENTIMENT_ANALYSIS: SentimentAnalysisResponse,
+    Task.TRANSCRIPTION: TranscriptionResponse,
+    Task.TRANSLATION: TranslationResponse,
+}
+
+# request fields that point at input media; they are keyed by the hash of the
+# bytes they resolve to, so a moved file or a re-signed URL still hits
+MEDIA_FIELDS = ["image", "audio_file", "input_file"]
+
+
+def get_content_hash(media: Union[str, bytes]) -> str:
+    """
+    Hash the bytes behind a media reference.
+
+    Args:
+        media (Union[str, bytes]): A URL, a local file path, or raw bytes.
+
+    Returns:
+        str: The hex SHA-256 digest of the content.
+    """
+    digest = hashlib.sha256()
+    if isinstance(media, bytes):
+        digest.update(media)
+    elif media.startswith(("http://", "https://")):
+        response = get_shared_session().get(media)
+        response.raise_for_status()
+        digest.update(response.content)
+    elif os.path.isfile(media):
+        with open(media, "rb") as media_file:
+            for chunk in iter(lambda: media_file.read(1024 * 1024), b""):
+                digest.update(chunk)
+    else:
+        digest.update(media.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _hashable(value: Any) -> Any:
+    # raw bytes are replaced by their digest so images hash cheaply and the
+    # payload stays JSON serializable
+    if isinstance(value, bytes):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    elif isinstance(value, dict):
+        return {key: _hashable(item) for key, item in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [_hashable(item) for item in value]
+    return value
+
+
+def get_cache_key(
+    task: Task,
+    provider: Optional[Provider],
+    params: Dict[str, Any],
+    body: BaseModel,
+    content_hash: bool = True,
+) -> str:
+    """
+    Build a stable cache key for a request.
+
+    Args:
+        task (Task): The task of the request.
+        provider (Optional[Provider]): The provider the request is sent to, if fixed.
+        params (Dict[str, Any]): The handler settings that affect the output.
+        body (BaseModel): The request body.
+        content_hash (bool): Key media fields on their content instead of their location.
+
+    Returns:
+        str: The hex SHA-256 digest of the request.
+    """
+    fields = body.model_dump()
+    if content_hash:
+        for field in MEDIA_FIELDS:
+            if isinstance(fields.get(field), (str, bytes)):
+                fields[field] = {"sha256": get_content_hash(fields[field])}
+
+    payload = {
+        "task": task.value,
+        "provider": provider.value if provider is not None else None,
+        "params": params,
+        "body": _hashable(fields),
+    }
+    serialized = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def serialize_response(response: BaseModel) -> bytes:
+    return response.model_dump_json().encode("utf-8")
+
+
+def deserialize_response(task: Task, value: bytes) -> BaseModel:
+    return RESPONSE_TYPES[task].model_validate_json(value)
@@ -0,0 +1,116 @@
+import sqlite3
+import threading
+import time
+import zlib
+
+from typing import Optional
+
+from supercontrast.cache.cache_handler import CacheHandler
+
+
+class DiskCache(CacheHandler):
+    # SQLite file of zlib-compressed responses shared by every process on the
+    # host; least recently used entries are evicted past max_bytes, and a
+    # read-only cache serves hits without ever writing to the file
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 1024 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        read_only: bool = False,
+        compression_level: int = 6,
+        timeout: float = 30.0,
+    ):
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.read_only = read_only
+        self.compression_level = compression_level
+        self.lock = threading.Lock()
+
+        if read_only:
+            self.connection = sqlite3.connect(
+                f"file:{path}?mode=ro",
+                uri=True,
+                timeout=timeout,
+                check_same_thread=False,
+            )
+        else:
+            self.connection = sqlite3.connect(
+                path, timeout=timeout, check_same_thread=False, isolation_level=None
+            )
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "accessed_at REAL NOT NULL, expires_at REAL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+            )
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            now = time.time()
+            if expires_at is not None and now >= expires_at:
+                if not self.read_only:
+                    self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            if not self.read_only:
+                self.connection.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+        return zlib.decompress(value)
+
+    def set(self, key: str, value: bytes) -> None:
+        if self.read_only:
+            return
+
+        compressed = zlib.compress(value, self.compression_level)
+        if len(compressed) > self.max_bytes:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, value, size, accessed_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), now, expires_at),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        (size,) = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        while size > self.max_bytes:
+            rows = self.connection.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            evicted = []
+            for key, entry_size in rows:
+                if size <= self.max_bytes:
+                    break
+                evicted.append((key,))
+                size -= entry_size
+            self.connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def clear(self) -> None:
+        if self.read_only:
+            raise ValueError("Cannot clear a read-only cache")
+        with self.lock:
+            self.connection.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
@@ -19,8 +19,38 @@ class SuperContrastClient:
             task, providers, optimizer, **config
         )
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def close(self, *args, **kwargs):
+        return self.task_handler.close(*args, **kwargs)
+
+    async def aclose(self, *args, **kwargs):
+        return await self.task_handler.aclose(*args, **kwargs)
+
     def request(self, *args, **kwargs):
         return self.task_handler.request(*args, **kwargs)
 
+    def batch_request(self, *args, **kwargs):
+        return self.task_handler.batch_request(*args, **kwargs)
+
+    def request_many(self, *args, **kwargs):
+        return self.task_handler.request_many(*args, **kwargs)
+
     def evaluate(self, *args, **kwargs):
         return self.task_handler.evaluate(*args, **kwargs)
+
+    async def arequest(self, *args, **kwargs):
+        return await self.task_handler.arequest(*args, **kwargs)
+
+    async def aevaluate(self, *args, **kwargs):
+        return await self.task_handler.aevaluate(*args, **kwargs)
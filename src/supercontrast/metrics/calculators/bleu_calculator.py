@@ -1,11 +1,10 @@
-import nltk
-
 from nltk.tokenize import word_tokenize
 from nltk.translate.bleu_score import sentence_bleu as nltk_sentence_bleu
 from sacrebleu import sentence_bleu
 
 from supercontrast.metrics.metrics_calculator import MetricsCalculator
 from supercontrast.metrics.metrics_enum import Metric
+from supercontrast.metrics.nltk_resources import ensure_nltk_resources
 
 
 class BLEUCalculator(MetricsCalculator[str, float]):
@@ -22,7 +21,7 @@ class BLEUCalculator(MetricsCalculator[str, float]):
 class BLEUNLTKCalculator(MetricsCalculator[str, float]):
     def __init__(self, *args, **kwargs):
         super().__init__(Metric.BLEU_NLTK, *args, **kwargs)
-        nltk.download("punkt", quiet=True)
+        ensure_nltk_resources("punkt", "punkt_tab")
 
     def calculate(self, reference: str, hypothesis: str) -> float:
         reference_tokens = word_tokenize(reference)
@@ -1,17 +1,15 @@
-import nltk
-
 from nltk.tokenize import word_tokenize
 from nltk.translate.meteor_score import single_meteor_score
 
 from supercontrast.metrics.metrics_calculator import MetricsCalculator
 from supercontrast.metrics.metrics_enum import Metric
+from supercontrast.metrics.nltk_resources import ensure_nltk_resources
 
 
 class METEORCalculator(MetricsCalculator[str, float]):
     def __init__(self, *args, **kwargs):
         super().__init__(Metric.METEOR, *args, **kwargs)
-        nltk.download("punkt", quiet=True)
-        nltk.download("wordnet", quiet=True)
+        ensure_nltk_resources("punkt", "punkt_tab", "wordnet")
 
     def calculate(self, reference: str, hypothesis: str) -> float:
         reference_tokens = word_tokenize(reference)
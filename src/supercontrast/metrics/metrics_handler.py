@@ -1,22 +1,9 @@
+import importlib
+import threading
+
 from abc import ABC, abstractmethod
-from typing import Any, Dict
-
-from supercontrast.metrics.calculators.bleu_calculator import (
-    BLEUCalculator,
-    BLEUNLTKCalculator,
-)
-from supercontrast.metrics.calculators.character_calculator import (
-    CharacterErrorRateCalculator,
-)
-from supercontrast.metrics.calculators.chrf_calculator import CHRFCalculator
-from supercontrast.metrics.calculators.meteor_calculator import METEORCalculator
-from supercontrast.metrics.calculators.word_calculator import (
-    MatchErrorRateCalculator,
-    WordErrorRateCalculator,
-    WordInformationLostCalculator,
-    WordInformationPreservedCalculator,
-    WordRecognitionRateCalculator,
-)
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
 from supercontrast.metrics.metrics_calculator import MetricsCalculator
 from supercontrast.metrics.metrics_enum import Metric
 from supercontrast.metrics.metrics_response import MetricsResponse
@@ -25,126 +12,146 @@ from supercontrast.task.types.transcription_types import TranscriptionResponse
 from supercontrast.task.types.translation_types import TranslationResponse
 from supercontrast.utils.text import normalize_text
 
+# Constants
+
+# module and class of every calculator, imported the first time it is needed
+METRIC_CALCULATORS: Dict[Metric, Tuple[str, str]] = {
+    Metric.BLEU: ("bleu_calculator", "BLEUCalculator"),
+    Metric.BLEU_NLTK: ("bleu_calculator", "BLEUNLTKCalculator"),
+    Metric.CER: ("character_calculator", "CharacterErrorRateCalculator"),
+    Metric.WER: ("word_calculator", "WordErrorRateCalculator"),
+    Metric.MER: ("word_calculator", "MatchErrorRateCalculator"),
+    Metric.WIL: ("word_calculator", "WordInformationLostCalculator"),
+    Metric.WIP: ("word_calculator", "WordInformationPreservedCalculator"),
+    Metric.WRR: ("word_calculator", "WordRecognitionRateCalculator"),
+    Metric.METEOR: ("meteor_calculator", "METEORCalculator"),
+    Metric.CHRF: ("chrf_calculator", "CHRFCalculator"),
+}
+
+CALCULATORS_PACKAGE = "supercontrast.metrics.calculators"
+
 # get metrics calculator
 
 
 def get_metrics_calculator(metric: Metric, **config) -> MetricsCalculator:
-    if metric == Metric.BLEU:
-        return BLEUCalculator(**config)
-    elif metric == Metric.BLEU_NLTK:
-        return BLEUNLTKCalculator(**config)
-    elif metric == Metric.CER:
-        return CharacterErrorRateCalculator(**config)
-    elif metric == Metric.WER:
-        return WordErrorRateCalculator(**config)
-    elif metric == Metric.MER:
-        return MatchErrorRateCalculator(**config)
-    elif metric == Metric.WIL:
-        return WordInformationLostCalculator(**config)
-    elif metric == Metric.WIP:
-        return WordInformationPreservedCalculator(**config)
-    elif metric == Metric.WRR:
-        return WordRecognitionRateCalculator(**config)
-    elif metric == Metric.METEOR:
-        return METEORCalculator(**config)
-    elif metric == Metric.CHRF:
-        return CHRFCalculator(**config)
-    else:
+    if metric not in METRIC_CALCULATORS:
         raise ValueError(f"Unsupported metric: {metric}")
 
+    module_name, class_name = METRIC_CALCULATORS[metric]
+    module = importlib.import_module(f"{CALCULATORS_PACKAGE}.{module_name}")
+    return getattr(module, class_name)(**config)
+
 
 # metrics handler
 
 
 class MetricsHandler(ABC):
+    # metrics calculated when the caller does not select any
+    supported_metrics: List[Metric] = []
+
     def __init__(self):
-        self.metrics_calculators = self.get_metrics_calculators()
+        # calculators are built on first use, some load models or NLTK data
+        self.metrics_calculators: Dict[Metric, MetricsCalculator] = {}
+        self._calculators_lock = threading.Lock()
+
+    def get_metrics_calculator(self, metric: Metric) -> MetricsCalculator:
+        with self._calculators_lock:
+            if metric not in self.metrics_calculators:
+                self.metrics_calculators[metric] = get_metrics_calculator(metric)
+            return self.metrics_calculators[metric]
+
+    def get_selected_metrics(
+        self, metrics: Optional[Iterable[Metric]] = None
+    ) -> List[Metric]:
+        if metrics is None:
+            return self.supported_metrics
+        selected = [Metric(metric) for metric in metrics]
+        unsupported = [
+            metric for metric in selected if metric not in self.supported_metrics
+        ]
+        if unsupported:
+            raise ValueError(
+                f"Unsupported metrics for {type(self).__name__}: {unsupported}"
+            )
+        return selected
 
-    @abstractmethod
-    def get_metrics_calculators(self) -> Dict[Metric, MetricsCalculator]:
-        pass
+    def _calculate(
+        self,
+        normalized_reference: Any,
+        normalized_prediction: Any,
+        metrics: Optional[Iterable[Metric]] = None,
+    ) -> MetricsResponse:
+        results: Dict[Metric, Any] = {}
+        for metric in self.get_selected_metrics(metrics):
+            results[metric] = self.get_metrics_calculator(metric).calculate(
+                normalized_reference, normalized_prediction
+            )
+        return MetricsResponse(
+            metrics=results,
+            normalized_reference=normalized_reference,
+            normalized_prediction=normalized_prediction,
+        )
 
     @abstractmethod
-    def calculate_metrics(self, reference: Any, prediction: Any) -> MetricsResponse:
+    def calculate_metrics(
+        self,
+        reference: Any,
+        prediction: Any,
+        metrics: Optional[Iterable[Metric]] = None,
+    ) -> MetricsResponse:
         pass
 
 
 class OCRMetricsHandler(MetricsHandler):
-    def get_metrics_calculators(self) -> Dict[Metric, MetricsCalculator]:
-        return {
-            Metric.CER: CharacterErrorRateCalculator(),
-            Metric.WER: WordErrorRateCalculator(),
-        }
+    supported_metrics = [Metric.CER, Metric.WER]
 
     def calculate_metrics(
-        self, reference: OCRResponse, prediction: OCRResponse
+        self,
+        reference: OCRResponse,
+        prediction: OCRResponse,
+        metrics: Optional[Iterable[Metric]] = None,
     ) -> MetricsResponse:
-        normalized_reference = normalize_text(reference.all_text, "ocr")
-        normalized_prediction = normalize_text(prediction.all_text, "ocr")
-
-        metrics: Dict[Metric, Any] = {}
-        for metric, calculator in self.metrics_calculators.items():
-            metrics[metric] = calculator.calculate(
-                normalized_reference, normalized_prediction
-            )
-        return MetricsResponse(
-            metrics=metrics,
-            normalized_reference=normalized_reference,
-            normalized_prediction=normalized_prediction,
+        return self._calculate(
+            normalize_text(reference.all_text, "ocr"),
+            normalize_text(prediction.all_text, "ocr"),
+            metrics,
         )
 
 
 class TranscriptionMetricsHandler(MetricsHandler):
-    def get_metrics_calculators(self) -> Dict[Metric, MetricsCalculator]:
-        return {
-            Metric.WER: WordErrorRateCalculator(),
-            Metric.MER: MatchErrorRateCalculator(),
-            Metric.WIL: WordInformationLostCalculator(),
-            Metric.CER: CharacterErrorRateCalculator(),
-            Metric.WIP: WordInformationPreservedCalculator(),
-            Metric.WRR: WordRecognitionRateCalculator(),
-        }
+    supported_metrics = [
+        Metric.WER,
+        Metric.MER,
+        Metric.WIL,
+        Metric.CER,
+        Metric.WIP,
+        Metric.WRR,
+    ]
 
     def calculate_metrics(
-        self, reference: TranscriptionResponse, prediction: TranscriptionResponse
+        self,
+        reference: TranscriptionResponse,
+        prediction: TranscriptionResponse,
+        metrics: Optional[Iterable[Metric]] = None,
     ) -> MetricsResponse:
-        normalized_reference = normalize_text(reference.text, "transcription")
-        normalized_prediction = normalize_text(prediction.text, "transcription")
-
-        metrics = {}
-        for metric, calculator in self.metrics_calculators.items():
-            metrics[metric] = calculator.calculate(
-                normalized_reference, normalized_prediction
-            )
-        return MetricsResponse(
-            metrics=metrics,
-            normalized_reference=normalized_reference,
-            normalized_prediction=normalized_prediction,
+        return self._calculate(
+            normalize_text(reference.text, "transcription"),
+            normalize_text(prediction.text, "transcription"),
+            metrics,
         )
 
 
 class TranslationMetricsHandler(MetricsHandler):
-    def get_metrics_calculators(self) -> Dict[Metric, MetricsCalculator]:
-        return {
-            Metric.BLEU: BLEUCalculator(),
-            Metric.BLEU_NLTK: BLEUNLTKCalculator(),
-            Metric.METEOR: METEORCalculator(),
-            Metric.CHRF: CHRFCalculator(),
-        }
+    supported_metrics = [Metric.BLEU, Metric.BLEU_NLTK, Metric.METEOR, Metric.CHRF]
 
     def calculate_metrics(
-        self, reference: TranslationResponse, prediction: TranslationResponse
+        self,
+        reference: TranslationResponse,
+        prediction: TranslationResponse,
+        metrics: Optional[Iterable[Metric]] = None,
     ) -> MetricsResponse:
-        normalized_reference = normalize_text(reference.text, "translation")
-        normalized_prediction = normalize_text(prediction.text, "translation")
-
-        metrics = {}
-        for metric, calculator in self.metrics_calculators.items():
-            metrics[metric] = calculator.calculate(
-                normalized_reference, normalized_prediction
-            )
-        return MetricsResponse(
-            metrics=metrics,
-            normalized_reference=normalized_reference,
-            normalized_prediction=normalized_prediction,
+        return self._calculate(
+            normalize_text(reference.text, "translation"),
+            normalize_text(prediction.text, "translation"),
+            metrics,
         )
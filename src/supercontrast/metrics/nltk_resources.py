@@ -0,0 +1,58 @@
+import sys
+import threading
+
+from typing import Dict, Iterable, Optional, Set
+
+# Constants
+
+# nltk data used by the metric calculators, by download id and nltk_data path
+NLTK_RESOURCES: Dict[str, str] = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "wordnet": "corpora/wordnet",
+}
+
+_available: Set[str] = set()
+_lock = threading.Lock()
+
+
+def ensure_nltk_resources(*names: str) -> None:
+    # resources are looked up locally first and only downloaded when missing,
+    # once per process
+    import nltk
+
+    with _lock:
+        for name in names:
+            if name in _available:
+                continue
+            if name not in NLTK_RESOURCES:
+                raise ValueError(f"Unsupported NLTK resource: {name}")
+            try:
+                nltk.data.find(NLTK_RESOURCES[name])
+            except LookupError:
+                if not nltk.download(name, quiet=True):
+                    raise RuntimeError(f"Failed to download NLTK resource: {name}")
+            _available.add(name)
+
+
+def download_nltk_resources(
+    download_dir: Optional[str] = None, names: Optional[Iterable[str]] = None
+) -> None:
+    """
+    Download the NLTK resources ahead of time, e.g. while building an image, so
+    the metric calculators never touch the network.
+
+    Args:
+        download_dir (Optional[str]): The nltk_data directory, NLTK's default if None.
+        names (Optional[Iterable[str]]): The resources to download, all if None.
+    """
+    import nltk
+
+    for name in names or NLTK_RESOURCES:
+        if not nltk.download(name, download_dir=download_dir, quiet=True):
+            raise RuntimeError(f"Failed to download NLTK resource: {name}")
+
+
+if __name__ == "__main__":
+    # python -m supercontrast.metrics.nltk_resources [download_dir]
+    download_nltk_resources(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,108 @@
+import threading
+import time
+
+from enum import Enum
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    # opens after failure_threshold consecutive errors or timeouts, rejects calls
+    # for recovery_timeout seconds, then lets half_open_max_calls probes through;
+    # a successful probe closes it again and a failed one reopens it; a probe
+    # with no outcome after probe_timeout seconds counts as failed, so a lost
+    # probe cannot keep the breaker half-open forever
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        probe_timeout: float = 60.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.probe_timeout = probe_timeout
+        self._state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.probe_started_at = 0.0
+        self.lock = threading.Lock()
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        self.half_open_calls = 0
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if (
+            self._state == CircuitState.HALF_OPEN
+            and self.half_open_calls > 0
+            and now - self.probe_started_at >= self.probe_timeout
+        ):
+            self._open()
+        elif (
+            self._state == CircuitState.OPEN
+            and now - self.opened_at >= self.recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self.half_open_calls = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self.lock:
+            self._refresh()
+            return self._state
+
+    def is_available(self) -> bool:
+        with self.lock:
+            self._refresh()
+            if self._state == CircuitState.HALF_OPEN:
+                return self.half_open_calls < self.half_open_max_calls
+            return self._state == CircuitState.CLOSED
+
+    def acquire(self) -> bool:
+        # reserve a call, counting it against the probe limit while half-open
+        with self.lock:
+            self._refresh()
+            if self._state == CircuitState.CLOSED:
+                return True
+            if (
+                self._state == CircuitState.HALF_OPEN
+                and self.half_open_calls < self.half_open_max_calls
+            ):
+                self.half_open_calls += 1
+                self.probe_started_at = time.monotonic()
+                return True
+            return False
+
+    def release(self) -> None:
+        # give back a probe slot for a call that ended without an outcome
+        with self.lock:
+            if self._state == CircuitState.HALF_OPEN and self.half_open_calls > 0:
+                self.half_open_calls -= 1
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.consecutive_failures = 0
+            self._state = CircuitState.CLOSED
+            self.half_open_calls = 0
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.consecutive_failures += 1
+            if (
+                self._state == CircuitState.HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self._open()
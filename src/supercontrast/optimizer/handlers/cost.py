@@ -0,0 +1,47 @@
+import math
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from supercontrast.optimizer.optimizer_handler import OptimizerHandler
+from supercontrast.optimizer.pricing import ProviderPricing, estimate_cost
+from supercontrast.provider.provider_enum import Provider
+from supercontrast.task.task_enum import Task
+
+
+class OptimizerCostHandler(OptimizerHandler):
+    # routes to the cheapest provider for the body, optionally restricted to
+    # providers whose EWMA latency is within max_latency seconds
+    def __init__(
+        self,
+        task: Task,
+        providers: List[Provider],
+        max_latency: Optional[float] = None,
+        pricing: Optional[Dict[Tuple[Provider, Task], ProviderPricing]] = None,
+    ):
+        super().__init__(task, providers)
+        self.max_latency = max_latency
+        self.pricing = pricing
+
+    def get_provider(self, body: Any = None) -> Provider:
+        if not self.providers:
+            raise ValueError("No providers available")
+        return self.rank_providers(body)[0]
+
+    def rank_providers(self, body: Any = None) -> List[Provider]:
+        def sort_key(provider: Provider) -> Tuple[bool, float]:
+            cost = estimate_cost(self.task, provider, body, self.pricing)
+            return (
+                not self.meets_latency_ceiling(provider),
+                cost if cost is not None else math.inf,
+            )
+
+        return sorted(self.providers, key=sort_key)
+
+    def meets_latency_ceiling(self, provider: Provider) -> bool:
+        # providers without a latency estimate yet are given the benefit of the doubt
+        ewma_latency = self.stats[provider].ewma_latency
+        return (
+            self.max_latency is None
+            or ewma_latency is None
+            or ewma_latency <= self.max_latency
+        )
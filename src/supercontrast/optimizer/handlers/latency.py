@@ -0,0 +1,39 @@
+import math
+import random
+
+from typing import Any, List
+
+from supercontrast.optimizer.optimizer_handler import OptimizerHandler
+from supercontrast.provider.provider_enum import Provider
+from supercontrast.task.task_enum import Task
+
+
+class OptimizerLatencyHandler(OptimizerHandler):
+    # epsilon-greedy over the EWMA latency of each provider: untried providers
+    # are sampled first, then the fastest one is picked except for an occasional
+    # random pick that keeps the other estimates fresh
+    def __init__(
+        self, task: Task, providers: List[Provider], exploration_rate: float = 0.05
+    ):
+        super().__init__(task, providers)
+        self.exploration_rate = exploration_rate
+
+    def get_provider(self, body: Any = None) -> Provider:
+        if not self.providers:
+            raise ValueError("No providers available")
+
+        for provider in self.providers:
+            if self.stats[provider].requests == 0:
+                return provider
+
+        if random.random() < self.exploration_rate:
+            return random.choice(self.providers)
+
+        return self.rank_providers()[0]
+
+    def rank_providers(self, body: Any = None) -> List[Provider]:
+        def expected_latency(provider: Provider) -> float:
+            ewma_latency = self.stats[provider].ewma_latency
+            return ewma_latency if ewma_latency is not None else math.inf
+
+        return sorted(self.providers, key=expected_latency)
@@ -0,0 +1,72 @@
+import math
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from supercontrast.optimizer.optimizer_handler import OptimizerHandler
+from supercontrast.optimizer.pricing import ProviderPricing, estimate_cost
+from supercontrast.optimizer.quality import QUALITY_METRICS
+from supercontrast.provider.provider_enum import Provider
+from supercontrast.task.task_enum import Task
+
+
+class OptimizerQualityHandler(OptimizerHandler):
+    # UCB1 over the quality observed on requests sent with a reference: the
+    # reward is the mean quality minus optional cost and latency penalties, so
+    # the weights turn it into quality per dollar or per second
+    def __init__(
+        self,
+        task: Task,
+        providers: List[Provider],
+        exploration: float = 0.5,
+        cost_weight: float = 0.0,
+        latency_weight: float = 0.0,
+        pricing: Optional[Dict[Tuple[Provider, Task], ProviderPricing]] = None,
+    ):
+        # without a quality metric no samples ever arrive and UCB1 would keep
+        # sending everything to the first provider
+        if task not in QUALITY_METRICS:
+            raise ValueError(f"Task {task} has no quality metric to optimize")
+        super().__init__(task, providers)
+        self.exploration = exploration
+        self.cost_weight = cost_weight
+        self.latency_weight = latency_weight
+        self.pricing = pricing
+
+    def get_provider(self, body: Any = None) -> Provider:
+        if not self.providers:
+            raise ValueError("No providers available")
+
+        for provider in self.providers:
+            if self.stats[provider].quality_samples == 0:
+                return provider
+
+        total_samples = sum(
+            self.stats[provider].quality_samples for provider in self.providers
+        )
+
+        def upper_confidence_bound(provider: Provider) -> float:
+            samples = self.stats[provider].quality_samples
+            bonus = self.exploration * math.sqrt(2 * math.log(total_samples) / samples)
+            return self.expected_reward(provider, body) + bonus
+
+        return max(self.providers, key=upper_confidence_bound)
+
+    def rank_providers(self, body: Any = None) -> List[Provider]:
+        return sorted(
+            self.providers,
+            key=lambda provider: self.expected_reward(provider, body),
+            reverse=True,
+        )
+
+    def expected_reward(self, provider: Provider, body: Any = None) -> float:
+        stats = self.stats[provider]
+        if stats.mean_quality is None:
+            return -math.inf
+
+        reward = stats.mean_quality
+        if self.cost_weight:
+            cost = estimate_cost(self.task, provider, body, self.pricing)
+            reward -= self.cost_weight * (cost or 0.0)
+        if self.latency_weight and stats.ewma_latency is not None:
+            reward -= self.latency_weight * stats.ewma_latency
+        return reward
@@ -4,3 +4,4 @@ from enum import Enum
 class Optimizer(Enum):
     LATENCY = "latency"
     COST = "cost"
+    QUALITY = "quality"
@@ -1,22 +1,77 @@
 from typing import List, Optional
 
+from supercontrast.optimizer.handlers.cost import OptimizerCostHandler
+from supercontrast.optimizer.handlers.latency import OptimizerLatencyHandler
 from supercontrast.optimizer.handlers.mock import OptimizerMockHandler
+from supercontrast.optimizer.handlers.quality import OptimizerQualityHandler
 from supercontrast.optimizer.optimizer_enum import Optimizer
 from supercontrast.optimizer.optimizer_handler import OptimizerHandler
+from supercontrast.optimizer.state_store import SQLiteStateStore, StateStore
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.task.task_enum import Task
 
 
+def state_store_factory(**config) -> Optional[StateStore]:
+    if config.get("optimizer_state_store") is not None:
+        return config["optimizer_state_store"]
+    elif config.get("optimizer_state_path") is not None:
+        return SQLiteStateStore(config["optimizer_state_path"])
+    else:
+        return None
+
+
 def optimizer_factory(
     task: Task,
     providers: List[Provider],
     optimizer: Optional[Optimizer] = None,
+    **config,
+) -> OptimizerHandler:
+    optimizer_handler = create_optimizer_handler(task, providers, optimizer, **config)
+    optimizer_handler.configure_circuit_breakers(
+        failure_threshold=config.get("circuit_failure_threshold", 5),
+        recovery_timeout=config.get("circuit_recovery_timeout", 30.0),
+        probe_timeout=config.get("circuit_probe_timeout", 60.0),
+    )
+
+    state_store = state_store_factory(**config)
+    if state_store is not None:
+        optimizer_handler.attach_state_store(
+            state_store,
+            flush_interval=config.get("optimizer_flush_interval", 30.0),
+            # a store passed in may be shared with other handlers
+            owned=config.get("optimizer_state_store") is None,
+        )
+
+    return optimizer_handler
+
+
+def create_optimizer_handler(
+    task: Task,
+    providers: List[Provider],
+    optimizer: Optional[Optimizer] = None,
+    **config,
 ) -> OptimizerHandler:
     if optimizer is None:
         return OptimizerMockHandler(task, providers)
     elif optimizer == Optimizer.LATENCY:
-        return OptimizerMockHandler(task, providers)
+        return OptimizerLatencyHandler(
+            task, providers, exploration_rate=config.get("exploration_rate", 0.05)
+        )
     elif optimizer == Optimizer.COST:
-        return OptimizerMockHandler(task, providers)
+        return OptimizerCostHandler(
+            task,
+            providers,
+            max_latency=config.get("max_latency"),
+            pricing=config.get("pricing"),
+        )
+    elif optimizer == Optimizer.QUALITY:
+        return OptimizerQualityHandler(
+            task,
+            providers,
+            exploration=config.get("quality_exploration", 0.5),
+            cost_weight=config.get("cost_weight", 0.0),
+            latency_weight=config.get("latency_weight", 0.0),
+            pricing=config.get("pricing"),
+        )
     else:
         raise ValueError(f"Unsupported optimizer: {optimizer}")
@@ -1,7 +1,13 @@
+import threading
+import time
+
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Dict, List, Optional
 
+from supercontrast.optimizer.circuit_breaker import CircuitBreaker
 from supercontrast.optimizer.optimizer_enum import Optimizer
+from supercontrast.optimizer.provider_stats import ProviderStats
+from supercontrast.optimizer.state_store import StateStore
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.task.task_enum import Task
 
@@ -10,7 +16,133 @@ class OptimizerHandler(ABC):
     def __init__(self, task: Task, providers: List[Provider]):
         self.task = task
         self.providers = providers
+        self.stats: Dict[Provider, ProviderStats] = {
+            provider: ProviderStats() for provider in providers
+        }
+        self.breakers: Dict[Provider, CircuitBreaker] = {
+            provider: CircuitBreaker() for provider in providers
+        }
+        self.state_store: Optional[StateStore] = None
+        self.owns_state_store = False
+        self.flush_interval = 30.0
+        self._last_flush = time.monotonic()
+        self._flush_lock = threading.Lock()
+        self._flush_thread: Optional[threading.Thread] = None
 
     @abstractmethod
-    def get_provider(self) -> Provider:
+    def get_provider(self, body: Any = None) -> Provider:
         pass
+
+    def rank_providers(self, body: Any = None) -> List[Provider]:
+        # best provider first, followed by the remaining ones in configured order
+        best = self.get_provider(body)
+        return [best] + [provider for provider in self.providers if provider != best]
+
+    def select_providers(self, body: Any = None) -> List[Provider]:
+        # failover order: the optimizer's pick, then its ranking, with providers
+        # whose circuit breaker is open moved to the back
+        primary = self.get_provider(body)
+        ordered = [primary] + [
+            provider for provider in self.rank_providers(body) if provider != primary
+        ]
+        return sorted(ordered, key=lambda provider: not self.is_available(provider))
+
+    def record_success(
+        self, provider: Provider, latency: Optional[float] = None
+    ) -> None:
+        if provider in self.stats:
+            self.stats[provider].record_success(latency)
+            self.breakers[provider].record_success()
+            self._maybe_flush()
+
+    def record_error(self, provider: Provider) -> None:
+        if provider in self.stats:
+            self.stats[provider].record_error()
+            self.breakers[provider].record_failure()
+            self._maybe_flush()
+
+    def record_quality(self, provider: Provider, quality: Optional[float]) -> None:
+        if provider in self.stats and quality is not None:
+            self.stats[provider].record_quality(quality)
+            self._maybe_flush()
+
+    # circuit breakers
+
+    def configure_circuit_breakers(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        probe_timeout: float = 60.0,
+    ) -> None:
+        self.breakers = {
+            provider: CircuitBreaker(
+                failure_threshold, recovery_timeout, probe_timeout=probe_timeout
+            )
+            for provider in self.providers
+        }
+
+    def is_available(self, provider: Provider) -> bool:
+        breaker = self.breakers.get(provider)
+        return breaker is None or breaker.is_available()
+
+    def acquire(self, provider: Provider) -> bool:
+        breaker = self.breakers.get(provider)
+        return breaker is None or breaker.acquire()
+
+    def release(self, provider: Provider) -> None:
+        breaker = self.breakers.get(provider)
+        if breaker is not None:
+            breaker.release()
+
+    # state store
+
+    def attach_state_store(
+        self, state_store: StateStore, flush_interval: float = 30.0, owned: bool = False
+    ) -> None:
+        # warm-start from the shared state, then flush at most every flush_interval;
+        # an owned store is closed along with the handler
+        self.state_store = state_store
+        self.owns_state_store = owned
+        self.flush_interval = flush_interval
+        for provider, stats in self.stats.items():
+            state = state_store.load(self.task, provider)
+            if state is not None:
+                stats.restore(state)
+        self._last_flush = time.monotonic()
+
+    def _maybe_flush(self) -> None:
+        # flushes run on a background thread so a slow or locked store never
+        # holds up the request path or the event loop
+        if (
+            self.state_store is not None
+            and time.monotonic() - self._last_flush >= self.flush_interval
+            and not self._flush_lock.locked()
+        ):
+            self._last_flush = time.monotonic()
+            self._flush_thread = threading.Thread(
+                target=self.flush, name="supercontrast-flush", daemon=True
+            )
+            self._flush_thread.start()
+
+    def flush(self) -> None:
+        if self.state_store is None:
+            return
+        # a concurrent flush already covers the pending observations
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = time.monotonic()
+            for provider, stats in self.stats.items():
+                delta = stats.take_delta()
+                state = self.state_store.merge(self.task, provider, delta)
+                stats.restore(state)
+        finally:
+            self._flush_lock.release()
+
+    def close(self) -> None:
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+        self.flush()
+        if self.state_store is not None and self.owns_state_store:
+            self.state_store.close()
+        self.state_store = None
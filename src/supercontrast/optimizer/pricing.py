@@ -0,0 +1,196 @@
+import math
+import os
+import wave
+
+from enum import Enum
+from pydantic import BaseModel
+from typing import Any, Dict, Optional, Tuple
+
+from supercontrast.provider.provider_enum import Provider
+from supercontrast.task.task_enum import Task
+
+# Pricing units
+
+
+class PricingUnit(Enum):
+    CHARACTERS = "characters"
+    PAGES = "pages"
+    AUDIO_SECONDS = "audio_seconds"
+    TOKENS = "tokens"
+
+
+class ProviderPricing(BaseModel):
+    unit: PricingUnit
+    # price of one billable unit, e.g. one page or a block of unit_size characters
+    price_per_unit: float
+    # price of one output unit, only used for token pricing
+    output_price_per_unit: float = 0.0
+    unit_size: int = 1
+    minimum_units: int = 0
+
+
+# Constants
+
+# nominal sizes used to compare providers when no body is available
+NOMINAL_TEXT_LENGTH = 1000
+NOMINAL_AUDIO_SECONDS = 60.0
+
+# rough token accounting for the LLM handlers
+CHARACTERS_PER_TOKEN = 4
+PROMPT_OVERHEAD_TOKENS = 150
+SENTIMENT_OUTPUT_TOKENS = 15
+
+# approximate public list prices in USD, override with the `pricing` config
+PRICING: Dict[Tuple[Provider, Task], ProviderPricing] = {
+    # Task.TRANSLATION
+    (Provider.AWS, Task.TRANSLATION): ProviderPricing(
+        unit=PricingUnit.CHARACTERS, price_per_unit=15 / 1_000_000
+    ),
+    (Provider.AZURE, Task.TRANSLATION): ProviderPricing(
+        unit=PricingUnit.CHARACTERS, price_per_unit=10 / 1_000_000
+    ),
+    (Provider.GCP, Task.TRANSLATION): ProviderPricing(
+        unit=PricingUnit.CHARACTERS, price_per_unit=20 / 1_000_000
+    ),
+    (Provider.MODERNMT, Task.TRANSLATION): ProviderPricing(
+        unit=PricingUnit.CHARACTERS, price_per_unit=15 / 1_000_000
+    ),
+    (Provider.OPENAI, Task.TRANSLATION): ProviderPricing(
+        unit=PricingUnit.TOKENS,
+        price_per_unit=2.5 / 1_000_000,
+        output_price_per_unit=10 / 1_000_000,
+    ),
+    (Provider.ANTHROPIC, Task.TRANSLATION): ProviderPricing(
+        unit=PricingUnit.TOKENS,
+        price_per_unit=3 / 1_000_000,
+        output_price_per_unit=15 / 1_000_000,
+    ),
+    # Task.SENTIMENT_ANALYSIS
+    (Provider.AWS, Task.SENTIMENT_ANALYSIS): ProviderPricing(
+        unit=PricingUnit.CHARACTERS,
+        price_per_unit=0.0001,
+        unit_size=100,
+        minimum_units=3,
+    ),
+    (Provider.AZURE, Task.SENTIMENT_ANALYSIS): ProviderPricing(
+        unit=PricingUnit.CHARACTERS, price_per_unit=0.001, unit_size=1000
+    ),
+    (Provider.GCP, Task.SENTIMENT_ANALYSIS): ProviderPricing(
+        unit=PricingUnit.CHARACTERS, price_per_unit=0.001, unit_size=1000
+    ),
+    (Provider.OPENAI, Task.SENTIMENT_ANALYSIS): ProviderPricing(
+        unit=PricingUnit.TOKENS,
+        price_per_unit=2.5 / 1_000_000,
+        output_price_per_unit=10 / 1_000_000,
+    ),
+    (Provider.ANTHROPIC, Task.SENTIMENT_ANALYSIS): ProviderPricing(
+        unit=PricingUnit.TOKENS,
+        price_per_unit=3 / 1_000_000,
+        output_price_per_unit=15 / 1_000_000,
+    ),
+    # Task.OCR
+    (Provider.AWS, Task.OCR): ProviderPricing(
+        unit=PricingUnit.PAGES, price_per_unit=0.065
+    ),
+    (Provider.AZURE, Task.OCR): ProviderPricing(
+        unit=PricingUnit.PAGES, price_per_unit=1.5 / 1000
+    ),
+    (Provider.GCP, Task.OCR): ProviderPricing(
+        unit=PricingUnit.PAGES, price_per_unit=1.5 / 1000
+    ),
+    # Task.TRANSCRIPTION
+    (Provider.OPENAI, Task.TRANSCRIPTION): ProviderPricing(
+        unit=PricingUnit.AUDIO_SECONDS, price_per_unit=0.006 / 60
+    ),
+    (Provider.AZURE, Task.TRANSCRIPTION): ProviderPricing(
+        unit=PricingUnit.AUDIO_SECONDS, price_per_unit=1 / 3600
+    ),
+}
+
+
+# estimation
+
+
+def get_text_length(body: Any) -> int:
+    text = getattr(body, "text", None)
+    return len(text) if isinstance(text, str) else NOMINAL_TEXT_LENGTH
+
+
+def get_audio_seconds(body: Any) -> float:
+    # only the header of local wav files is read, anything else is nominal
+    audio_file = getattr(body, "audio_file", None)
+    if (
+        isinstance(audio_file, str)
+        and audio_file.lower().endswith(".wav")
+        and os.path.isfile(audio_file)
+    ):
+        try:
+            with wave.open(audio_file, "rb") as audio:
+                return audio.getnframes() / audio.getframerate()
+        except (wave.Error, EOFError):
+            pass
+    return NOMINAL_AUDIO_SECONDS
+
+
+def estimate_units(task: Task, unit: PricingUnit, body: Any) -> Tuple[float, float]:
+    """
+    Estimate the billable input and output units of a request body locally.
+
+    Args:
+        task (Task): The task the body belongs to.
+        unit (PricingUnit): The unit the provider bills in.
+        body (Any): The request body, or None for a nominal request.
+
+    Returns:
+        Tuple[float, float]: The estimated input and output units.
+    """
+    if unit == PricingUnit.CHARACTERS:
+        return get_text_length(body), 0
+    elif unit == PricingUnit.TOKENS:
+        text_tokens = math.ceil(get_text_length(body) / CHARACTERS_PER_TOKEN)
+        output_tokens = (
+            text_tokens if task == Task.TRANSLATION else SENTIMENT_OUTPUT_TOKENS
+        )
+        return text_tokens + PROMPT_OVERHEAD_TOKENS, output_tokens
+    elif unit == PricingUnit.PAGES:
+        # an OCR request carries a single image
+        return 1, 0
+    elif unit == PricingUnit.AUDIO_SECONDS:
+        return get_audio_seconds(body), 0
+    else:
+        raise ValueError(f"Unsupported pricing unit: {unit}")
+
+
+def estimate_cost(
+    task: Task,
+    provider: Provider,
+    body: Any = None,
+    pricing: Optional[Dict[Tuple[Provider, Task], ProviderPricing]] = None,
+) -> Optional[float]:
+    """
+    Estimate the cost of sending a body to a provider, in USD.
+
+    Args:
+        task (Task): The task the body belongs to.
+        provider (Provider): The provider to price.
+        body (Any): The request body, or None for a nominal request.
+        pricing (Optional[Dict]): Overrides for the default price table.
+
+    Returns:
+        Optional[float]: The estimated cost, or None if the provider has no pricing.
+    """
+    provider_pricing = (pricing or {}).get((provider, task)) or PRICING.get(
+        (provider, task)
+    )
+    if provider_pricing is None:
+        return None
+
+    input_units, output_units = estimate_units(task, provider_pricing.unit, body)
+    billable_units = max(
+        math.ceil(input_units / provider_pricing.unit_size),
+        provider_pricing.minimum_units,
+    )
+    return (
+        billable_units * provider_pricing.price_per_unit
+        + output_units * provider_pricing.output_price_per_unit
+    )
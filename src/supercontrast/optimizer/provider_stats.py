@@ -0,0 +1,110 @@
+import math
+import threading
+
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class ProviderStats:
+    def __init__(self, window_size: int = 200, ewma_alpha: float = 0.2):
+        self.window_size = window_size
+        self.ewma_alpha = ewma_alpha
+        self.latencies: deque = deque(maxlen=window_size)
+        self.ewma_latency: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+        self.quality_total = 0.0
+        self.quality_samples = 0
+        # observations not yet flushed to a state store
+        self.pending_latencies: deque = deque(maxlen=window_size)
+        self.pending_requests = 0
+        self.pending_errors = 0
+        self.pending_quality_total = 0.0
+        self.pending_quality_samples = 0
+        self.lock = threading.Lock()
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        with self.lock:
+            self.requests += 1
+            self.pending_requests += 1
+            # batch calls count towards the error rate but carry no latency
+            if latency is None:
+                return
+            self.latencies.append(latency)
+            self.pending_latencies.append(latency)
+            self.ewma_latency = self._update_ewma(self.ewma_latency, latency)
+
+    def record_error(self) -> None:
+        with self.lock:
+            self.requests += 1
+            self.errors += 1
+            self.pending_requests += 1
+            self.pending_errors += 1
+
+    def record_quality(self, quality: float) -> None:
+        with self.lock:
+            self.quality_total += quality
+            self.quality_samples += 1
+            self.pending_quality_total += quality
+            self.pending_quality_samples += 1
+
+    def _update_ewma(self, ewma_latency: Optional[float], latency: float) -> float:
+        if ewma_latency is None:
+            return latency
+        return ewma_latency + self.ewma_alpha * (latency - ewma_latency)
+
+    def take_delta(self) -> Dict[str, Any]:
+        # hand the unflushed observations to a state store and reset them
+        with self.lock:
+            delta = {
+                "requests": self.pending_requests,
+                "errors": self.pending_errors,
+                "latencies": list(self.pending_latencies),
+                "quality_total": self.pending_quality_total,
+                "quality_samples": self.pending_quality_samples,
+            }
+            self.pending_latencies.clear()
+            self.pending_requests = 0
+            self.pending_errors = 0
+            self.pending_quality_total = 0.0
+            self.pending_quality_samples = 0
+        return delta
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        # replace the totals with the shared state, keeping anything recorded
+        # locally since the last take_delta on top of it
+        with self.lock:
+            self.requests = state["requests"] + self.pending_requests
+            self.errors = state["errors"] + self.pending_errors
+            self.quality_total = state["quality_total"] + self.pending_quality_total
+            self.quality_samples = (
+                state["quality_samples"] + self.pending_quality_samples
+            )
+            self.latencies = deque(state["latencies"], maxlen=self.window_size)
+            self.ewma_latency = state["ewma_latency"]
+            for latency in self.pending_latencies:
+                self.latencies.append(latency)
+                self.ewma_latency = self._update_ewma(self.ewma_latency, latency)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        # nearest-rank percentile over the sliding window
+        with self.lock:
+            if not self.latencies:
+                return None
+            ordered = sorted(self.latencies)
+        rank = max(math.ceil(percentile / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    @property
+    def samples(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    @property
+    def mean_quality(self) -> Optional[float]:
+        if not self.quality_samples:
+            return None
+        return self.quality_total / self.quality_samples
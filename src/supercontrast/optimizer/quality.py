@@ -0,0 +1,37 @@
+from typing import Any, Dict, Optional
+
+from supercontrast.metrics.metrics_enum import Metric
+from supercontrast.task.task_enum import Task
+
+# Constants
+
+# the metric each task is judged on, and whether it is an error rate
+QUALITY_METRICS = {
+    Task.OCR: (Metric.CER, True),
+    Task.TRANSCRIPTION: (Metric.WER, True),
+    Task.TRANSLATION: (Metric.CHRF, False),
+}
+
+
+def quality_score(task: Task, metrics: Optional[Dict[Metric, Any]]) -> Optional[float]:
+    """
+    Reduce the metrics of a response to a single quality score in [0, 1].
+
+    Args:
+        task (Task): The task the metrics were calculated for.
+        metrics (Optional[Dict[Metric, Any]]): The metrics of the response.
+
+    Returns:
+        Optional[float]: The quality score, higher is better, or None if the
+        task has no quality metric or it was not calculated.
+    """
+    if not metrics or task not in QUALITY_METRICS:
+        return None
+
+    metric, is_error_rate = QUALITY_METRICS[task]
+    value = metrics.get(metric)
+    if not isinstance(value, (int, float)):
+        return None
+
+    score = 1 - value if is_error_rate else value
+    return min(max(float(score), 0.0), 1.0)
@@ -0,0 +1,146 @@
+import json
+import sqlite3
+import threading
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from supercontrast.provider.provider_enum import Provider
+from supercontrast.task.task_enum import Task
+
+# Constants
+
+EMPTY_STATE: Dict[str, Any] = {
+    "requests": 0,
+    "errors": 0,
+    "latencies": [],
+    "ewma_latency": None,
+    "quality_total": 0.0,
+    "quality_samples": 0,
+}
+
+
+def merge_state(
+    state: Dict[str, Any],
+    delta: Dict[str, Any],
+    window_size: int = 200,
+    ewma_alpha: float = 0.2,
+) -> Dict[str, Any]:
+    """
+    Fold the observations one process made since its last flush into a shared state.
+
+    Args:
+        state (Dict[str, Any]): The stored state of a provider.
+        delta (Dict[str, Any]): The unflushed observations from ProviderStats.take_delta.
+        window_size (int): The number of recent latencies to keep.
+        ewma_alpha (float): The smoothing factor of the latency EWMA.
+
+    Returns:
+        Dict[str, Any]: The merged state.
+    """
+    ewma_latency = state["ewma_latency"]
+    for latency in delta["latencies"]:
+        if ewma_latency is None:
+            ewma_latency = latency
+        else:
+            ewma_latency += ewma_alpha * (latency - ewma_latency)
+
+    return {
+        "requests": state["requests"] + delta["requests"],
+        "errors": state["errors"] + delta["errors"],
+        "latencies": (state["latencies"] + delta["latencies"])[-window_size:],
+        "ewma_latency": ewma_latency,
+        "quality_total": state["quality_total"] + delta["quality_total"],
+        "quality_samples": state["quality_samples"] + delta["quality_samples"],
+    }
+
+
+# state store
+
+
+class StateStore(ABC):
+    @abstractmethod
+    def load(self, task: Task, provider: Provider) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def merge(
+        self, task: Task, provider: Provider, delta: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Apply a delta atomically and return the resulting shared state."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryStateStore(StateStore):
+    # shares state between handlers of one process, mostly useful in tests
+    def __init__(self):
+        self.states: Dict[tuple, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def load(self, task: Task, provider: Provider) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.states.get((task, provider))
+
+    def merge(
+        self, task: Task, provider: Provider, delta: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        with self.lock:
+            state = merge_state(self.states.get((task, provider), EMPTY_STATE), delta)
+            self.states[(task, provider)] = state
+            return state
+
+
+class SQLiteStateStore(StateStore):
+    # a WAL-mode SQLite file lets the workers on one host share statistics and
+    # warm-start after a restart; each merge is a single short write transaction
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS provider_stats ("
+            "task TEXT NOT NULL, provider TEXT NOT NULL, state TEXT NOT NULL, "
+            "PRIMARY KEY (task, provider))"
+        )
+
+    def _select(self, task: Task, provider: Provider) -> Optional[Dict[str, Any]]:
+        row = self.connection.execute(
+            "SELECT state FROM provider_stats WHERE task = ? AND provider = ?",
+            (task.value, provider.value),
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def load(self, task: Task, provider: Provider) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self._select(task, provider)
+
+    def merge(
+        self, task: Task, provider: Provider, delta: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        with self.lock:
+            # BEGIN IMMEDIATE takes the write lock up front so concurrent
+            # workers cannot interleave their read-modify-write cycles
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                state = merge_state(self._select(task, provider) or EMPTY_STATE, delta)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO provider_stats (task, provider, state) "
+                    "VALUES (?, ?, ?)",
+                    (task.value, provider.value, json.dumps(state)),
+                )
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            return state
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
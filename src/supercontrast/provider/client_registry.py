@@ -0,0 +1,90 @@
+import hashlib
+import threading
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from supercontrast.provider.provider_enum import Provider
+
+T = TypeVar("T")
+
+
+def _fingerprint(credentials: Any) -> Optional[str]:
+    # secrets are never kept in the registry keys, only their digest
+    if credentials is None:
+        return None
+    return hashlib.sha256(repr(credentials).encode("utf-8")).hexdigest()
+
+
+class ClientRegistry:
+    # SDK clients shared by every handler in the process; each client is built
+    # once per (provider, service, credentials, region, options), and only
+    # builds of the same key wait for each other
+    def __init__(self):
+        self.clients: Dict[Tuple, Any] = {}
+        self.build_locks: Dict[Tuple, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+    def get(
+        self,
+        provider: Provider,
+        service: str,
+        factory: Callable[[], T],
+        credentials: Any = None,
+        region: Optional[str] = None,
+        **options: Hashable,
+    ) -> T:
+        """
+        Return the shared client for a key, building it with the factory on first use.
+
+        Args:
+            provider (Provider): The provider the client belongs to.
+            service (str): The provider service, e.g. "comprehend".
+            factory (Callable[[], T]): Builds the client.
+            credentials (Any): The credentials the client is built with.
+            region (Optional[str]): The region or endpoint of the client.
+            **options (Hashable): Any other settings that distinguish clients.
+
+        Returns:
+            T: The shared client.
+        """
+        key = (
+            provider,
+            service,
+            _fingerprint(credentials),
+            region,
+            tuple(sorted(options.items())),
+        )
+        with self.lock:
+            if key in self.clients:
+                return self.clients[key]
+            build_lock = self.build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self.lock:
+                if key in self.clients:
+                    return self.clients[key]
+            client = factory()
+            with self.lock:
+                self.clients[key] = client
+                self.build_locks.pop(key, None)
+            return client
+
+    def clear(self) -> None:
+        with self.lock:
+            self.clients.clear()
+
+
+client_registry = ClientRegistry()
+
+
+def get_shared_client(
+    provider: Provider,
+    service: str,
+    factory: Callable[[], T],
+    credentials: Any = None,
+    region: Optional[str] = None,
+    **options: Hashable,
+) -> T:
+    return client_registry.get(
+        provider, service, factory, credentials, region, **options
+    )
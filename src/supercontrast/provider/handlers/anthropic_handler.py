@@ -1,12 +1,22 @@
 import os
 import pydantic
 
-from langchain.output_parsers import OutputFixingParser, PydanticOutputParser
 from langchain.prompts import PromptTemplate
 from langchain_anthropic import ChatAnthropic
+from typing import Dict, Iterator, List, Optional
 
+from supercontrast.provider.client_registry import get_shared_client
+from supercontrast.provider.prompt_packing import (
+    get_packed_batches,
+    pack_texts,
+    packed_batch_request,
+)
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_handler import ProviderHandler
+from supercontrast.provider.structured_output import (
+    StructuredGenerator,
+    get_structured_output_stats,
+)
 from supercontrast.task.task_enum import Task
 from supercontrast.task.types.sentiment_analysis_types import (
     SentimentAnalysisRequest,
@@ -23,6 +33,23 @@ from supercontrast.utils.text import truncate_text
 ANTHROPIC_MODEL_NAME = "claude-3-5-sonnet-20240620"
 ANTHROPIC_SUPPORTED_TASKS = [Task.SENTIMENT_ANALYSIS, Task.TRANSLATION]
 
+
+def get_chat_model() -> ChatAnthropic:
+    # the chat model and its connection pool are shared by every Anthropic handler
+    return get_shared_client(
+        Provider.ANTHROPIC,
+        "chat",
+        lambda: ChatAnthropic(
+            **{
+                "temperature": 0,
+                "model": ANTHROPIC_MODEL_NAME,
+            }
+        ),
+        credentials=os.environ.get("ANTHROPIC_API_KEY"),
+        model=ANTHROPIC_MODEL_NAME,
+    )
+
+
 # Task.SENTIMENT_ANALYSIS
 
 
@@ -33,44 +60,95 @@ class SentimentAnalysisOutput(pydantic.BaseModel):
 
 
 SENTIMENT_ANALYSIS_PROMPT = PromptTemplate(
-    template="Analyze the sentiment of the following text. Respond with 1 for positive, 0 for neutral, and -1 for negative:\n\n{text}\n\n{format_instructions}",
+    template="Analyze the sentiment of the following text. Respond with 1 for positive, 0 for neutral, and -1 for negative:\n\n{text}",
     input_variables=["text"],
-    partial_variables={
-        "format_instructions": PydanticOutputParser(
-            pydantic_object=SentimentAnalysisOutput
-        ).get_format_instructions()
-    },
+)
+
+
+class PackedSentimentAnalysisOutput(pydantic.BaseModel):
+    scores: List[float] = pydantic.Field(
+        description="One sentiment score between -1 (very negative) and 1 (very positive) per text, in the order of the texts"
+    )
+
+
+PACKED_SENTIMENT_ANALYSIS_PROMPT = PromptTemplate(
+    template="Analyze the sentiment of each text in the following JSON array. Respond with 1 for positive, 0 for neutral, and -1 for negative, giving exactly one score per text in the same order:\n\n{texts}",
+    input_variables=["texts"],
 )
 
 
 class AnthropicSentimentAnalysis(ProviderHandler):
-    def __init__(self):
+    # longer texts are scored in chunks by the task handler
+    max_request_bytes = 5000
+
+    def __init__(self, pack_size: Optional[int] = None):
         super().__init__(provider=Provider.ANTHROPIC, task=Task.SENTIMENT_ANALYSIS)
-        model = ChatAnthropic(
-            **{
-                "temperature": 0,
-                "model": ANTHROPIC_MODEL_NAME,
-            }
+        self.model_name = ANTHROPIC_MODEL_NAME
+        model = get_chat_model()
+        self.generator = StructuredGenerator(
+            SENTIMENT_ANALYSIS_PROMPT, model, SentimentAnalysisOutput
+        )
+        # with a pack_size, batch_request sends up to pack_size texts per prompt
+        self.max_batch_size = pack_size
+        self.packed_generator = StructuredGenerator(
+            PACKED_SENTIMENT_ANALYSIS_PROMPT, model, PackedSentimentAnalysisOutput
         )
-        pydantic_parser = PydanticOutputParser(pydantic_object=SentimentAnalysisOutput)
-        self.parser = OutputFixingParser.from_llm(parser=pydantic_parser, llm=model)
-        self.generator = SENTIMENT_ANALYSIS_PROMPT | model | self.parser
 
     def request(self, request: SentimentAnalysisRequest) -> SentimentAnalysisResponse:
         result: SentimentAnalysisOutput = self.generator.invoke(
-            {"text": truncate_text(request.text)}
+            {"text": truncate_text(request.text, self.max_request_bytes)}
+        )
+        return SentimentAnalysisResponse(score=result.score)
+
+    async def request_async(
+        self, request: SentimentAnalysisRequest
+    ) -> SentimentAnalysisResponse:
+        result: SentimentAnalysisOutput = await self.generator.ainvoke(
+            {"text": truncate_text(request.text, self.max_request_bytes)}
         )
         return SentimentAnalysisResponse(score=result.score)
 
+    def batch_request(
+        self, requests: List[SentimentAnalysisRequest]
+    ) -> List[SentimentAnalysisResponse]:
+        return packed_batch_request(
+            requests, self.max_batch_size, self._request_packed, self.request
+        )
+
+    def get_batches(
+        self, requests: List[SentimentAnalysisRequest]
+    ) -> Iterator[List[SentimentAnalysisRequest]]:
+        return get_packed_batches(requests, self.max_batch_size)
+
+    def _request_packed(
+        self, requests: List[SentimentAnalysisRequest]
+    ) -> List[SentimentAnalysisResponse]:
+        result: PackedSentimentAnalysisOutput = self.packed_generator.invoke(
+            {
+                "texts": pack_texts(
+                    [
+                        truncate_text(request.text, self.max_request_bytes)
+                        for request in requests
+                    ]
+                )
+            }
+        )
+        return [SentimentAnalysisResponse(score=score) for score in result.scores]
+
+    def get_structured_output_stats(self) -> Dict[str, int]:
+        return get_structured_output_stats(self.generator, self.packed_generator)
+
     def get_name(self) -> str:
         return "Anthropic - Sentiment Analysis"
 
     @classmethod
-    def init_from_env(cls) -> "AnthropicSentimentAnalysis":
+    def init_from_env(
+        cls, pack_size: Optional[int] = None
+    ) -> "AnthropicSentimentAnalysis":
         api_key = os.environ.get("ANTHROPIC_API_KEY")
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
-        return cls()
+        return cls(pack_size)
 
 
 # Task.TRANSLATION
@@ -81,28 +159,44 @@ class TranslationOutput(pydantic.BaseModel):
 
 
 TRANSLATION_PROMPT = PromptTemplate(
-    template="Translate the following text from {src_language} to {target_language}:\n\n{text}\n\n{format_instructions}",
+    template="Translate the following text from {src_language} to {target_language}:\n\n{text}",
     input_variables=["src_language", "target_language", "text"],
-    partial_variables={
-        "format_instructions": PydanticOutputParser(
-            pydantic_object=TranslationOutput
-        ).get_format_instructions()
-    },
+)
+
+
+class PackedTranslationOutput(pydantic.BaseModel):
+    translations: List[str] = pydantic.Field(
+        description="One translated text per text, in the order of the texts"
+    )
+
+
+PACKED_TRANSLATION_PROMPT = PromptTemplate(
+    template="Translate each text in the following JSON array from {src_language} to {target_language}, giving exactly one translation per text in the same order:\n\n{texts}",
+    input_variables=["src_language", "target_language", "texts"],
 )
 
 
 class AnthropicTranslate(ProviderHandler):
-    def __init__(self, src_language: str, target_language: str):
+    # keeps the prompt and the translated output well within the model limits
+    max_request_bytes = 5000
+
+    def __init__(
+        self,
+        src_language: str,
+        target_language: str,
+        pack_size: Optional[int] = None,
+    ):
         super().__init__(provider=Provider.ANTHROPIC, task=Task.TRANSLATION)
-        model = ChatAnthropic(
-            **{
-                "temperature": 0,
-                "model": ANTHROPIC_MODEL_NAME,
-            }
+        self.model_name = ANTHROPIC_MODEL_NAME
+        model = get_chat_model()
+        self.generator = StructuredGenerator(
+            TRANSLATION_PROMPT, model, TranslationOutput
+        )
+        # with a pack_size, batch_request sends up to pack_size texts per prompt
+        self.max_batch_size = pack_size
+        self.packed_generator = StructuredGenerator(
+            PACKED_TRANSLATION_PROMPT, model, PackedTranslationOutput
         )
-        pydantic_parser = PydanticOutputParser(pydantic_object=TranslationOutput)
-        self.parser = OutputFixingParser.from_llm(parser=pydantic_parser, llm=model)
-        self.generator = TRANSLATION_PROMPT | model | self.parser
         self.src_language = src_language
         self.target_language = target_language
 
@@ -111,22 +205,67 @@ class AnthropicTranslate(ProviderHandler):
             {
                 "src_language": self.src_language,
                 "target_language": self.target_language,
-                "text": truncate_text(request.text),
+                "text": truncate_text(request.text, self.max_request_bytes),
+            }
+        )
+        return TranslationResponse(text=result.translation)
+
+    async def request_async(self, request: TranslationRequest) -> TranslationResponse:
+        result: TranslationOutput = await self.generator.ainvoke(
+            {
+                "src_language": self.src_language,
+                "target_language": self.target_language,
+                "text": truncate_text(request.text, self.max_request_bytes),
             }
         )
         return TranslationResponse(text=result.translation)
 
+    def batch_request(
+        self, requests: List[TranslationRequest]
+    ) -> List[TranslationResponse]:
+        return packed_batch_request(
+            requests, self.max_batch_size, self._request_packed, self.request
+        )
+
+    def get_batches(
+        self, requests: List[TranslationRequest]
+    ) -> Iterator[List[TranslationRequest]]:
+        return get_packed_batches(requests, self.max_batch_size)
+
+    def _request_packed(
+        self, requests: List[TranslationRequest]
+    ) -> List[TranslationResponse]:
+        result: PackedTranslationOutput = self.packed_generator.invoke(
+            {
+                "src_language": self.src_language,
+                "target_language": self.target_language,
+                "texts": pack_texts(
+                    [
+                        truncate_text(request.text, self.max_request_bytes)
+                        for request in requests
+                    ]
+                ),
+            }
+        )
+        return [TranslationResponse(text=text) for text in result.translations]
+
+    def get_structured_output_stats(self) -> Dict[str, int]:
+        return get_structured_output_stats(self.generator, self.packed_generator)
+
     def get_name(self) -> str:
         return "Anthropic - Translate"
 
     @classmethod
     def init_from_env(
-        cls, source_language: str, target_language: str
+        cls,
+        source_language: str,
+        target_language: str,
+        pack_size: Optional[int] = None,
     ) -> "AnthropicTranslate":
         api_key = os.environ.get("ANTHROPIC_API_KEY")
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
-        return cls(source_language, target_language)
+        return cls(source_language, target_language, pack_size)
 
 
 # factory
@@ -136,10 +275,16 @@ def anthropic_provider_factory(task: Task, **config) -> ProviderHandler:
     if task not in ANTHROPIC_SUPPORTED_TASKS:
         raise ValueError(f"Unsupported task: {task}")
     elif task == Task.SENTIMENT_ANALYSIS:
-        return AnthropicSentimentAnalysis.init_from_env()
+        return AnthropicSentimentAnalysis.init_from_env(
+            pack_size=config.get("prompt_pack_size")
+        )
     elif task == Task.TRANSLATION:
         source_language = config.get("source_language", "en")
         target_language = config.get("target_language", "es")
-        return AnthropicTranslate.init_from_env(source_language, target_language)
+        return AnthropicTranslate.init_from_env(
+            source_language,
+            target_language,
+            pack_size=config.get("prompt_pack_size"),
+        )
     else:
         raise ValueError(f"Unsupported task: {task}")
@@ -2,13 +2,21 @@ import os
 import requests
 
 from pydantic import BaseModel
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_handler import ProviderHandler
 from supercontrast.task.task_enum import Task
 from supercontrast.task.types.ocr_types import OCRBoundingBox, OCRRequest, OCRResponse
-from supercontrast.utils.image import load_image_data
+from supercontrast.utils.http import (
+    LoopBoundClient,
+    create_async_client,
+    create_async_client_from_config,
+    create_session,
+    create_session_from_config,
+    raise_for_status,
+)
+from supercontrast.utils.image import load_image_data, load_image_data_async
 
 # Constants
 
@@ -59,8 +67,15 @@ class OCRResult(BaseModel):
 
 
 class API4AIOCR(ProviderHandler):
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        session: Optional[requests.Session] = None,
+        async_client: Optional[LoopBoundClient] = None,
+    ):
         super().__init__(provider=Provider.API4AI, task=Task.OCR)
+        self.session = session or create_session()
+        self.async_client = async_client or create_async_client()
         self.key = api_key
         self.url = "https://ocr43.p.rapidapi.com/v1/results"
         self.headers = {"X-RapidAPI-Key": self.key}
@@ -69,12 +84,25 @@ class API4AIOCR(ProviderHandler):
         image_data = load_image_data(request.image)
         files = {"image": image_data}
 
-        response = requests.post(url=self.url, files=files, headers=self.headers)
+        response = self.session.post(url=self.url, files=files, headers=self.headers)
 
-        if response.status_code != 200:
-            raise Exception(f"Error: {response.status_code} - {response.text}")
+        raise_for_status(response)
 
-        response_json = response.json()
+        return self._parse_response(response.json())
+
+    async def request_async(self, request: OCRRequest) -> OCRResponse:
+        image_data = await load_image_data_async(request.image)
+        files = {"image": image_data}
+
+        response = await self.async_client.get().post(
+            url=self.url, files=files, headers=self.headers
+        )
+
+        raise_for_status(response)
+
+        return self._parse_response(response.json())
+
+    def _parse_response(self, response_json: dict) -> OCRResponse:
         response_data = OCRResult(**response_json)
 
         all_text = ""
@@ -112,11 +140,15 @@ class API4AIOCR(ProviderHandler):
         return "API4AI OCR"
 
     @classmethod
-    def init_from_env(cls) -> "API4AIOCR":
+    def init_from_env(
+        cls,
+        session: Optional[requests.Session] = None,
+        async_client: Optional[LoopBoundClient] = None,
+    ) -> "API4AIOCR":
         api_key = os.environ.get("API4AI_API_KEY", "")
         if not api_key:
             raise ValueError("API4AI_API_KEY is not set")
-        return cls(api_key)
+        return cls(api_key, session, async_client)
 
 
 # factory
@@ -126,6 +158,9 @@ def api4ai_provider_factory(task: Task, **config) -> ProviderHandler:
     if task not in API4AI_SUPPORTED_TASKS:
         raise ValueError(f"Unsupported task: {task}")
     elif task == Task.OCR:
-        return API4AIOCR.init_from_env()
+        return API4AIOCR.init_from_env(
+            session=create_session_from_config(**config),
+            async_client=create_async_client_from_config(**config),
+        )
     else:
         raise ValueError(f"Unsupported task: {task}")
@@ -1,5 +1,9 @@
 import boto3
+import os
 
+from typing import List
+
+from supercontrast.provider.client_registry import get_shared_client
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_handler import ProviderHandler
 from supercontrast.task.task_enum import Task
@@ -19,25 +23,46 @@ from supercontrast.utils.text import truncate_text
 
 AWS_SUPPORTED_TASKS = [Task.SENTIMENT_ANALYSIS, Task.TRANSLATION, Task.OCR]
 
+
+def get_aws_client(
+    service: str, aws_access_key_id, aws_secret_access_key, aws_session_token
+):
+    # boto3 clients are thread-safe, so one per service and credentials is shared
+    return get_shared_client(
+        Provider.AWS,
+        service,
+        lambda: boto3.client(
+            service,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            aws_session_token=aws_session_token,
+        ),
+        credentials=(aws_access_key_id, aws_secret_access_key, aws_session_token),
+        region=os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION"),
+    )
+
+
 # Task.SENTIMENT_ANALYSIS
 
 
 class AWSSentimentAnalysis(ProviderHandler):
+    # BatchDetectSentiment accepts up to 25 documents of up to 5000 bytes
+    max_batch_size = 25
+    max_request_bytes = 5000
+
     def __init__(
         self, aws_access_key_id=None, aws_secret_access_key=None, aws_session_token=None
     ):
         super().__init__(provider=Provider.AWS, task=Task.SENTIMENT_ANALYSIS)
-        self.client = boto3.client(
-            "comprehend",
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            aws_session_token=aws_session_token,
+        self.client = get_aws_client(
+            "comprehend", aws_access_key_id, aws_secret_access_key, aws_session_token
         )
         self.THRESHOLD = 0
 
     def request(self, request: SentimentAnalysisRequest) -> SentimentAnalysisResponse:
         response = self.client.detect_sentiment(
-            Text=truncate_text(request.text), LanguageCode="en"
+            Text=truncate_text(request.text, self.max_request_bytes),
+            LanguageCode="en",
         )
         score = (
             response["SentimentScore"]["Positive"]
@@ -46,6 +71,33 @@ class AWSSentimentAnalysis(ProviderHandler):
 
         return SentimentAnalysisResponse(score=score)
 
+    def batch_request(
+        self, requests: List[SentimentAnalysisRequest]
+    ) -> List[SentimentAnalysisResponse]:
+        responses: List[SentimentAnalysisResponse] = []
+        for batch in self.get_batches(requests):
+            response = self.client.batch_detect_sentiment(
+                TextList=[
+                    truncate_text(request.text, self.max_request_bytes)
+                    for request in batch
+                ],
+                LanguageCode="en",
+            )
+            results = {result["Index"]: result for result in response["ResultList"]}
+            for index, request in enumerate(batch):
+                # documents in the ErrorList are retried alone instead of failing
+                # the rest of the batch
+                if index not in results:
+                    responses.append(self.request(request))
+                    continue
+                score = (
+                    results[index]["SentimentScore"]["Positive"]
+                    - results[index]["SentimentScore"]["Negative"]
+                )
+                responses.append(SentimentAnalysisResponse(score=score))
+
+        return responses
+
     def get_name(self) -> str:
         return "Aws Comprehend - Sentiment Analysis"
 
@@ -60,6 +112,9 @@ class AWSSentimentAnalysis(ProviderHandler):
 
 
 class AWSTranslate(ProviderHandler):
+    # TranslateText accepts up to 10000 bytes of text
+    max_request_bytes = 10000
+
     def __init__(
         self,
         src_language: str,
@@ -69,18 +124,15 @@ class AWSTranslate(ProviderHandler):
         aws_session_token=None,
     ):
         super().__init__(provider=Provider.AWS, task=Task.TRANSLATION)
-        self.client = boto3.client(
-            "translate",
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            aws_session_token=aws_session_token,
+        self.client = get_aws_client(
+            "translate", aws_access_key_id, aws_secret_access_key, aws_session_token
         )
         self.src_language = src_language
         self.target_language = target_language
 
     def request(self, request: TranslationRequest) -> TranslationResponse:
         response = self.client.translate_text(
-            Text=truncate_text(request.text),
+            Text=truncate_text(request.text, self.max_request_bytes),
             SourceLanguageCode=self.src_language,
             TargetLanguageCode=self.target_language,
         )
@@ -121,18 +173,15 @@ class AWSOCR(ProviderHandler):
         self, aws_access_key_id=None, aws_secret_access_key=None, aws_session_token=None
     ):
         super().__init__(provider=Provider.AWS, task=Task.OCR)
-        self.client = boto3.client(
-            "textract",
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            aws_session_token=aws_session_token,
+        self.client = get_aws_client(
+            "textract", aws_access_key_id, aws_secret_access_key, aws_session_token
         )
 
     def request(self, request: OCRRequest) -> OCRResponse:
         image_data = load_image_data(request.image)
 
         # Get image dimensions
-        width, height = get_image_size(request.image)
+        width, height = get_image_size(image_data)
 
         response = self.client.analyze_document(
             Document={"Bytes": image_data}, FeatureTypes=["FORMS", "TABLES"]
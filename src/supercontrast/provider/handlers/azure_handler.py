@@ -1,15 +1,22 @@
+import asyncio
 import azure.cognitiveservices.speech as speechsdk
 import io
 import os
 import time
 
 from azure.ai.textanalytics import TextAnalyticsClient
+from azure.ai.textanalytics.aio import TextAnalyticsClient as AsyncTextAnalyticsClient
 from azure.ai.translation.text import TextTranslationClient
+from azure.ai.translation.text.aio import (
+    TextTranslationClient as AsyncTextTranslationClient,
+)
 from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
 from azure.core.credentials import AzureKeyCredential
 from msrest.authentication import CognitiveServicesCredentials
+from typing import Any, Iterator, List
 
+from supercontrast.provider.client_registry import get_shared_client
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_handler import ProviderHandler
 from supercontrast.task.task_enum import Task
@@ -26,8 +33,10 @@ from supercontrast.task.types.translation_types import (
     TranslationRequest,
     TranslationResponse,
 )
-from supercontrast.utils.audio import load_audio_file
-from supercontrast.utils.image import get_image_size, load_image_data
+from supercontrast.utils.audio import load_audio_file, load_audio_file_async
+from supercontrast.utils.batch import batched
+from supercontrast.utils.http import LoopBoundClient
+from supercontrast.utils.image import load_image_data, load_image_data_async
 
 # Constants
 
@@ -42,15 +51,59 @@ AZURE_SUPPORTED_TASKS = [
 
 
 class AzureSentimentAnalysis(ProviderHandler):
+    # synchronous sentiment analysis accepts up to 10 documents of up to 5120
+    # characters per call
+    max_batch_size = 10
+    max_request_bytes = 5120
+
     def __init__(self, endpoint: str, key: str):
         super().__init__(provider=Provider.AZURE, task=Task.SENTIMENT_ANALYSIS)
-        self.client = TextAnalyticsClient(endpoint, AzureKeyCredential(key))
+        self.endpoint = endpoint
+        self.credential = AzureKeyCredential(key)
+        self.client = get_shared_client(
+            Provider.AZURE,
+            "textanalytics",
+            lambda: TextAnalyticsClient(endpoint, self.credential),
+            credentials=key,
+            region=endpoint,
+        )
+        self.async_client = LoopBoundClient(
+            lambda: AsyncTextAnalyticsClient(endpoint, self.credential)
+        )
 
     def request(self, request: SentimentAnalysisRequest) -> SentimentAnalysisResponse:
         response = self.client.analyze_sentiment([request.text])[0]
-        score = (
-            response.confidence_scores.positive - response.confidence_scores.negative
-        )
+        return self._get_response(response)
+
+    async def request_async(
+        self, request: SentimentAnalysisRequest
+    ) -> SentimentAnalysisResponse:
+        response = (await self.async_client.get().analyze_sentiment([request.text]))[0]
+        return self._get_response(response)
+
+    def batch_request(
+        self, requests: List[SentimentAnalysisRequest]
+    ) -> List[SentimentAnalysisResponse]:
+        responses: List[SentimentAnalysisResponse] = []
+        for batch in self.get_batches(requests):
+            results = self.client.analyze_sentiment([request.text for request in batch])
+            for request, result in zip(batch, results):
+                # a document that failed on its own is retried alone instead of
+                # failing the rest of the batch
+                if result.is_error:
+                    responses.append(self.request(request))
+                else:
+                    responses.append(self._get_response(result))
+
+        return responses
+
+    def _get_response(self, result: Any) -> SentimentAnalysisResponse:
+        if result.is_error:
+            raise ValueError(
+                f"Sentiment analysis failed: ({result.error.code}) "
+                f"{result.error.message}"
+            )
+        score = result.confidence_scores.positive - result.confidence_scores.negative
         return SentimentAnalysisResponse(score=score)
 
     def get_name(self) -> str:
@@ -72,12 +125,28 @@ class AzureSentimentAnalysis(ProviderHandler):
 
 
 class AzureTranslation(ProviderHandler):
+    # the translator accepts up to 1000 elements and 50000 characters per call
+    max_batch_size = 1000
+    max_batch_characters = 50000
+    max_request_bytes = 50000
+
     def __init__(
         self, key: str, region: str, source_language: str, target_language: str
     ):
         super().__init__(provider=Provider.AZURE, task=Task.TRANSLATION)
-        self.client = TextTranslationClient(
-            credential=AzureKeyCredential(key), region=region
+        self.credential = AzureKeyCredential(key)
+        self.region = region
+        self.client = get_shared_client(
+            Provider.AZURE,
+            "translation",
+            lambda: TextTranslationClient(credential=self.credential, region=region),
+            credentials=key,
+            region=region,
+        )
+        self.async_client = LoopBoundClient(
+            lambda: AsyncTextTranslationClient(
+                credential=self.credential, region=region
+            )
         )
         self.source_language = source_language
         self.target_language = target_language
@@ -91,6 +160,42 @@ class AzureTranslation(ProviderHandler):
         translated_text = response[0].translations[0].text
         return TranslationResponse(text=translated_text)
 
+    def batch_request(
+        self, requests: List[TranslationRequest]
+    ) -> List[TranslationResponse]:
+        responses: List[TranslationResponse] = []
+        for batch in self.get_batches(requests):
+            results = self.client.translate(
+                body=[request.text for request in batch],
+                from_language=self.source_language,
+                to_language=[self.target_language],
+            )
+            responses.extend(
+                TranslationResponse(text=result.translations[0].text)
+                for result in results
+            )
+
+        return responses
+
+    def get_batches(
+        self, requests: List[TranslationRequest]
+    ) -> Iterator[List[TranslationRequest]]:
+        return batched(
+            requests,
+            self.max_batch_size,
+            max_weight=self.max_batch_characters,
+            weight=lambda request: len(request.text),
+        )
+
+    async def request_async(self, request: TranslationRequest) -> TranslationResponse:
+        response = await self.async_client.get().translate(
+            body=[request.text],
+            from_language=self.source_language,
+            to_language=[self.target_language],
+        )
+        translated_text = response[0].translations[0].text
+        return TranslationResponse(text=translated_text)
+
     def get_name(self) -> str:
         return "Azure Translator"
 
@@ -114,10 +219,45 @@ class AzureTranslation(ProviderHandler):
 class AzureOCR(ProviderHandler):
     def __init__(self, endpoint: str, key: str):
         super().__init__(provider=Provider.AZURE, task=Task.OCR)
-        self.client = ComputerVisionClient(endpoint, CognitiveServicesCredentials(key))
+        self.client = get_shared_client(
+            Provider.AZURE,
+            "computervision",
+            lambda: ComputerVisionClient(endpoint, CognitiveServicesCredentials(key)),
+            credentials=key,
+            region=endpoint,
+        )
 
     def request(self, request: OCRRequest) -> OCRResponse:
         image_data = load_image_data(request.image)
+        operation_id = self._start_read(image_data)
+
+        while True:
+            read_result = self.client.get_read_result(operation_id)
+
+            if read_result.status not in ["notStarted", "running"]:  # type: ignore
+                break
+            time.sleep(1)
+
+        return self._parse_read_result(read_result)
+
+    async def request_async(self, request: OCRRequest) -> OCRResponse:
+        # the Computer Vision SDK has no aio client, so only the HTTP calls are
+        # pushed to threads while the polling interval stays on the event loop
+        image_data = await load_image_data_async(request.image)
+        operation_id = await asyncio.to_thread(self._start_read, image_data)
+
+        while True:
+            read_result = await asyncio.to_thread(
+                self.client.get_read_result, operation_id
+            )
+
+            if read_result.status not in ["notStarted", "running"]:  # type: ignore
+                break
+            await asyncio.sleep(1)
+
+        return self._parse_read_result(read_result)
+
+    def _start_read(self, image_data: bytes) -> str:
         read_response = self.client.read_in_stream(io.BytesIO(image_data), raw=True)
 
         if not read_response:
@@ -128,15 +268,9 @@ class AzureOCR(ProviderHandler):
         if not operation_location:
             raise ValueError("Failed to get operation location")
 
-        operation_id = operation_location.split("/")[-1]
-
-        while True:
-            read_result = self.client.get_read_result(operation_id)
-
-            if read_result.status not in ["notStarted", "running"]:  # type: ignore
-                break
-            time.sleep(1)
+        return operation_location.split("/")[-1]
 
+    def _parse_read_result(self, read_result) -> OCRResponse:
         extracted_text = ""
         bounding_boxes = []
 
@@ -186,14 +320,7 @@ class AzureTranscription(ProviderHandler):
     def request(self, request: TranscriptionRequest) -> TranscriptionResponse:
         audio_file_path = load_audio_file(request.audio_file)
 
-        speech_config = speechsdk.SpeechConfig(
-            subscription=self.speech_key, region=self.service_region
-        )
-        audio_config = speechsdk.audio.AudioConfig(filename=audio_file_path)
-
-        speech_recognizer = speechsdk.SpeechRecognizer(
-            speech_config=speech_config, audio_config=audio_config
-        )
+        speech_recognizer = self._create_recognizer(audio_file_path)
 
         complete_transcription = []
         done = False
@@ -224,6 +351,54 @@ class AzureTranscription(ProviderHandler):
 
         return TranscriptionResponse(text=" ".join(complete_transcription))
 
+    async def request_async(
+        self, request: TranscriptionRequest
+    ) -> TranscriptionResponse:
+        audio_file_path = await load_audio_file_async(request.audio_file)
+
+        speech_recognizer = self._create_recognizer(audio_file_path)
+
+        loop = asyncio.get_running_loop()
+        complete_transcription = []
+        done = asyncio.Event()
+
+        def recognized_cb(evt):
+            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                complete_transcription.append(evt.result.text)
+            elif evt.result.reason == speechsdk.ResultReason.NoMatch:
+                print("No speech could be recognized")
+
+        def stop_cb(evt):
+            # SDK callbacks fire on SDK-owned threads
+            loop.call_soon_threadsafe(done.set)
+
+        speech_recognizer.recognized.connect(recognized_cb)
+        speech_recognizer.session_stopped.connect(stop_cb)
+
+        try:
+            await asyncio.to_thread(
+                lambda: speech_recognizer.start_continuous_recognition_async().get()
+            )
+            await done.wait()
+            await asyncio.to_thread(
+                lambda: speech_recognizer.stop_continuous_recognition_async().get()
+            )
+        finally:
+            if audio_file_path != request.audio_file:
+                os.unlink(audio_file_path)
+
+        return TranscriptionResponse(text=" ".join(complete_transcription))
+
+    def _create_recognizer(self, audio_file_path: str) -> speechsdk.SpeechRecognizer:
+        speech_config = speechsdk.SpeechConfig(
+            subscription=self.speech_key, region=self.service_region
+        )
+        audio_config = speechsdk.audio.AudioConfig(filename=audio_file_path)
+
+        return speechsdk.SpeechRecognizer(
+            speech_config=speech_config, audio_config=audio_config
+        )
+
     def get_name(self) -> str:
         return "Azure Speech Services - Transcription"
 
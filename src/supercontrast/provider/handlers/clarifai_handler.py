@@ -1,16 +1,26 @@
 import os
 import requests
 
-from io import BytesIO
-from PIL import Image
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional, Union
 
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_handler import ProviderHandler
 from supercontrast.task.task_enum import Task
 from supercontrast.task.types.ocr_types import OCRBoundingBox, OCRRequest, OCRResponse
-from supercontrast.utils.image import get_image_size, load_image_data
+from supercontrast.utils.http import (
+    LoopBoundClient,
+    create_async_client,
+    create_async_client_from_config,
+    create_session,
+    create_session_from_config,
+)
+from supercontrast.utils.image import (
+    encode_image,
+    get_image_size,
+    load_image_data,
+    load_image_data_async,
+)
 
 # Constants
 
@@ -70,55 +80,75 @@ class ClarifaiOCR(ProviderHandler):
     model_name = "ocr-scene-english-paddleocr"
     model_version = "46e99516c2d94f58baf2bcaf5a6a53a9"
 
-    def __init__(self, api_key):
+    def __init__(
+        self,
+        api_key,
+        session: Optional[requests.Session] = None,
+        async_client: Optional[LoopBoundClient] = None,
+    ):
         super().__init__(provider=Provider.CLARIFAI, task=Task.OCR)
+        self.session = session or create_session()
+        self.async_client = async_client or create_async_client()
         self.api_key = api_key
         self.base_url = f"https://api.clarifai.com/v2/users/clarifai/apps/main/models/{self.model_name}/versions/{self.model_version}/outputs"
 
-    def get_image_size(self, image):
-        if isinstance(image, str):
-            if image.startswith(("http://", "https://")):
-                response = requests.get(image)
-                img = Image.open(BytesIO(response.content))
-            else:
-                img = Image.open(image)
-        elif isinstance(image, bytes):
-            img = Image.open(BytesIO(image))
-        else:
-            raise ValueError("Unsupported image type")
+    def request(self, request: OCRRequest) -> OCRResponse:
+        image = self._resolve_image(request.image)
+        response = self.session.post(
+            self.base_url, headers=self._get_headers(), json=self._get_payload(image)
+        )
+        response.raise_for_status()
 
-        return img.size
+        result = response.json()
 
-    def request(self, request: OCRRequest) -> OCRResponse:
-        headers = {
+        # Get image size
+        image_size = get_image_size(image)
+
+        return self._parse_response(result, image_size)
+
+    async def request_async(self, request: OCRRequest) -> OCRResponse:
+        image = request.image
+        if not self._is_url(image):
+            image = await load_image_data_async(image)
+        response = await self.async_client.get().post(
+            self.base_url,
+            headers=self._get_headers(),
+            json=self._get_payload(image),
+        )
+        response.raise_for_status()
+
+        result = response.json()
+
+        # Get image size
+        if self._is_url(image):
+            image = await load_image_data_async(image)
+        image_size = get_image_size(image)
+
+        return self._parse_response(result, image_size)
+
+    def _get_headers(self) -> dict:
+        return {
             "Authorization": f"Key {self.api_key}",
             "Content-Type": "application/json",
         }
 
-        payload = {
-            "inputs": [
-                {
-                    "data": {
-                        "image": {
-                            "url": (
-                                request.image
-                                if isinstance(request.image, str)
-                                else None
-                            )
-                        }
-                    }
-                }
-            ]
-        }
+    @staticmethod
+    def _is_url(image: Union[str, bytes]) -> bool:
+        return isinstance(image, str) and image.startswith(("http://", "https://"))
 
-        response = requests.post(self.base_url, headers=headers, json=payload)
-        response.raise_for_status()
+    def _resolve_image(self, image: Union[str, bytes]) -> Union[str, bytes]:
+        # URLs are fetched by Clarifai itself, anything else is sent inline
+        return image if self._is_url(image) else load_image_data(image)
 
-        result = response.json()
-        parsed_response = ClarifaiResponse(**result)
+    def _get_payload(self, image: Union[str, bytes]) -> dict:
+        if isinstance(image, str):
+            image_payload = {"url": image}
+        else:
+            image_payload = {"base64": encode_image(image)}
+        return {"inputs": [{"data": {"image": image_payload}}]}
 
-        # Get image size
-        image_size = get_image_size(request.image)
+    def _parse_response(self, result: dict, image_size) -> OCRResponse:
+        parsed_response = ClarifaiResponse(**result)
 
         text_parts = []
         bounding_boxes = []
@@ -158,8 +188,13 @@ class ClarifaiOCR(ProviderHandler):
         return "Clarifai - OCR"
 
     @classmethod
-    def init_from_env(cls, api_key) -> "ClarifaiOCR":
-        return cls(api_key)
+    def init_from_env(
+        cls,
+        api_key,
+        session: Optional[requests.Session] = None,
+        async_client: Optional[LoopBoundClient] = None,
+    ) -> "ClarifaiOCR":
+        return cls(api_key, session, async_client)
 
 
 # factory
@@ -174,6 +209,10 @@ def clarifai_provider_factory(task: Task, **config) -> ProviderHandler:
     if task not in CLARIFAI_SUPPORTED_TASKS:
         raise ValueError(f"Unsupported task: {task}")
     elif task == Task.OCR:
-        return ClarifaiOCR.init_from_env(api_key)
+        return ClarifaiOCR.init_from_env(
+            api_key,
+            session=create_session_from_config(**config),
+            async_client=create_async_client_from_config(**config),
+        )
     else:
         raise ValueError(f"Unsupported task: {task}")
@@ -2,7 +2,9 @@ import os
 
 from google.cloud import language_v1, translate_v2, vision_v1
 from google.oauth2 import service_account
+from typing import Iterator, List
 
+from supercontrast.provider.client_registry import get_shared_client
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_handler import ProviderHandler
 from supercontrast.task.task_enum import Task
@@ -15,19 +17,48 @@ from supercontrast.task.types.translation_types import (
     TranslationRequest,
     TranslationResponse,
 )
-from supercontrast.utils.image import load_image_data
+from supercontrast.utils.batch import batched
+from supercontrast.utils.http import LoopBoundClient
+from supercontrast.utils.image import load_image_data, load_image_data_async
 
 # Constants
 
 GCP_SUPPORTED_TASKS = [Task.SENTIMENT_ANALYSIS, Task.TRANSLATION, Task.OCR]
 
+
+def get_gcp_credentials():
+    credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+    if not credentials_path:
+        raise EnvironmentError(
+            "GOOGLE_APPLICATION_CREDENTIALS environment variable is not set"
+        )
+    # the key file is parsed once and its credentials refresh tokens for everyone
+    return get_shared_client(
+        Provider.GCP,
+        "credentials",
+        lambda: service_account.Credentials.from_service_account_file(credentials_path),
+        credentials=credentials_path,
+    )
+
+
 # Task.SENTIMENT_ANALYSIS
 
 
 class GCPSentimentAnalysis(ProviderHandler):
+    # a document is limited to 1,000,000 bytes
+    max_request_bytes = 1_000_000
+
     def __init__(self, credentials):
         super().__init__(provider=Provider.GCP, task=Task.SENTIMENT_ANALYSIS)
-        self.client = language_v1.LanguageServiceClient(credentials=credentials)
+        self.client = get_shared_client(
+            Provider.GCP,
+            "language",
+            lambda: language_v1.LanguageServiceClient(credentials=credentials),
+            credentials=id(credentials),
+        )
+        self.async_client = LoopBoundClient(
+            lambda: language_v1.LanguageServiceAsyncClient(credentials=credentials)
+        )
         self.THRESHOLD = 0
 
     def request(self, request: SentimentAnalysisRequest) -> SentimentAnalysisResponse:
@@ -42,19 +73,24 @@ class GCPSentimentAnalysis(ProviderHandler):
 
         return SentimentAnalysisResponse(score=score)
 
+    async def request_async(
+        self, request: SentimentAnalysisRequest
+    ) -> SentimentAnalysisResponse:
+        document = language_v1.Document(
+            content=request.text, type_=language_v1.Document.Type.PLAIN_TEXT
+        )
+        response = await self.async_client.get().analyze_sentiment(
+            request={"document": document}
+        )
+
+        return SentimentAnalysisResponse(score=response.document_sentiment.score)
+
     def get_name(self) -> str:
         return "Google Natural Language - Sentiment Analysis"
 
     @classmethod
     def init_from_env(cls) -> "GCPSentimentAnalysis":
-        credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
-        if not credentials_path:
-            raise EnvironmentError(
-                "GOOGLE_APPLICATION_CREDENTIALS environment variable is not set"
-            )
-        credentials = service_account.Credentials.from_service_account_file(
-            credentials_path
-        )
+        credentials = get_gcp_credentials()
         return cls(credentials)
 
 
@@ -62,9 +98,19 @@ class GCPSentimentAnalysis(ProviderHandler):
 
 
 class GCPTranslation(ProviderHandler):
+    # the v2 API recommends at most 128 text segments and 5000 characters per call
+    max_batch_size = 128
+    max_batch_characters = 5000
+    max_request_bytes = 5000
+
     def __init__(self, credentials, src_language: str, target_language: str):
         super().__init__(provider=Provider.GCP, task=Task.TRANSLATION)
-        self.client = translate_v2.Client(credentials=credentials)
+        self.client = get_shared_client(
+            Provider.GCP,
+            "translate",
+            lambda: translate_v2.Client(credentials=credentials),
+            credentials=id(credentials),
+        )
         self.src_language = src_language
         self.target_language = target_language
 
@@ -78,6 +124,32 @@ class GCPTranslation(ProviderHandler):
 
         return TranslationResponse(text=translated_text)
 
+    def batch_request(
+        self, requests: List[TranslationRequest]
+    ) -> List[TranslationResponse]:
+        responses: List[TranslationResponse] = []
+        for batch in self.get_batches(requests):
+            results = self.client.translate(
+                [request.text for request in batch],
+                source_language=self.src_language,
+                target_language=self.target_language,
+            )
+            responses.extend(
+                TranslationResponse(text=result["translatedText"]) for result in results
+            )
+
+        return responses
+
+    def get_batches(
+        self, requests: List[TranslationRequest]
+    ) -> Iterator[List[TranslationRequest]]:
+        return batched(
+            requests,
+            self.max_batch_size,
+            max_weight=self.max_batch_characters,
+            weight=lambda request: len(request.text),
+        )
+
     def get_name(self) -> str:
         return "Google Translation"
 
@@ -85,14 +157,7 @@ class GCPTranslation(ProviderHandler):
     def init_from_env(
         cls, source_language: str, target_language: str
     ) -> "GCPTranslation":
-        credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
-        if not credentials_path:
-            raise EnvironmentError(
-                "GOOGLE_APPLICATION_CREDENTIALS environment variable is not set"
-            )
-        credentials = service_account.Credentials.from_service_account_file(
-            credentials_path
-        )
+        credentials = get_gcp_credentials()
         return cls(credentials, source_language, target_language)
 
 
@@ -102,7 +167,15 @@ class GCPTranslation(ProviderHandler):
 class GCPOCR(ProviderHandler):
     def __init__(self, credentials):
         super().__init__(provider=Provider.GCP, task=Task.OCR)
-        self.client = vision_v1.ImageAnnotatorClient(credentials=credentials)
+        self.client = get_shared_client(
+            Provider.GCP,
+            "vision",
+            lambda: vision_v1.ImageAnnotatorClient(credentials=credentials),
+            credentials=id(credentials),
+        )
+        self.async_client = LoopBoundClient(
+            lambda: vision_v1.ImageAnnotatorAsyncClient(credentials=credentials)
+        )
 
     def request(self, request: OCRRequest) -> OCRResponse:
         image_data = load_image_data(request.image)
@@ -110,6 +183,32 @@ class GCPOCR(ProviderHandler):
 
         response = self.client.document_text_detection(image=image)  # type: ignore
 
+        return self._parse_response(response)
+
+    async def request_async(self, request: OCRRequest) -> OCRResponse:
+        image_data = await load_image_data_async(request.image)
+        image = vision_v1.Image(content=image_data)
+
+        # the async client has no document_text_detection helper
+        response = await self.async_client.get().batch_annotate_images(
+            requests=[
+                vision_v1.AnnotateImageRequest(
+                    image=image,
+                    features=[
+                        vision_v1.Feature(
+                            type_=vision_v1.Feature.Type.DOCUMENT_TEXT_DETECTION
+                        )
+                    ],
+                )
+            ]
+        )
+        annotation = response.responses[0]
+        if annotation.error.message:
+            raise ValueError(annotation.error.message)
+
+        return self._parse_response(annotation)
+
+    def _parse_response(self, response) -> OCRResponse:
         extracted_text = response.full_text_annotation.text  # type: ignore
 
         bounding_boxes = []
@@ -136,14 +235,7 @@ class GCPOCR(ProviderHandler):
 
     @classmethod
     def init_from_env(cls) -> "GCPOCR":
-        credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
-        if not credentials_path:
-            raise EnvironmentError(
-                "GOOGLE_APPLICATION_CREDENTIALS environment variable is not set"
-            )
-        credentials = service_account.Credentials.from_service_account_file(
-            credentials_path
-        )
+        credentials = get_gcp_credentials()
         return cls(credentials)
 
 
@@ -10,6 +10,13 @@ from supercontrast.task.types.translation_types import (
     TranslationRequest,
     TranslationResponse,
 )
+from supercontrast.utils.http import (
+    LoopBoundClient,
+    create_async_client,
+    create_async_client_from_config,
+    create_session,
+    create_session_from_config,
+)
 
 # Constants
 
@@ -19,8 +26,17 @@ MODERNMT_SUPPORTED_TASKS = [Task.TRANSLATION]
 
 
 class ModernMTTranslation(ProviderHandler):
-    def __init__(self, api_key: str, source_language: str, target_language: str):
+    def __init__(
+        self,
+        api_key: str,
+        source_language: str,
+        target_language: str,
+        session: Optional[requests.Session] = None,
+        async_client: Optional[LoopBoundClient] = None,
+    ):
         super().__init__(provider=Provider.MODERNMT, task=Task.TRANSLATION)
+        self.session = session or create_session()
+        self.async_client = async_client or create_async_client()
         self.__base_url = "https://api.modernmt.com"
         self.__headers = {
             "MMT-ApiKey": api_key,
@@ -31,20 +47,14 @@ class ModernMTTranslation(ProviderHandler):
         self.target_language = target_language
 
     def request(self, request: TranslationRequest) -> TranslationResponse:
-        data = {
-            "source": self.source_language,
-            "target": self.target_language,
-            "q": request.text,
-        }
+        response = self.__send("get", "/translate", data=self.__get_data(request))
+        return self.__parse_response(response)
 
-        response = self.__send("get", "/translate", data=data)
-
-        if isinstance(response, list):
-            translated_text = response[0]["translation"]
-        else:
-            translated_text = response["translation"]
-
-        return TranslationResponse(text=translated_text)
+    async def request_async(self, request: TranslationRequest) -> TranslationResponse:
+        response = await self.__send_async(
+            "get", "/translate", data=self.__get_data(request)
+        )
+        return self.__parse_response(response)
 
     def get_name(self) -> str:
         return "ModernMT Translation"
@@ -57,21 +67,55 @@ class ModernMTTranslation(ProviderHandler):
         headers = self.__headers.copy()
         headers["X-HTTP-Method-Override"] = method
 
-        r = requests.post(url, headers=headers, json=data)
+        r = self.session.post(url, headers=headers, json=data)
+
+        if r.status_code != requests.codes.ok:
+            raise ModernMTException(r.status_code, "TranslationError", r.text)
+
+        return r.json()["data"]
+
+    async def __send_async(
+        self, method: str, endpoint: str, data: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        url = self.__base_url + endpoint
+
+        headers = self.__headers.copy()
+        headers["X-HTTP-Method-Override"] = method
+
+        r = await self.async_client.get().post(url, headers=headers, json=data)
 
         if r.status_code != requests.codes.ok:
             raise ModernMTException(r.status_code, "TranslationError", r.text)
 
         return r.json()["data"]
 
+    def __get_data(self, request: TranslationRequest) -> Dict[str, Any]:
+        return {
+            "source": self.source_language,
+            "target": self.target_language,
+            "q": request.text,
+        }
+
+    def __parse_response(self, response: Any) -> TranslationResponse:
+        if isinstance(response, list):
+            translated_text = response[0]["translation"]
+        else:
+            translated_text = response["translation"]
+
+        return TranslationResponse(text=translated_text)
+
     @classmethod
     def init_from_env(
-        cls, source_language: str, target_language: str
+        cls,
+        source_language: str,
+        target_language: str,
+        session: Optional[requests.Session] = None,
+        async_client: Optional[LoopBoundClient] = None,
     ) -> "ModernMTTranslation":
         api_key = os.environ.get("MODERN_MT_API_KEY")
         if not api_key:
             raise EnvironmentError("MODERN_MT_API_KEY environment variable is not set")
-        return cls(api_key, source_language, target_language)
+        return cls(api_key, source_language, target_language, session, async_client)
 
 
 class ModernMTException(Exception):
@@ -91,6 +135,8 @@ def modernmt_provider_factory(task: Task, **config) -> ProviderHandler:
         return ModernMTTranslation.init_from_env(
             source_language=source_language,
             target_language=target_language,
+            session=create_session_from_config(**config),
+            async_client=create_async_client_from_config(**config),
         )
     else:
         raise ValueError(f"Unsupported task: {task}")
@@ -29,7 +29,7 @@ class OmniAIDocumentReconstruction(ProviderHandler):
                 "OPENAI_API_KEY must be set in the environment or provided"
             )
 
-    async def async_request(
+    async def request_async(
         self, request: DocumentReconstructionRequest
     ) -> DocumentReconstructionResponse:
         result = await zerox(
@@ -46,7 +46,7 @@ class OmniAIDocumentReconstruction(ProviderHandler):
         self, request: DocumentReconstructionRequest
     ) -> DocumentReconstructionResponse:
         loop = asyncio.get_event_loop()
-        return loop.run_until_complete(self.async_request(request))
+        return loop.run_until_complete(self.request_async(request))
 
     def get_name(self) -> str:
         return f"OmniAI Document Reconstruction ({self.model})"
@@ -4,10 +4,21 @@ import pydantic
 from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
-from openai import OpenAI
-
+from openai import AsyncOpenAI, OpenAI
+from typing import Dict, Iterator, List, Optional
+
+from supercontrast.provider.client_registry import get_shared_client
+from supercontrast.provider.prompt_packing import (
+    get_packed_batches,
+    pack_texts,
+    packed_batch_request,
+)
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_handler import ProviderHandler
+from supercontrast.provider.structured_output import (
+    StructuredGenerator,
+    get_structured_output_stats,
+)
 from supercontrast.task.task_enum import Task
 from supercontrast.task.types.ocr_types import OCRRequest, OCRResponse
 from supercontrast.task.types.sentiment_analysis_types import (
@@ -22,7 +33,7 @@ from supercontrast.task.types.translation_types import (
     TranslationRequest,
     TranslationResponse,
 )
-from supercontrast.utils.audio import load_audio_file
+from supercontrast.utils.audio import load_audio_file, load_audio_file_async
 from supercontrast.utils.image import (
     get_image_size,
     load_image_data,
@@ -33,12 +44,31 @@ from supercontrast.utils.text import truncate_text
 # Constants
 
 OPENAI_MODEL_NAME = "gpt-4o"
+OPENAI_TRANSCRIPTION_MODEL_NAME = "whisper-1"
 OPENAI_SUPPORTED_TASKS = [
     # Task.OCR, # TODO: Add back in when request is fixed
     Task.SENTIMENT_ANALYSIS,
     Task.TRANSLATION,
     Task.TRANSCRIPTION,
 ]
+
+
+def get_chat_model() -> ChatOpenAI:
+    # the chat model and its connection pool are shared by every OpenAI handler
+    return get_shared_client(
+        Provider.OPENAI,
+        "chat",
+        lambda: ChatOpenAI(
+            **{
+                "temperature": 0,
+                "model_name": OPENAI_MODEL_NAME,
+            }
+        ),
+        credentials=os.environ.get("OPENAI_API_KEY"),
+        model=OPENAI_MODEL_NAME,
+    )
+
+
 # Task.SENTIMENT_ANALYSIS
 
 
@@ -49,43 +79,103 @@ class SentimentAnalysisOutput(pydantic.BaseModel):
 
 
 SENTIMENT_ANALYSIS_PROMPT = PromptTemplate(
-    template="Analyze the sentiment of the following text. Respond with 1 for positive, 0 for neutral, and -1 for negative:\n\n{text}\n\n{format_instructions}",
+    template="Analyze the sentiment of the following text. Respond with 1 for positive, 0 for neutral, and -1 for negative:\n\n{text}",
     input_variables=["text"],
-    partial_variables={
-        "format_instructions": PydanticOutputParser(
-            pydantic_object=SentimentAnalysisOutput
-        ).get_format_instructions()
-    },
+)
+
+
+class PackedSentimentAnalysisOutput(pydantic.BaseModel):
+    scores: List[float] = pydantic.Field(
+        description="One sentiment score between -1 (very negative) and 1 (very positive) per text, in the order of the texts"
+    )
+
+
+PACKED_SENTIMENT_ANALYSIS_PROMPT = PromptTemplate(
+    template="Analyze the sentiment of each text in the following JSON array. Respond with 1 for positive, 0 for neutral, and -1 for negative, giving exactly one score per text in the same order:\n\n{texts}",
+    input_variables=["texts"],
 )
 
 
 class OpenAISentimentAnalysis(ProviderHandler):
-    def __init__(self):
+    # longer texts are scored in chunks by the task handler
+    max_request_bytes = 5000
+
+    def __init__(self, pack_size: Optional[int] = None):
         super().__init__(provider=Provider.OPENAI, task=Task.SENTIMENT_ANALYSIS)
-        model = ChatOpenAI(
-            **{
-                "temperature": 0,
-                "model_name": OPENAI_MODEL_NAME,
-            }
-        ).bind(response_format={"type": "json_object"})
-        parser = PydanticOutputParser(pydantic_object=SentimentAnalysisOutput)
-        self.generator = SENTIMENT_ANALYSIS_PROMPT | model | parser
+        self.model_name = OPENAI_MODEL_NAME
+        model = get_chat_model()
+        self.generator = StructuredGenerator(
+            SENTIMENT_ANALYSIS_PROMPT,
+            model,
+            SentimentAnalysisOutput,
+            method="json_schema",
+            strict=True,
+        )
+        # with a pack_size, batch_request sends up to pack_size texts per prompt
+        self.max_batch_size = pack_size
+        self.packed_generator = StructuredGenerator(
+            PACKED_SENTIMENT_ANALYSIS_PROMPT,
+            model,
+            PackedSentimentAnalysisOutput,
+            method="json_schema",
+            strict=True,
+        )
 
     def request(self, request: SentimentAnalysisRequest) -> SentimentAnalysisResponse:
         result: SentimentAnalysisOutput = self.generator.invoke(
-            {"text": truncate_text(request.text)}
+            {"text": truncate_text(request.text, self.max_request_bytes)}
+        )
+        return SentimentAnalysisResponse(score=result.score)
+
+    async def request_async(
+        self, request: SentimentAnalysisRequest
+    ) -> SentimentAnalysisResponse:
+        result: SentimentAnalysisOutput = await self.generator.ainvoke(
+            {"text": truncate_text(request.text, self.max_request_bytes)}
         )
         return SentimentAnalysisResponse(score=result.score)
 
+    def batch_request(
+        self, requests: List[SentimentAnalysisRequest]
+    ) -> List[SentimentAnalysisResponse]:
+        return packed_batch_request(
+            requests, self.max_batch_size, self._request_packed, self.request
+        )
+
+    def get_batches(
+        self, requests: List[SentimentAnalysisRequest]
+    ) -> Iterator[List[SentimentAnalysisRequest]]:
+        return get_packed_batches(requests, self.max_batch_size)
+
+    def _request_packed(
+        self, requests: List[SentimentAnalysisRequest]
+    ) -> List[SentimentAnalysisResponse]:
+        result: PackedSentimentAnalysisOutput = self.packed_generator.invoke(
+            {
+                "texts": pack_texts(
+                    [
+                        truncate_text(request.text, self.max_request_bytes)
+                        for request in requests
+                    ]
+                )
+            }
+        )
+        return [SentimentAnalysisResponse(score=score) for score in result.scores]
+
+    def get_structured_output_stats(self) -> Dict[str, int]:
+        return get_structured_output_stats(self.generator, self.packed_generator)
+
     def get_name(self) -> str:
         return "OpenAI - Sentiment Analysis"
 
     @classmethod
-    def init_from_env(cls) -> "OpenAISentimentAnalysis":
+    def init_from_env(
+        cls, pack_size: Optional[int] = None
+    ) -> "OpenAISentimentAnalysis":
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
-        return cls()
+        return cls(pack_size)
 
 
 # Task.TRANSLATION
@@ -96,27 +186,52 @@ class TranslationOutput(pydantic.BaseModel):
 
 
 TRANSLATION_PROMPT = PromptTemplate(
-    template="Translate the following text from {src_language} to {target_language}:\n\n{text}\n\n{format_instructions}",
+    template="Translate the following text from {src_language} to {target_language}:\n\n{text}",
     input_variables=["src_language", "target_language", "text"],
-    partial_variables={
-        "format_instructions": PydanticOutputParser(
-            pydantic_object=TranslationOutput
-        ).get_format_instructions()
-    },
+)
+
+
+class PackedTranslationOutput(pydantic.BaseModel):
+    translations: List[str] = pydantic.Field(
+        description="One translated text per text, in the order of the texts"
+    )
+
+
+PACKED_TRANSLATION_PROMPT = PromptTemplate(
+    template="Translate each text in the following JSON array from {src_language} to {target_language}, giving exactly one translation per text in the same order:\n\n{texts}",
+    input_variables=["src_language", "target_language", "texts"],
 )
 
 
 class OpenAITranslate(ProviderHandler):
-    def __init__(self, src_language: str, target_language: str):
+    # keeps the prompt and the translated output well within the model limits
+    max_request_bytes = 5000
+
+    def __init__(
+        self,
+        src_language: str,
+        target_language: str,
+        pack_size: Optional[int] = None,
+    ):
         super().__init__(provider=Provider.OPENAI, task=Task.TRANSLATION)
-        model = ChatOpenAI(
-            **{
-                "temperature": 0,
-                "model_name": OPENAI_MODEL_NAME,
-            }
-        ).bind(response_format={"type": "json_object"})
-        parser = PydanticOutputParser(pydantic_object=TranslationOutput)
-        self.generator = TRANSLATION_PROMPT | model | parser
+        self.model_name = OPENAI_MODEL_NAME
+        model = get_chat_model()
+        self.generator = StructuredGenerator(
+            TRANSLATION_PROMPT,
+            model,
+            TranslationOutput,
+            method="json_schema",
+            strict=True,
+        )
+        # with a pack_size, batch_request sends up to pack_size texts per prompt
+        self.max_batch_size = pack_size
+        self.packed_generator = StructuredGenerator(
+            PACKED_TRANSLATION_PROMPT,
+            model,
+            PackedTranslationOutput,
+            method="json_schema",
+            strict=True,
+        )
         self.src_language = src_language
         self.target_language = target_language
 
@@ -125,22 +240,67 @@ class OpenAITranslate(ProviderHandler):
             {
                 "src_language": self.src_language,
                 "target_language": self.target_language,
-                "text": truncate_text(request.text),
+                "text": truncate_text(request.text, self.max_request_bytes),
+            }
+        )
+        return TranslationResponse(text=result.translation)
+
+    async def request_async(self, request: TranslationRequest) -> TranslationResponse:
+        result: TranslationOutput = await self.generator.ainvoke(
+            {
+                "src_language": self.src_language,
+                "target_language": self.target_language,
+                "text": truncate_text(request.text, self.max_request_bytes),
             }
         )
         return TranslationResponse(text=result.translation)
 
+    def batch_request(
+        self, requests: List[TranslationRequest]
+    ) -> List[TranslationResponse]:
+        return packed_batch_request(
+            requests, self.max_batch_size, self._request_packed, self.request
+        )
+
+    def get_batches(
+        self, requests: List[TranslationRequest]
+    ) -> Iterator[List[TranslationRequest]]:
+        return get_packed_batches(requests, self.max_batch_size)
+
+    def _request_packed(
+        self, requests: List[TranslationRequest]
+    ) -> List[TranslationResponse]:
+        result: PackedTranslationOutput = self.packed_generator.invoke(
+            {
+                "src_language": self.src_language,
+                "target_language": self.target_language,
+                "texts": pack_texts(
+                    [
+                        truncate_text(request.text, self.max_request_bytes)
+                        for request in requests
+                    ]
+                ),
+            }
+        )
+        return [TranslationResponse(text=text) for text in result.translations]
+
+    def get_structured_output_stats(self) -> Dict[str, int]:
+        return get_structured_output_stats(self.generator, self.packed_generator)
+
     def get_name(self) -> str:
         return "OpenAI - Translate"
 
     @classmethod
     def init_from_env(
-        cls, source_language: str, target_language: str
+        cls,
+        source_language: str,
+        target_language: str,
+        pack_size: Optional[int] = None,
     ) -> "OpenAITranslate":
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
-        return cls(source_language, target_language)
+        return cls(source_language, target_language, pack_size)
 
 
 # Task.OCR
@@ -164,12 +324,8 @@ OCR_PROMPT = PromptTemplate(
 class OpenAIOCR(ProviderHandler):
     def __init__(self):
         super().__init__(provider=Provider.OPENAI, task=Task.OCR)
-        model = ChatOpenAI(
-            **{
-                "temperature": 0,
-                "model_name": OPENAI_MODEL_NAME,
-            }
-        ).bind(response_format={"type": "json_object"})
+        self.model_name = OPENAI_MODEL_NAME
+        model = get_chat_model().bind(response_format={"type": "json_object"})
         parser = PydanticOutputParser(pydantic_object=OCROutput)
         self.generator = OCR_PROMPT | model | parser
 
@@ -206,14 +362,25 @@ class OpenAIOCR(ProviderHandler):
 class OpenAITranscription(ProviderHandler):
     def __init__(self, api_key: str):
         super().__init__(provider=Provider.OPENAI, task=Task.TRANSCRIPTION)
-        self.client = OpenAI(api_key=api_key)
+        self.model_name = OPENAI_TRANSCRIPTION_MODEL_NAME
+        self.client = get_shared_client(
+            Provider.OPENAI, "openai", lambda: OpenAI(api_key=api_key), api_key
+        )
+        self.async_client = get_shared_client(
+            Provider.OPENAI,
+            "openai_async",
+            lambda: AsyncOpenAI(api_key=api_key),
+            api_key,
+        )
 
     def request(self, request: TranscriptionRequest) -> TranscriptionResponse:
         audio_file_path = load_audio_file(request.audio_file)
 
         with open(audio_file_path, "rb") as audio_file:
             transcript = self.client.audio.transcriptions.create(
-                model="whisper-1", file=audio_file, response_format="json"
+                model=OPENAI_TRANSCRIPTION_MODEL_NAME,
+                file=audio_file,
+                response_format="json",
             )
 
         if audio_file_path != request.audio_file:
@@ -221,6 +388,24 @@ class OpenAITranscription(ProviderHandler):
 
         return TranscriptionResponse(text=transcript.text)
 
+    async def request_async(
+        self, request: TranscriptionRequest
+    ) -> TranscriptionResponse:
+        audio_file_path = await load_audio_file_async(request.audio_file)
+
+        try:
+            with open(audio_file_path, "rb") as audio_file:
+                transcript = await self.async_client.audio.transcriptions.create(
+                    model=OPENAI_TRANSCRIPTION_MODEL_NAME,
+                    file=audio_file,
+                    response_format="json",
+                )
+        finally:
+            if audio_file_path != request.audio_file:
+                os.unlink(audio_file_path)
+
+        return TranscriptionResponse(text=transcript.text)
+
     def get_name(self) -> str:
         return "OpenAI Whisper - Transcription"
 
@@ -239,11 +424,17 @@ def openai_provider_factory(task: Task, **config) -> ProviderHandler:
     if task not in OPENAI_SUPPORTED_TASKS:
         raise ValueError(f"Unsupported task: {task}")
     elif task == Task.SENTIMENT_ANALYSIS:
-        return OpenAISentimentAnalysis.init_from_env()
+        return OpenAISentimentAnalysis.init_from_env(
+            pack_size=config.get("prompt_pack_size")
+        )
     elif task == Task.TRANSLATION:
         source_language = config.get("source_language", "en")
         target_language = config.get("target_language", "es")
-        return OpenAITranslate.init_from_env(source_language, target_language)
+        return OpenAITranslate.init_from_env(
+            source_language,
+            target_language,
+            pack_size=config.get("prompt_pack_size"),
+        )
     elif task == Task.OCR:
         return OpenAIOCR.init_from_env()
     elif task == Task.TRANSCRIPTION:
@@ -2,13 +2,21 @@ import os
 import requests
 
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_handler import ProviderHandler
 from supercontrast.task.task_enum import Task
 from supercontrast.task.types.ocr_types import OCRBoundingBox, OCRRequest, OCRResponse
-from supercontrast.utils.image import load_image_data
+from supercontrast.utils.http import (
+    LoopBoundClient,
+    create_async_client,
+    create_async_client_from_config,
+    create_session,
+    create_session_from_config,
+    raise_for_status,
+)
+from supercontrast.utils.image import load_image_data, load_image_data_async
 
 # Constants
 
@@ -33,8 +41,16 @@ class SentisightOCRResult(BaseModel):
 
 
 class SentisightOCR(ProviderHandler):
-    def __init__(self, api_key: str, language: str):
+    def __init__(
+        self,
+        api_key: str,
+        language: str,
+        session: Optional[requests.Session] = None,
+        async_client: Optional[LoopBoundClient] = None,
+    ):
         super().__init__(provider=Provider.SENTISIGHT, task=Task.OCR)
+        self.session = session or create_session()
+        self.async_client = async_client or create_async_client()
         self.key = api_key
         self.language = language
         self.base_url = "https://platform.sentisight.ai/api/pm-predict/"
@@ -42,23 +58,38 @@ class SentisightOCR(ProviderHandler):
     def request(self, request: OCRRequest) -> OCRResponse:
         image_data = load_image_data(request.image)
 
-        url = f"{self.base_url}Text-recognition"
+        response = self.session.post(
+            url=self._get_url(), headers=self._get_headers(), data=image_data
+        )
+
+        raise_for_status(response)
+
+        return self._parse_response(response.json())
+
+    async def request_async(self, request: OCRRequest) -> OCRResponse:
+        image_data = await load_image_data_async(request.image)
 
-        response = requests.post(
-            url=f"{url}?lang={self.language}",
-            headers={
-                "accept": "*/*",
-                "X-Auth-token": self.key,
-                "Content-Type": "application/octet-stream",
-            },
-            data=image_data,
+        response = await self.async_client.get().post(
+            url=self._get_url(), headers=self._get_headers(), content=image_data
         )
 
-        if response.status_code != 200:
-            raise Exception(f"Error: {response.status_code} - {response.text}")
+        raise_for_status(response)
 
+        return self._parse_response(response.json())
+
+    def _get_url(self) -> str:
+        return f"{self.base_url}Text-recognition?lang={self.language}"
+
+    def _get_headers(self) -> dict:
+        return {
+            "accept": "*/*",
+            "X-Auth-token": self.key,
+            "Content-Type": "application/octet-stream",
+        }
+
+    def _parse_response(self, response_json: list) -> OCRResponse:
         response_data: SentisightOCRResult = SentisightOCRResult(
-            segments=[TextSegment(**item) for item in response.json()]
+            segments=[TextSegment(**item) for item in response_json]
         )
 
         text = ""
@@ -81,13 +112,18 @@ class SentisightOCR(ProviderHandler):
         return "Sentisight OCR"
 
     @classmethod
-    def init_from_env(cls, language: str) -> "SentisightOCR":
+    def init_from_env(
+        cls,
+        language: str,
+        session: Optional[requests.Session] = None,
+        async_client: Optional[LoopBoundClient] = None,
+    ) -> "SentisightOCR":
         api_key = os.environ.get("SENTISIGHT_API_TOKEN")
         if not api_key:
             raise EnvironmentError(
                 "SENTISIGHT_API_TOKEN environment variable is not set"
             )
-        return cls(api_key, language)
+        return cls(api_key, language, session, async_client)
 
 
 def sentisight_provider_factory(task: Task, **config) -> ProviderHandler:
@@ -95,6 +131,10 @@ def sentisight_provider_factory(task: Task, **config) -> ProviderHandler:
         raise ValueError(f"Unsupported task: {task}")
     elif task == Task.OCR:
         language = config.get("language", "en")
-        return SentisightOCR.init_from_env(language=language)
+        return SentisightOCR.init_from_env(
+            language=language,
+            session=create_session_from_config(**config),
+            async_client=create_async_client_from_config(**config),
+        )
     else:
         raise ValueError(f"Unsupported task: {task}")
@@ -0,0 +1,82 @@
+import json
+
+from langchain_core.exceptions import OutputParserException
+from typing import Callable, Iterator, List, Optional, TypeVar
+
+from supercontrast.utils.batch import batched
+from supercontrast.utils.text import get_byte_length
+
+# Constants
+
+# total text packed into one prompt, on top of the item count limit
+MAX_PACKED_BYTES = 8000
+
+RequestType = TypeVar("RequestType")
+ResponseType = TypeVar("ResponseType")
+
+
+def pack_texts(texts: List[str]) -> str:
+    return json.dumps(texts, ensure_ascii=False, indent=0)
+
+
+def get_packed_batches(
+    requests: List[RequestType], max_batch_size: Optional[int]
+) -> Iterator[List[RequestType]]:
+    # the groups of requests packed into one prompt each
+    return batched(
+        requests,
+        max_batch_size or 1,
+        max_weight=MAX_PACKED_BYTES,
+        weight=lambda request: get_byte_length(request.text),  # type: ignore
+    )
+
+
+def request_packed(
+    requests: List[RequestType],
+    call_packed: Callable[[List[RequestType]], List[ResponseType]],
+    call_single: Callable[[RequestType], ResponseType],
+) -> List[ResponseType]:
+    # a packed completion that cannot be parsed or returns the wrong number of
+    # results is split in half and retried, down to single-item requests
+    if len(requests) == 1:
+        return [call_single(requests[0])]
+
+    try:
+        responses = call_packed(requests)
+        if len(responses) == len(requests):
+            return responses
+    except OutputParserException:
+        pass
+
+    middle = len(requests) // 2
+    return request_packed(requests[:middle], call_packed, call_single) + (
+        request_packed(requests[middle:], call_packed, call_single)
+    )
+
+
+def packed_batch_request(
+    requests: List[RequestType],
+    max_batch_size: Optional[int],
+    call_packed: Callable[[List[RequestType]], List[ResponseType]],
+    call_single: Callable[[RequestType], ResponseType],
+) -> List[ResponseType]:
+    """
+    Send text requests to an LLM several at a time, each group in one prompt.
+
+    Args:
+        requests (List[RequestType]): Requests with a text field.
+        max_batch_size (Optional[int]): The number of requests per prompt, or
+            None to send every request on its own.
+        call_packed (Callable): Sends a group of requests in one prompt.
+        call_single (Callable): Sends a single request.
+
+    Returns:
+        List[ResponseType]: One response per request, in order.
+    """
+    if max_batch_size is None:
+        return [call_single(request) for request in requests]
+
+    responses: List[ResponseType] = []
+    for batch in get_packed_batches(requests, max_batch_size):
+        responses.extend(request_packed(batch, call_packed, call_single))
+    return responses
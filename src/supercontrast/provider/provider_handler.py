@@ -1,5 +1,22 @@
+import asyncio
+
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+from typing import Any, Dict, Generic, Iterator, List, Optional, TypeVar
+
+from supercontrast.utils.batch import batched
+from supercontrast.utils.http import LoopBoundClient
+
+# Constants
+
+# handler attributes that change the response for the same request
+CACHE_PARAM_ATTRIBUTES = [
+    "src_language",
+    "source_language",
+    "target_language",
+    "language",
+    "model",
+    "model_name",
+]
 
 # generic types
 
@@ -8,6 +25,13 @@ ResponseType = TypeVar("ResponseType")
 
 
 class ProviderHandler(ABC, Generic[RequestType, ResponseType]):
+    # number of requests the provider accepts in one native batch call, None if
+    # the provider has no batch endpoint
+    max_batch_size: Optional[int] = None
+    # number of UTF-8 bytes of text the provider accepts in one request, None if
+    # it has no limit; longer inputs are split into chunks by the task handler
+    max_request_bytes: Optional[int] = None
+
     @abstractmethod
     def __init__(self, provider, task, *args, **kwargs):
         self.provider = provider
@@ -17,13 +41,41 @@ class ProviderHandler(ABC, Generic[RequestType, ResponseType]):
     def request(self, request: RequestType) -> ResponseType:
         raise NotImplementedError("ProviderHandler must implement request method")
 
-    # @abstractmethod
-    # async def request_async(self, request: RequestType) -> ResponseType:
-    #     raise NotImplementedError("Subclass must implement abstract method")
+    async def request_async(self, request: RequestType) -> ResponseType:
+        # fallback for blocking SDKs: run the sync request on the default executor
+        return await asyncio.to_thread(self.request, request)
+
+    def batch_request(self, requests: List[RequestType]) -> List[ResponseType]:
+        # providers with a native batch endpoint override this
+        return [self.request(request) for request in requests]
+
+    def get_batches(self, requests: List[RequestType]) -> Iterator[List[RequestType]]:
+        # the groups batch_request sends in one provider call each, in order
+        return batched(requests, self.max_batch_size or 1)
+
+    def close(self) -> None:
+        # releases the connections pooled by the handler itself; SDK clients from
+        # the client registry are shared and stay open
+        session = getattr(self, "session", None)
+        if session is not None:
+            session.close()
+        async_client = getattr(self, "async_client", None)
+        if isinstance(async_client, LoopBoundClient):
+            async_client.close()
+
+    async def aclose(self) -> None:
+        # closes the async client of the running loop, close() releases the rest
+        async_client = getattr(self, "async_client", None)
+        if isinstance(async_client, LoopBoundClient):
+            await async_client.aclose()
 
-    # @abstractmethod
-    # def batch_request(self, requests: List[RequestType]) -> List[ResponseType]:
-    #     raise NotImplementedError("Subclass must implement abstract method")
+    def get_cache_params(self) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"name": self.get_name()}
+        for attribute in CACHE_PARAM_ATTRIBUTES:
+            value = getattr(self, attribute, None)
+            if isinstance(value, (str, int, float, bool)):
+                params[attribute] = value
+        return params
 
     @abstractmethod
     def get_name(self) -> str:
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+from typing import Optional
+
+# Constants
+
+THROTTLING_STATUS_CODES = {429}
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "ProvisionedThroughputExceededException",
+    "RateLimitExceeded",
+    "ResourceExhausted",
+}
+THROTTLING_NAME_MARKERS = (
+    "throttl",
+    "ratelimit",
+    "toomanyrequests",
+    "resourceexhausted",
+)
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    # status codes live in different places depending on the SDK
+    for attribute in ("status_code", "status", "code"):
+        value = getattr(error, attribute, None)
+        if callable(value):
+            try:
+                value = value()
+            except Exception:
+                value = None
+        value = getattr(value, "value", value)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    Detect throttling across the provider SDKs without importing them.
+
+    Args:
+        error (BaseException): The error raised by a provider handler.
+
+    Returns:
+        bool: True if the provider asked the client to slow down.
+    """
+    if get_status_code(error) in THROTTLING_STATUS_CODES:
+        return True
+
+    # botocore ClientError carries the error code in its response dict
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        if response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+            return True
+
+    # google.api_core, grpc and the OpenAI/Anthropic SDKs name the error class
+    name = type(error).__name__.lower()
+    return any(marker in name for marker in THROTTLING_NAME_MARKERS)
+
+
+class AdaptiveRateLimiter:
+    # token bucket whose refill rate follows AIMD: every success adds
+    # additive_increase requests per second up to max_rate, every throttling
+    # response multiplies the rate by decrease_factor down to min_rate
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        min_rate: float = 0.1,
+        max_rate: Optional[float] = None,
+        additive_increase: Optional[float] = None,
+        decrease_factor: float = 0.5,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.max_rate = max_rate or rate
+        self.min_rate = min(min_rate, rate)
+        self.burst = burst or max(rate, 1.0)
+        self.additive_increase = additive_increase or self.max_rate / 20
+        self.decrease_factor = decrease_factor
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        # take a token now, possibly going into debt, and return the wait that
+        # pays the debt back at the current rate
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            self.tokens -= 1
+            return max(-self.tokens / self.rate, 0.0)
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.rate = min(self.rate + self.additive_increase, self.max_rate)
+
+    def record_throttle(self) -> None:
+        with self.lock:
+            self.rate = max(self.rate * self.decrease_factor, self.min_rate)
+
+    def record_error(self, error: BaseException) -> None:
+        # only throttling slows the limiter down, other errors are the
+        # circuit breaker's concern
+        if is_throttling_error(error):
+            self.record_throttle()
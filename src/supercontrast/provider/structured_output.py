@@ -0,0 +1,90 @@
+import threading
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, Optional, Type
+
+
+class StructuredGenerator:
+    # runs a prompt against a chat model with native structured output (a JSON
+    # schema response format or tool calling) instead of format instructions in
+    # the prompt; a response that does not validate is repaired locally from the
+    # raw message rather than with a second LLM call, and repairs are counted
+    def __init__(
+        self,
+        prompt: Any,
+        model: Any,
+        schema: Type[BaseModel],
+        **structured_output_kwargs,
+    ):
+        self.schema = schema
+        self.chain = prompt | model.with_structured_output(
+            schema, include_raw=True, **structured_output_kwargs
+        )
+        self.parser = PydanticOutputParser(pydantic_object=schema)
+        self.calls = 0
+        self.repairs = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, inputs: Dict[str, Any]) -> Any:
+        return self._parse(self.chain.invoke(inputs))
+
+    async def ainvoke(self, inputs: Dict[str, Any]) -> Any:
+        return self._parse(await self.chain.ainvoke(inputs))
+
+    def _parse(self, result: Dict[str, Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+        parsed = result.get("parsed")
+        if result.get("parsing_error") is None and isinstance(parsed, self.schema):
+            return parsed
+
+        with self._lock:
+            self.repairs += 1
+        repaired = self._repair(result.get("raw"))
+        if repaired is None:
+            with self._lock:
+                self.failures += 1
+            raise OutputParserException(
+                f"Could not parse a {self.schema.__name__} from the model response: "
+                f"{result.get('parsing_error')}"
+            )
+        return repaired
+
+    def _repair(self, raw: Any) -> Optional[BaseModel]:
+        # tool call arguments first, then JSON in the message text
+        for tool_call in getattr(raw, "tool_calls", None) or []:
+            try:
+                return self.schema.model_validate(tool_call.get("args", {}))
+            except ValidationError:
+                pass
+        content = getattr(raw, "content", None)
+        if isinstance(content, list):
+            content = "".join(
+                block.get("text", "") if isinstance(block, dict) else str(block)
+                for block in content
+            )
+        if isinstance(content, str) and content:
+            try:
+                return self.parser.parse(content)
+            except OutputParserException:
+                pass
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "repairs": self.repairs,
+                "failures": self.failures,
+            }
+
+
+def get_structured_output_stats(*generators: StructuredGenerator) -> Dict[str, int]:
+    stats = {"calls": 0, "repairs": 0, "failures": 0}
+    for generator in generators:
+        for key, value in generator.get_stats().items():
+            stats[key] += value
+    return stats
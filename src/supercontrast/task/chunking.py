@@ -0,0 +1,80 @@
+import re
+
+from typing import Any, List, Optional, Tuple
+
+from supercontrast.task.task_enum import Task
+from supercontrast.task.types.sentiment_analysis_types import (
+    SentimentAnalysisResponse,
+)
+from supercontrast.task.types.translation_types import TranslationResponse
+from supercontrast.utils.text import get_byte_length, split_text
+
+# Constants
+
+# tasks whose text requests are split when they exceed a provider's limit
+CHUNKED_TASKS = [Task.SENTIMENT_ANALYSIS, Task.TRANSLATION]
+
+# leading whitespace, text and trailing whitespace of a chunk
+WHITESPACE_PATTERN = re.compile(r"(\s*)(.*?)(\s*)", re.DOTALL)
+
+
+class ChunkedRequest:
+    # a text request split on sentence and paragraph boundaries to fit a
+    # provider's size limit; the whitespace between chunks is kept aside so the
+    # responses can be put back together in order
+    def __init__(
+        self, task: Task, body: Any, max_bytes: int, include_chunk_scores: bool = False
+    ):
+        self.task = task
+        self.include_chunk_scores = include_chunk_scores
+        self.parts: List[Tuple[str, str, str]] = []
+        for chunk in split_text(body.text, max_bytes):
+            match = WHITESPACE_PATTERN.fullmatch(chunk)
+            self.parts.append(match.groups() if match else ("", chunk, ""))
+        self.bodies = [
+            body.model_copy(update={"text": text}) for _, text, _ in self.parts if text
+        ]
+
+    def merge(self, responses: List[Any]) -> Any:
+        if len(responses) != len(self.bodies):
+            raise ValueError(
+                f"Expected {len(self.bodies)} chunk responses, got {len(responses)}"
+            )
+
+        if self.task == Task.SENTIMENT_ANALYSIS:
+            # longer chunks carry more of the document, so they weigh more
+            scores = [response.score for response in responses]
+            weights = [get_byte_length(body.text) for body in self.bodies]
+            return SentimentAnalysisResponse(
+                score=sum(score * weight for score, weight in zip(scores, weights))
+                / sum(weights),
+                chunk_scores=scores if self.include_chunk_scores else None,
+            )
+        elif self.task == Task.TRANSLATION:
+            response_texts = iter(response.text.strip() for response in responses)
+            return TranslationResponse(
+                text="".join(
+                    leading + (next(response_texts) if text else "") + trailing
+                    for leading, text, trailing in self.parts
+                )
+            )
+        else:
+            raise ValueError(f"Unsupported chunked task: {self.task}")
+
+
+def chunk_request(
+    task: Task,
+    body: Any,
+    max_bytes: Optional[int],
+    include_chunk_scores: bool = False,
+) -> Optional[ChunkedRequest]:
+    # None when the body fits in a single request
+    text = getattr(body, "text", None)
+    if (
+        task not in CHUNKED_TASKS
+        or max_bytes is None
+        or not isinstance(text, str)
+        or get_byte_length(text) <= max_bytes
+    ):
+        return None
+    return ChunkedRequest(task, body, max_bytes, include_chunk_scores)
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class RequestMode(Enum):
+    SINGLE = "single"
+    RACE = "race"
+    HEDGE = "hedge"
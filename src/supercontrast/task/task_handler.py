@@ -1,21 +1,66 @@
+import asyncio
+import threading
 import time
 
 from abc import ABC
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    ContextManager,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
+from supercontrast.cache.cache_factory import cache_factory
+from supercontrast.cache.cache_utils import (
+    deserialize_response,
+    get_cache_key,
+    serialize_response,
+)
+from supercontrast.metrics.metrics_enum import Metric
 from supercontrast.metrics.metrics_factory import metrics_factory
+from supercontrast.optimizer.circuit_breaker import CircuitOpenError
 from supercontrast.optimizer.optimizer_enum import Optimizer
 from supercontrast.optimizer.optimizer_factory import optimizer_factory
+from supercontrast.optimizer.pricing import estimate_cost
+from supercontrast.optimizer.quality import quality_score
 from supercontrast.provider.provider_enum import Provider
 from supercontrast.provider.provider_factory import provider_factory
+from supercontrast.provider.rate_limiter import AdaptiveRateLimiter
+from supercontrast.task.chunking import ChunkedRequest, chunk_request
+from supercontrast.task.request_mode_enum import RequestMode
 from supercontrast.task.task_enum import Task
 from supercontrast.task.task_metadata import TaskMetadata
+from supercontrast.utils.batch_coalescer import BatchCoalescer
+from supercontrast.utils.media import MediaRegistry
+from supercontrast.utils.single_flight import SingleFlight
 
 RequestType = TypeVar("RequestType")
 ResponseType = TypeVar("ResponseType")
 
 
+class RequestTimeoutError(TimeoutError):
+    # raised when a provider call exceeds request_timeout, as opposed to a
+    # TimeoutError raised by the provider SDK itself
+    pass
+
+
 class TaskHandler(ABC, Generic[RequestType, ResponseType]):
     def __init__(
         self,
@@ -30,59 +75,1187 @@ class TaskHandler(ABC, Generic[RequestType, ResponseType]):
             for provider in providers
         }
         self.metrics_handler = metrics_factory(task=task)
+        # metrics calculated against a reference, every supported one if None;
+        # a request can pass its own selection
+        self.metrics: Optional[List[Metric]] = config.get("metrics")
         self.optimizer_handler = optimizer_factory(
-            task=task, providers=providers, optimizer=optimizer
+            task=task, providers=providers, optimizer=optimizer, **config
+        )
+
+        # long-lived worker pools, one per provider so a slow provider cannot
+        # starve the others; created lazily and released by close()
+        self.max_workers: Optional[int] = config.get("max_workers")
+        self.provider_max_workers: Dict[Provider, int] = config.get(
+            "provider_max_workers", {}
+        )
+        self._executors: Dict[Provider, ThreadPoolExecutor] = {}
+        self._executors_lock = threading.Lock()
+        self._closed = False
+
+        # default request mode and hedging policy: a backup request is sent to
+        # the next-best provider once the primary exceeds its latency percentile,
+        # for at most hedge_budget of all hedge-mode requests
+        self.request_mode = RequestMode(config.get("request_mode", RequestMode.SINGLE))
+        self.hedge_percentile: float = config.get("hedge_percentile", 95)
+        self.hedge_budget: float = config.get("hedge_budget", 0.05)
+        self.hedge_min_samples: int = config.get("hedge_min_samples", 20)
+        self._hedge_candidates = 0
+        self._hedged_requests = 0
+        self._hedge_lock = threading.Lock()
+
+        self.pricing = config.get("pricing")
+
+        # with no explicit provider a failed request fails over to the next
+        # healthy provider; request_timeout bounds a single provider call
+        self.failover: bool = config.get("failover", True)
+        self.request_timeout: Optional[float] = config.get("request_timeout")
+        self._timeout_executors: Dict[Provider, ThreadPoolExecutor] = {}
+
+        # text longer than a provider's max_request_bytes is split on sentence
+        # and paragraph boundaries, sent in parallel and reassembled in order
+        self.chunk_long_inputs: bool = config.get("chunk_long_inputs", True)
+        # chunked sentiment is the length-weighted mean of the chunk scores,
+        # chunk_scores=True also returns the score of every chunk
+        self.chunk_scores: bool = config.get("chunk_scores", False)
+        self._chunk_executor: Optional[ThreadPoolExecutor] = None
+
+        # optional response cache: cache="memory" or cache="disk" (cache_path,
+        # cache_read_only) with cache_max_bytes and cache_ttl; keys cover the
+        # body, with media hashed by content, the provider and its settings
+        self.cache = cache_factory(**config)
+        self.cache_content_hash: bool = config.get("cache_content_hash", True)
+
+        # media referenced by URL or path is resolved once per fan-out and
+        # shared by every provider in it
+        self.media_registry = MediaRegistry()
+
+        # opt-in coalescing of identical concurrent requests, independent of the
+        # response cache
+        self.single_flight = (
+            SingleFlight() if config.get("coalesce_requests", False) else None
         )
 
+        # optional client-side rate limits in requests per second, e.g.
+        # rate_limits={Provider.AWS: 20}; they adapt to throttling responses
+        self.rate_limiters: Dict[Provider, AdaptiveRateLimiter] = {
+            provider: AdaptiveRateLimiter(
+                rate,
+                burst=config.get("rate_limit_burst"),
+                min_rate=config.get("rate_limit_min_rate", 0.1),
+            )
+            for provider, rate in config.get("rate_limits", {}).items()
+            if provider in self.provider_handler_map
+        }
+
+        # opt-in micro-batching: single requests to a provider with a batch
+        # endpoint are held for batch_window seconds, or until batch_max_size
+        # of them are waiting, and sent as one batch call
+        self.coalescers: Dict[Provider, BatchCoalescer] = {}
+        if config.get("coalesce_batches", False):
+            for provider, provider_handler in self.provider_handler_map.items():
+                if provider_handler.max_batch_size is None:
+                    continue
+                self.coalescers[provider] = BatchCoalescer(
+                    lambda bodies, provider=provider: self._call_provider_once(
+                        provider, bodies, batch=True
+                    )[0],
+                    call_single=lambda body, provider=provider: (
+                        self._call_provider_once(provider, body)[0]
+                    ),
+                    max_batch_size=min(
+                        config.get("batch_max_size", provider_handler.max_batch_size),
+                        provider_handler.max_batch_size,
+                    ),
+                    max_wait=config.get("batch_window", 0.005),
+                    name=f"supercontrast-batch-{provider.value.lower()}",
+                )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self, wait: bool = True) -> None:
+        # async clients have to be closed on the loop that made them
+        for provider_handler in self.provider_handler_map.values():
+            await provider_handler.aclose()
+        await asyncio.to_thread(self.close, wait)
+
+    def close(self, wait: bool = True) -> None:
+        for coalescer in self.coalescers.values():
+            coalescer.close()
+        with self._executors_lock:
+            self._closed = True
+            executors = list(self._executors.values())
+            executors.extend(self._timeout_executors.values())
+            self._executors.clear()
+            self._timeout_executors.clear()
+        if self._chunk_executor is not None:
+            executors.append(self._chunk_executor)
+            self._chunk_executor = None
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+        for provider_handler in self.provider_handler_map.values():
+            provider_handler.close()
+        self.optimizer_handler.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _get_executor(self, provider: Provider) -> ThreadPoolExecutor:
+        with self._executors_lock:
+            if self._closed:
+                raise RuntimeError("TaskHandler is closed")
+            if provider not in self._executors:
+                self._executors[provider] = ThreadPoolExecutor(
+                    max_workers=self.provider_max_workers.get(
+                        provider, self.max_workers
+                    ),
+                    thread_name_prefix=f"supercontrast-{provider.value.lower()}",
+                )
+            return self._executors[provider]
+
+    def _get_timeout_executor(self, provider: Provider) -> ThreadPoolExecutor:
+        # calls that time out keep their thread until the SDK gives up, so they
+        # run on a separate pool per provider: a hung provider only fills its own
+        with self._executors_lock:
+            if self._closed:
+                raise RuntimeError("TaskHandler is closed")
+            if provider not in self._timeout_executors:
+                self._timeout_executors[provider] = ThreadPoolExecutor(
+                    max_workers=self.provider_max_workers.get(
+                        provider, self.max_workers
+                    ),
+                    thread_name_prefix=f"supercontrast-timeout-{provider.value.lower()}",
+                )
+            return self._timeout_executors[provider]
+
+    def _get_chunk_executor(self) -> ThreadPoolExecutor:
+        # chunk calls may be issued from a provider pool worker, so they run on
+        # their own pool to avoid waiting on the pool they were submitted from
+        with self._executors_lock:
+            if self._closed:
+                raise RuntimeError("TaskHandler is closed")
+            if self._chunk_executor is None:
+                self._chunk_executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="supercontrast-chunk",
+                )
+            return self._chunk_executor
+
     def request(
         self,
         body: RequestType,
         provider: Optional[Provider] = None,
         reference: Optional[ResponseType] = None,
+        mode: Optional[RequestMode | str] = None,
+        providers: Optional[List[Provider]] = None,
+        metrics: Optional[List[Metric]] = None,
     ) -> Tuple[ResponseType, TaskMetadata]:
+        mode = RequestMode(mode) if mode is not None else self.request_mode
+        if self.single_flight is None:
+            return self._request_mode(
+                body, provider, reference, mode, providers, metrics
+            )
+
+        (response, metadata), shared = self.single_flight.do(
+            self._get_flight_key(body, provider, reference, metrics, mode, providers),
+            lambda: self._request_mode(
+                body, provider, reference, mode, providers, metrics
+            ),
+        )
+        if shared:
+            metadata = metadata.model_copy(update={"shared": True})
+        return response, metadata
+
+    def _request_mode(
+        self,
+        body: RequestType,
+        provider: Optional[Provider],
+        reference: Optional[ResponseType],
+        mode: RequestMode,
+        providers: Optional[List[Provider]],
+        metrics: Optional[List[Metric]],
+    ) -> Tuple[ResponseType, TaskMetadata]:
+        if mode == RequestMode.RACE:
+            with self._materialized(body, audio=False) as body:
+                return self._race(
+                    body,
+                    providers or list(self.provider_handler_map),
+                    reference,
+                    metrics,
+                )
+        if mode == RequestMode.HEDGE:
+            with self._materialized(body, audio=False) as body:
+                return self._hedge(body, provider, reference, metrics)
+        return self._request_single(body, provider, reference, metrics)
+
+    def _get_flight_key(
+        self,
+        body: RequestType,
+        provider: Optional[Provider],
+        reference: Optional[ResponseType],
+        metrics: Optional[List[Metric]] = None,
+        mode: RequestMode = RequestMode.SINGLE,
+        providers: Optional[List[Provider]] = None,
+    ) -> str:
+        return get_cache_key(
+            self.task,
+            provider,
+            {
+                "mode": mode.value,
+                "providers": (
+                    [Provider(p).value for p in providers]
+                    if providers is not None
+                    else None
+                ),
+                "reference": reference.model_dump() if reference is not None else None,  # type: ignore
+                "metrics": (
+                    [Metric(metric).value for metric in metrics]
+                    if metrics is not None
+                    else None
+                ),
+            },
+            body,  # type: ignore
+            content_hash=False,
+        )
+
+    def _request_single(
+        self,
+        body: RequestType,
+        provider: Optional[Provider] = None,
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Tuple[ResponseType, TaskMetadata]:
+        with self._materialized_for_cache(body) as body:
+            if provider is None:
+                provider, response, latency, cache_hit = self._call_with_failover(body)
+            else:
+                response, latency, cache_hit = self._call_cached(provider, body)
+
+            return response, self._create_metadata(
+                provider, latency, response, reference, body, cache_hit, metrics
+            )
+
+    def _call_with_failover(
+        self, body: RequestType, providers: Optional[List[Provider]] = None
+    ) -> Tuple[Provider, ResponseType, float, bool]:
+        last_error: Optional[Exception] = None
+        for provider in providers or self.optimizer_handler.select_providers(body):
+            try:
+                response, latency, cache_hit = self._call_cached(provider, body)
+                return provider, response, latency, cache_hit
+            except Exception as e:
+                if not self.failover:
+                    raise
+                last_error = e
+
+        raise RuntimeError(f"All providers failed: {last_error}") from last_error
+
+    def _get_cache_key(self, provider: Provider, body: RequestType) -> str:
+        params = self.provider_handler_map[provider].get_cache_params()
+        # only non-default settings are added, so existing keys stay valid
+        if self.chunk_scores:
+            params["chunk_scores"] = True
+        if not self.chunk_long_inputs:
+            # long inputs are truncated by the provider instead of chunked
+            params["chunk_long_inputs"] = False
+        return get_cache_key(
+            self.task,
+            provider,
+            params,
+            body,  # type: ignore
+            content_hash=self.cache_content_hash,
+        )
+
+    def _get_cached(
+        self, provider: Provider, body: RequestType
+    ) -> Tuple[Optional[str], Optional[ResponseType]]:
+        if self.cache is None:
+            return None, None
+        key = self._get_cache_key(provider, body)
+        value = self.cache.get(key)
+        if value is None:
+            return key, None
+        return key, deserialize_response(self.task, value)  # type: ignore
+
+    def _set_cached(self, key: Optional[str], response: ResponseType) -> None:
+        if self.cache is not None and key is not None:
+            self.cache.set(key, serialize_response(response))  # type: ignore
+
+    def _call_cached(
+        self, provider: Provider, body: RequestType
+    ) -> Tuple[ResponseType, float, bool]:
+        start_time = time.time()
+        key, cached = self._get_cached(provider, body)
+        if cached is not None:
+            return cached, time.time() - start_time, True
+
+        response, latency = self._call_provider(provider, body)
+        self._set_cached(key, response)
+        return response, latency, False
+
+    def _get_chunked_request(
+        self, provider: Provider, body: RequestType
+    ) -> Optional[ChunkedRequest]:
+        if not self.chunk_long_inputs:
+            return None
+        return chunk_request(
+            self.task,
+            body,
+            self.provider_handler_map[provider].max_request_bytes,
+            self.chunk_scores,
+        )
+
+    def _get_chunk_groups(
+        self, provider: Provider, chunked_request: ChunkedRequest
+    ) -> List[List[RequestType]]:
+        # providers with a native batch endpoint get their chunks in batch calls
+        return list(
+            self.provider_handler_map[provider].get_batches(chunked_request.bodies)
+        )
+
+    def _call_provider(
+        self, provider: Provider, body: RequestType
+    ) -> Tuple[ResponseType, float]:
+        chunked_request = self._get_chunked_request(provider, body)
+        if chunked_request is None and provider in self.coalescers:
+            start_time = time.time()
+            response = self.coalescers[provider].submit(body).result()
+            return response, time.time() - start_time
+        if chunked_request is None:
+            return self._call_provider_once(provider, body)
+
+        start_time = time.time()
+        futures = [
+            self._get_chunk_executor().submit(self._call_chunk_group, provider, bodies)
+            for bodies in self._get_chunk_groups(provider, chunked_request)
+        ]
+        try:
+            responses = [response for future in futures for response in future.result()]
+        finally:
+            for future in futures:
+                future.cancel()
+        return chunked_request.merge(responses), time.time() - start_time
+
+    def _call_chunk_group(
+        self, provider: Provider, bodies: List[RequestType]
+    ) -> List[ResponseType]:
+        if len(bodies) == 1:
+            return [self._call_provider_once(provider, bodies[0])[0]]
+        responses, _ = self._call_provider_once(provider, bodies, batch=True)
+        return responses
+
+    def _call_provider_once(
+        self, provider: Provider, body: Any, batch: bool = False
+    ) -> Tuple[Any, float]:
+        # with batch=True body is a list of bodies sent in one batch call
+        provider_handler = self.provider_handler_map[provider]
+        call = provider_handler.batch_request if batch else provider_handler.request
+        # wait for the rate limiter first, so a half-open probe slot is only
+        # taken once the call is about to be sent
+        rate_limiter = self.rate_limiters.get(provider)
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        if not self.optimizer_handler.acquire(provider):
+            raise CircuitOpenError(f"Circuit breaker for {provider} is open")
+
+        start_time = time.time()
+        try:
+            if self.request_timeout is None:
+                response = call(body)
+            else:
+                response, start_time = self._call_with_timeout(provider, call, body)
+        except RequestTimeoutError:
+            self.optimizer_handler.record_error(provider)
+            raise
+        except Exception as e:
+            self._record_error(provider, e)
+            raise
+        latency = time.time() - start_time
+        # the latency of a multi-item batch would skew the per-request latency
+        # the optimizer and hedge delay work from
+        single = not batch or len(body) == 1
+        self._record_success(provider, latency if single else None)
+        return response, latency
+
+    def _call_with_timeout(
+        self, provider: Provider, call: Any, body: Any
+    ) -> Tuple[Any, float]:
+        # the timeout runs from when the call starts, not from when it was queued;
+        # a call still queued after request_timeout is cancelled so it is never
+        # sent, a running one is abandoned as threads cannot be interrupted
+        started = threading.Event()
+        start_times: List[float] = []
+
+        def run() -> Any:
+            start_times.append(time.time())
+            started.set()
+            return call(body)
+
+        future = self._get_timeout_executor(provider).submit(run)
+        if not started.wait(self.request_timeout) and future.cancel():
+            raise self._timeout_error(provider)
+        started.wait()
+        remaining = self.request_timeout - (time.time() - start_times[0])  # type: ignore
+        # wait() rather than result(timeout=...), which raises the same
+        # TimeoutError as a provider that times out on its own
+        done, _ = wait([future], timeout=max(remaining, 0))
+        if not done:
+            future.cancel()
+            raise self._timeout_error(provider)
+        return future.result(), start_times[0]
+
+    def _timeout_error(self, provider: Provider) -> RequestTimeoutError:
+        return RequestTimeoutError(
+            f"Provider {provider} timed out after {self.request_timeout}s"
+        )
+
+    def _record_success(self, provider: Provider, latency: Optional[float]) -> None:
+        self.optimizer_handler.record_success(provider, latency)
+        if provider in self.rate_limiters:
+            self.rate_limiters[provider].record_success()
+
+    def _record_error(self, provider: Provider, error: Exception) -> None:
+        self.optimizer_handler.record_error(provider)
+        if provider in self.rate_limiters:
+            self.rate_limiters[provider].record_error(error)
+
+    def _first_success(
+        self, futures: List[Future]
+    ) -> Tuple[Provider, ResponseType, float, bool]:
+        # the first future to succeed wins; the others are cancelled if they have
+        # not started yet and abandoned otherwise
+        last_error: Optional[Exception] = None
+        try:
+            for future in as_completed(futures):
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+        finally:
+            for future in futures:
+                future.cancel()
+
+        raise RuntimeError(f"All providers failed: {last_error}") from last_error
+
+    def _submit(
+        self, provider: Provider, body: RequestType, inline: bool = False
+    ) -> Future:
+        def run() -> Tuple[Provider, ResponseType, float, bool]:
+            response, latency, cache_hit = self._call_cached(provider, body)
+            return provider, response, latency, cache_hit
+
+        if not inline:
+            return self._get_executor(provider).submit(run)
+
+        # a call with nothing to race against runs on the calling thread instead
+        # of blocking it on a provider pool the caller may itself be running on
+        future: Future = Future()
+        try:
+            future.set_result(run())
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _race(
+        self,
+        body: RequestType,
+        providers: List[Provider],
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Tuple[ResponseType, TaskMetadata]:
+        futures = [
+            self._submit(provider, body, inline=len(providers) == 1)
+            for provider in providers
+        ]
+        provider, response, latency, cache_hit = self._first_success(futures)
+        return response, self._create_metadata(
+            provider, latency, response, reference, body, cache_hit, metrics
+        )
+
+    def _get_hedge_delay(self, provider: Provider) -> Optional[float]:
+        # hedge only once the primary has enough samples and the budget allows it
+        stats = self.optimizer_handler.stats.get(provider)
+        if stats is None or stats.samples < self.hedge_min_samples:
+            return None
+        with self._hedge_lock:
+            if self._hedged_requests >= self.hedge_budget * self._hedge_candidates:
+                return None
+        return stats.latency_percentile(self.hedge_percentile)
+
+    def _hedge(
+        self,
+        body: RequestType,
+        provider: Optional[Provider] = None,
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Tuple[ResponseType, TaskMetadata]:
+        ranked = self.optimizer_handler.select_providers(body)
+        primary = provider or ranked[0]
+        candidates = [primary] + [c for c in ranked if c != primary]
+
+        with self._hedge_lock:
+            self._hedge_candidates += 1
+
+        delay = self._get_hedge_delay(primary) if len(candidates) > 1 else None
+        hedged = False
+        if delay is None:
+            # with nothing to hedge, candidates are tried in turn on the calling
+            # thread instead of blocking it on a provider pool
+            winner, response, latency, cache_hit = self._call_with_failover(
+                body, candidates if self.failover else [primary]
+            )
+        else:
+            (winner, response, latency, cache_hit), hedged = self._hedge_calls(
+                body, candidates, delay
+            )
+
+        metadata = self._create_metadata(
+            winner, latency, response, reference, body, cache_hit, metrics
+        )
+        metadata.hedged = hedged
+        return response, metadata
+
+    def _hedge_calls(
+        self, body: RequestType, candidates: List[Provider], delay: float
+    ) -> Tuple[Tuple[Provider, ResponseType, float, bool], bool]:
+        # a backup joins once the primary outlives the delay; a call that fails
+        # hands over to the next candidate straight away
+        backups = iter(candidates[1:])
+        futures = {self._submit(candidates[0], body)}
+        waiting, hedged = True, False
+        last_error: Optional[Exception] = None
+        try:
+            while futures:
+                done, futures = wait(
+                    futures,
+                    timeout=delay if waiting else None,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    try:
+                        return future.result(), hedged
+                    except Exception as e:
+                        last_error = e
+
+                backup = None
+                if not done:
+                    waiting = False
+                    backup = next(backups, None)
+                    if backup is not None:
+                        hedged = True
+                        with self._hedge_lock:
+                            self._hedged_requests += 1
+                elif self.failover:
+                    backup = next(backups, None)
+                if backup is not None:
+                    futures.add(self._submit(backup, body))
+        finally:
+            for future in futures:
+                future.cancel()
+
+        raise RuntimeError(f"All providers failed: {last_error}") from last_error
+
+    def batch_request(
+        self,
+        bodies: List[RequestType],
+        provider: Optional[Provider] = None,
+        references: Optional[List[ResponseType]] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> List[Tuple[Optional[ResponseType], TaskMetadata]]:
+        if references is not None and len(references) != len(bodies):
+            raise ValueError("references must have the same length as bodies")
         if provider is None:
-            provider = self.optimizer_handler.get_provider()
+            provider = self.optimizer_handler.select_providers(
+                bodies[0] if bodies else None
+            )[0]
+
+        # one provider call per batch the handler would send, each going through
+        # the circuit breaker, the rate limiter and the request timeout; the items
+        # of a failed batch are sent one by one, so an error only costs the item
+        # it belongs to
+        results: List[Tuple[Optional[ResponseType], float, Optional[Exception]]] = []
+        for batch in self.provider_handler_map[provider].get_batches(bodies):
+            start_time = time.time()
+            try:
+                batch_responses, latency = self._call_provider_once(
+                    provider, batch, batch=True
+                )
+                if len(batch_responses) != len(batch):
+                    raise ValueError(
+                        f"Provider {provider} returned {len(batch_responses)} "
+                        f"responses for {len(batch)} requests"
+                    )
+            except Exception as e:
+                if len(batch) == 1:
+                    results.append((None, time.time() - start_time, e))
+                else:
+                    results.extend(self._call_item(provider, body) for body in batch)
+                continue
+            results.extend((response, latency, None) for response in batch_responses)
+
+        # latency is the wall time of the call that served the item; a failed item
+        # gets a None response and metadata.error, as in request_many
+        items: List[Tuple[Optional[ResponseType], TaskMetadata]] = []
+        for i, (response, latency, error) in enumerate(results):
+            if error is not None:
+                metadata = TaskMetadata(
+                    task=self.task,
+                    provider=provider,
+                    latency=latency,
+                    error=f"{type(error).__name__}: {error}",
+                )
+                items.append((None, metadata))
+                continue
+            metadata = self._create_metadata(
+                provider,
+                latency,
+                response,
+                references[i] if references is not None else None,
+                bodies[i],
+                metrics=metrics,
+            )
+            items.append((response, metadata))
+        return items
+
+    def _call_item(
+        self, provider: Provider, body: RequestType
+    ) -> Tuple[Optional[ResponseType], float, Optional[Exception]]:
+        start_time = time.time()
+        try:
+            response, latency = self._call_provider_once(provider, body)
+        except Exception as e:
+            return None, time.time() - start_time, e
+        return response, latency, None
+
+    def request_many(
+        self,
+        bodies: Iterable[RequestType],
+        concurrency: int = 8,
+        ordered: bool = False,
+        provider: Optional[Provider] = None,
+    ) -> Iterator[Tuple[int, Optional[ResponseType], TaskMetadata]]:
+        """
+        Stream requests through the providers with bounded concurrency.
+
+        Bodies are pulled lazily from the iterable and at most `concurrency` of
+        them are in flight or waiting to be yielded at any time, so memory stays
+        flat regardless of input size. A failed item is yielded with a `None`
+        response and `metadata.error` set instead of stopping the stream.
 
+        Args:
+            bodies (Iterable[RequestType]): The request bodies, consumed lazily.
+            concurrency (int): The maximum number of outstanding requests.
+            ordered (bool): Yield results in input order instead of completion order.
+            provider (Optional[Provider]): Force a provider instead of the optimizer.
+
+        Returns:
+            Iterator[Tuple[int, Optional[ResponseType], TaskMetadata]]: The input
+            index, the response and its metadata for every body.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        def run(index: int, body: RequestType):
+            start_time = time.time()
+            try:
+                response, metadata = self.request(body, provider=provider)
+            except Exception as e:
+                metadata = TaskMetadata(
+                    task=self.task,
+                    provider=provider or self.optimizer_handler.get_provider(body),
+                    latency=time.time() - start_time,
+                    error=f"{type(e).__name__}: {e}",
+                )
+                return index, None, metadata
+            return index, response, metadata
+
+        body_iterator = enumerate(bodies)
+        exhausted = False
+        in_flight = set()
+        completed: Dict[int, Tuple[int, Optional[ResponseType], TaskMetadata]] = {}
+        next_index = 0
+        # items run on a pool of their own: request() picks the provider, and
+        # race and hedge modes wait on the provider pools from these workers
+        with self._executors_lock:
+            if self._closed:
+                raise RuntimeError("TaskHandler is closed")
+        executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="supercontrast-stream"
+        )
+
+        try:
+            while True:
+                # completed-but-unyielded results count against the bound too
+                while not exhausted and len(in_flight) + len(completed) < concurrency:
+                    try:
+                        index, body = next(body_iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight.add(executor.submit(run, index, body))
+
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if not ordered:
+                        yield result
+                    else:
+                        completed[result[0]] = result
+
+                while next_index in completed:
+                    yield completed.pop(next_index)
+                    next_index += 1
+        finally:
+            # if the stream was abandoned, whatever has not started is dropped
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def arequest(
+        self,
+        body: RequestType,
+        provider: Optional[Provider] = None,
+        reference: Optional[ResponseType] = None,
+        mode: Optional[RequestMode | str] = None,
+        providers: Optional[List[Provider]] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Tuple[ResponseType, TaskMetadata]:
+        mode = RequestMode(mode) if mode is not None else self.request_mode
+        if self.single_flight is None:
+            return await self._arequest_mode(
+                body, provider, reference, mode, providers, metrics
+            )
+
+        (response, metadata), shared = await self.single_flight.ado(
+            self._get_flight_key(body, provider, reference, metrics, mode, providers),
+            lambda: self._arequest_mode(
+                body, provider, reference, mode, providers, metrics
+            ),
+        )
+        if shared:
+            metadata = metadata.model_copy(update={"shared": True})
+        return response, metadata
+
+    async def _arequest_mode(
+        self,
+        body: RequestType,
+        provider: Optional[Provider],
+        reference: Optional[ResponseType],
+        mode: RequestMode,
+        providers: Optional[List[Provider]],
+        metrics: Optional[List[Metric]],
+    ) -> Tuple[ResponseType, TaskMetadata]:
+        if mode == RequestMode.RACE:
+            async with self._amaterialized(body, audio=False) as body:
+                return await self._arace(
+                    body,
+                    providers or list(self.provider_handler_map),
+                    reference,
+                    metrics,
+                )
+        if mode == RequestMode.HEDGE:
+            async with self._amaterialized(body, audio=False) as body:
+                return await self._ahedge(body, provider, reference, metrics)
+        return await self._arequest_single(body, provider, reference, metrics)
+
+    async def _arequest_single(
+        self,
+        body: RequestType,
+        provider: Optional[Provider] = None,
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Tuple[ResponseType, TaskMetadata]:
+        async with self._amaterialized_for_cache(body) as body:
+            if provider is None:
+                provider, response, latency, cache_hit = (
+                    await self._acall_with_failover(body)
+                )
+            else:
+                response, latency, cache_hit = await self._acall_cached(provider, body)
+
+            return response, self._create_metadata(
+                provider, latency, response, reference, body, cache_hit, metrics
+            )
+
+    async def _acall_with_failover(
+        self, body: RequestType, providers: Optional[List[Provider]] = None
+    ) -> Tuple[Provider, ResponseType, float, bool]:
+        last_error: Optional[Exception] = None
+        for provider in providers or self.optimizer_handler.select_providers(body):
+            try:
+                response, latency, cache_hit = await self._acall_cached(provider, body)
+                return provider, response, latency, cache_hit
+            except Exception as e:
+                if not self.failover:
+                    raise
+                last_error = e
+
+        raise RuntimeError(f"All providers failed: {last_error}") from last_error
+
+    async def _acall_cached(
+        self, provider: Provider, body: RequestType
+    ) -> Tuple[ResponseType, float, bool]:
+        start_time = time.time()
+        key, cached = self._get_cached(provider, body)
+        if cached is not None:
+            return cached, time.time() - start_time, True
+
+        response, latency = await self._acall_provider(provider, body)
+        self._set_cached(key, response)
+        return response, latency, False
+
+    async def _acall_provider(
+        self, provider: Provider, body: RequestType
+    ) -> Tuple[ResponseType, float]:
+        chunked_request = self._get_chunked_request(provider, body)
+        if chunked_request is None and provider in self.coalescers:
+            start_time = time.time()
+            # the future is this caller's own: cancelling it drops the item if it
+            # has not been sent yet and leaves the rest of the batch alone
+            response = await asyncio.wrap_future(self.coalescers[provider].submit(body))
+            return response, time.time() - start_time
+        if chunked_request is None:
+            return await self._acall_provider_once(provider, body)
+
+        start_time = time.time()
+        tasks = [
+            asyncio.ensure_future(self._acall_chunk_group(provider, bodies))
+            for bodies in self._get_chunk_groups(provider, chunked_request)
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return (
+            chunked_request.merge(
+                [response for group in results for response in group]
+            ),
+            time.time() - start_time,
+        )
+
+    async def _acall_chunk_group(
+        self, provider: Provider, bodies: List[RequestType]
+    ) -> List[ResponseType]:
+        if len(bodies) == 1:
+            return [(await self._acall_provider_once(provider, bodies[0]))[0]]
+        responses, _ = await self._acall_provider_once(provider, bodies, batch=True)
+        return responses
+
+    async def _acall_provider_once(
+        self, provider: Provider, body: Any, batch: bool = False
+    ) -> Tuple[Any, float]:
+        # with batch=True body is a list of bodies sent in one batch call, on a
+        # worker thread as batch endpoints are synchronous
         provider_handler = self.provider_handler_map[provider]
+        # a call cancelled while it waits on the rate limiter has not taken a
+        # half-open probe slot yet
+        rate_limiter = self.rate_limiters.get(provider)
+        if rate_limiter is not None:
+            await rate_limiter.acquire_async()
+
+        if not self.optimizer_handler.acquire(provider):
+            raise CircuitOpenError(f"Circuit breaker for {provider} is open")
+
         start_time = time.time()
-        response = provider_handler.request(body)
+        task = asyncio.ensure_future(
+            asyncio.to_thread(provider_handler.batch_request, body)
+            if batch
+            else provider_handler.request_async(body)
+        )
+        try:
+            # wait() rather than wait_for(), which raises the same TimeoutError
+            # as a provider that times out on its own
+            done, _ = await asyncio.wait({task}, timeout=self.request_timeout)
+            if not done:
+                task.cancel()
+                raise self._timeout_error(provider)
+            response = task.result()
+        except asyncio.CancelledError:
+            # a cancelled race or hedge loser says nothing about the provider
+            task.cancel()
+            self.optimizer_handler.release(provider)
+            raise
+        except RequestTimeoutError:
+            self.optimizer_handler.record_error(provider)
+            raise
+        except Exception as e:
+            self._record_error(provider, e)
+            raise
         latency = time.time() - start_time
+        # the latency of a multi-item batch would skew the per-request latency
+        # the optimizer and hedge delay work from
+        single = not batch or len(body) == 1
+        self._record_success(provider, latency if single else None)
+        return response, latency
+
+    async def _afirst_success(
+        self, tasks: Set[asyncio.Task]
+    ) -> Tuple[Provider, ResponseType, float, bool]:
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+                    return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
 
+        raise RuntimeError(f"All providers failed: {last_error}") from last_error
+
+    def _create_task(self, provider: Provider, body: RequestType) -> asyncio.Task:
+        async def run() -> Tuple[Provider, ResponseType, float, bool]:
+            response, latency, cache_hit = await self._acall_cached(provider, body)
+            return provider, response, latency, cache_hit
+
+        return asyncio.create_task(run())
+
+    async def _arace(
+        self,
+        body: RequestType,
+        providers: List[Provider],
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Tuple[ResponseType, TaskMetadata]:
+        tasks = {self._create_task(provider, body) for provider in providers}
+        provider, response, latency, cache_hit = await self._afirst_success(tasks)
+        return response, self._create_metadata(
+            provider, latency, response, reference, body, cache_hit, metrics
+        )
+
+    async def _ahedge(
+        self,
+        body: RequestType,
+        provider: Optional[Provider] = None,
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Tuple[ResponseType, TaskMetadata]:
+        ranked = self.optimizer_handler.select_providers(body)
+        primary = provider or ranked[0]
+        candidates = [primary] + [c for c in ranked if c != primary]
+
+        with self._hedge_lock:
+            self._hedge_candidates += 1
+
+        delay = self._get_hedge_delay(primary) if len(candidates) > 1 else None
+        hedged = False
+        if delay is None:
+            winner, response, latency, cache_hit = await self._acall_with_failover(
+                body, candidates if self.failover else [primary]
+            )
+        else:
+            (winner, response, latency, cache_hit), hedged = await self._ahedge_calls(
+                body, candidates, delay
+            )
+
+        metadata = self._create_metadata(
+            winner, latency, response, reference, body, cache_hit, metrics
+        )
+        metadata.hedged = hedged
+        return response, metadata
+
+    async def _ahedge_calls(
+        self, body: RequestType, candidates: List[Provider], delay: float
+    ) -> Tuple[Tuple[Provider, ResponseType, float, bool], bool]:
+        backups = iter(candidates[1:])
+        pending = {self._create_task(candidates[0], body)}
+        waiting, hedged = True, False
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if waiting else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+                    return task.result(), hedged
+
+                backup = None
+                if not done:
+                    waiting = False
+                    backup = next(backups, None)
+                    if backup is not None:
+                        hedged = True
+                        with self._hedge_lock:
+                            self._hedged_requests += 1
+                elif self.failover:
+                    backup = next(backups, None)
+                if backup is not None:
+                    pending.add(self._create_task(backup, body))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise RuntimeError(f"All providers failed: {last_error}") from last_error
+
+    def _create_metadata(
+        self,
+        provider: Provider,
+        latency: float,
+        response: ResponseType,
+        reference: Optional[ResponseType] = None,
+        body: Optional[RequestType] = None,
+        cache_hit: Optional[bool] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> TaskMetadata:
         metadata = TaskMetadata(
-            task=self.task, provider=provider, latency=latency, reference=reference
+            task=self.task,
+            provider=provider,
+            latency=latency,
+            reference=reference,
+            cost=self._estimate_cost(provider, body),
         )
+        self._set_cache_metadata(metadata, cache_hit)
 
         if reference is not None and self.metrics_handler is not None:
             metrics_response = self.metrics_handler.calculate_metrics(
-                reference, response
+                reference, response, metrics if metrics is not None else self.metrics
             )
             metadata.metrics = metrics_response.metrics
             metadata.normalized_reference = metrics_response.normalized_reference
             metadata.normalized_prediction = metrics_response.normalized_prediction
+            # a cached response was scored when it was first fetched
+            if not cache_hit:
+                self.optimizer_handler.record_quality(
+                    provider, quality_score(self.task, metadata.metrics)
+                )
 
-        return response, metadata
+        return metadata
+
+    def _set_cache_metadata(
+        self, metadata: TaskMetadata, cache_hit: Optional[bool]
+    ) -> None:
+        if self.cache is None or cache_hit is None:
+            return
+        metadata.cache_hit = cache_hit
+        metadata.cache_hits = self.cache.hits
+        metadata.cache_misses = self.cache.misses
+
+    def _estimate_cost(
+        self, provider: Provider, body: Optional[RequestType]
+    ) -> Optional[float]:
+        if body is None:
+            return None
+        return estimate_cost(self.task, provider, body, self.pricing)
+
+    def _resolve_media(
+        self, body: RequestType, audio: bool
+    ) -> Tuple[RequestType, List[str]]:
+        updates: Dict[str, object] = {}
+        keys: List[str] = []
+        try:
+            image = getattr(body, "image", None)
+            if isinstance(image, str):
+                updates["image"] = self.media_registry.acquire_image(image)
+                keys.append(f"image:{image}")
+            audio_file = getattr(body, "audio_file", None)
+            if (
+                audio
+                and isinstance(audio_file, str)
+                and audio_file.startswith(("http://", "https://"))
+            ):
+                updates["audio_file"] = self.media_registry.acquire_audio(audio_file)
+                keys.append(f"audio:{audio_file}")
+        except Exception:
+            self._release_media(keys)
+            raise
+
+        if not updates:
+            return body, keys
+        return body.model_copy(update=updates), keys  # type: ignore
+
+    def _release_media(self, keys: List[str]) -> None:
+        for key in keys:
+            self.media_registry.release(key)
+
+    @contextmanager
+    def _materialized(self, body: RequestType, audio: bool = True) -> Iterator:
+        # downloaded audio is deleted on release, so fan-outs whose losers are
+        # abandoned rather than awaited only share images
+        body, keys = self._resolve_media(body, audio)
+        try:
+            yield body
+        finally:
+            self._release_media(keys)
+
+    @asynccontextmanager
+    async def _amaterialized(
+        self, body: RequestType, audio: bool = True
+    ) -> AsyncIterator:
+        body, keys = await asyncio.to_thread(self._resolve_media, body, audio)
+        try:
+            yield body
+        finally:
+            self._release_media(keys)
+
+    def _materialized_for_cache(self, body: RequestType) -> ContextManager:
+        # media keyed by content would be loaded once for the cache key and again
+        # by the provider, so it is loaded up front and the same bytes are used
+        if self.cache is None or not self.cache_content_hash:
+            return nullcontext(body)
+        return self._materialized(body)
+
+    def _amaterialized_for_cache(self, body: RequestType) -> AsyncContextManager:
+        if self.cache is None or not self.cache_content_hash:
+            return nullcontext(body)
+        return self._amaterialized(body)
 
     def evaluate(
-        self, body: RequestType, reference: Optional[ResponseType] = None
+        self,
+        body: RequestType,
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Dict[Provider, Tuple[ResponseType, TaskMetadata]]:
+        with self._materialized(body) as body:
+            return self._evaluate(body, reference, metrics)
+
+    def _evaluate(
+        self,
+        body: RequestType,
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
     ) -> Dict[Provider, Tuple[ResponseType, TaskMetadata]]:
         responses = {}
 
         def evaluate_provider(provider, handler):
             try:
-                start_time = time.time()
-                response = handler.request(body)
-                latency = time.time() - start_time
+                response, latency, cache_hit = self._call_cached(provider, body)
 
                 metadata = TaskMetadata(
                     task=self.task,
                     provider=provider,
                     latency=latency,
+                    cost=self._estimate_cost(provider, body),
                 )
+                self._set_cache_metadata(metadata, cache_hit)
 
                 if self.metrics_handler is not None and reference is not None:
                     try:
                         metrics_response = self.metrics_handler.calculate_metrics(
-                            reference, response
+                            reference,
+                            response,
+                            metrics if metrics is not None else self.metrics,
                         )
                         metadata.reference = reference
                         metadata.metrics = metrics_response.metrics
@@ -92,6 +1265,9 @@ class TaskHandler(ABC, Generic[RequestType, ResponseType]):
                         metadata.normalized_prediction = (
                             metrics_response.normalized_prediction
                         )
+                        self.optimizer_handler.record_quality(
+                            provider, quality_score(self.task, metadata.metrics)
+                        )
                     except Exception as e:
                         print(
                             f"Error calculating metrics for provider {provider}: {str(e)}"
@@ -102,15 +1278,60 @@ class TaskHandler(ABC, Generic[RequestType, ResponseType]):
                 print(f"Error evaluating provider {provider}: {str(e)}")
                 return provider, None
 
-        with ThreadPoolExecutor() as executor:
-            futures = [
-                executor.submit(evaluate_provider, provider, handler)
-                for provider, handler in self.provider_handler_map.items()
-            ]
+        futures = [
+            self._get_executor(provider).submit(evaluate_provider, provider, handler)
+            for provider, handler in self.provider_handler_map.items()
+        ]
 
-            for future in as_completed(futures):
-                provider, result = future.result()
-                if result is not None:
-                    responses[provider] = result
+        for future in as_completed(futures):
+            provider, result = future.result()
+            if result is not None:
+                responses[provider] = result
 
         return responses
+
+    async def aevaluate(
+        self,
+        body: RequestType,
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Dict[Provider, Tuple[ResponseType, TaskMetadata]]:
+        async with self._amaterialized(body) as body:
+            return await self._aevaluate(body, reference, metrics)
+
+    async def _aevaluate(
+        self,
+        body: RequestType,
+        reference: Optional[ResponseType] = None,
+        metrics: Optional[List[Metric]] = None,
+    ) -> Dict[Provider, Tuple[ResponseType, TaskMetadata]]:
+        async def evaluate_provider(provider, handler):
+            try:
+                response, latency, cache_hit = await self._acall_cached(provider, body)
+            except Exception as e:
+                print(f"Error evaluating provider {provider}: {str(e)}")
+                return provider, None
+
+            try:
+                metadata = self._create_metadata(
+                    provider, latency, response, reference, body, cache_hit, metrics
+                )
+            except Exception as e:
+                print(f"Error calculating metrics for provider {provider}: {str(e)}")
+                metadata = TaskMetadata(
+                    task=self.task,
+                    provider=provider,
+                    latency=latency,
+                    cost=self._estimate_cost(provider, body),
+                )
+
+            return provider, (response, metadata)
+
+        results = await asyncio.gather(
+            *(
+                evaluate_provider(provider, handler)
+                for provider, handler in self.provider_handler_map.items()
+            )
+        )
+
+        return {provider: result for provider, result in results if result is not None}
@@ -12,10 +12,17 @@ class TaskMetadata(BaseModel, Generic[ResponseType]):
     task: Task
     provider: Provider
     latency: float
+    cost: Optional[float] = None
     reference: Optional[ResponseType] = None
     normalized_reference: Optional[ResponseType] = None
     normalized_prediction: Optional[ResponseType] = None
     metrics: Optional[Dict[Metric, Any]] = None
+    error: Optional[str] = None
+    hedged: Optional[bool] = None
+    cache_hit: Optional[bool] = None
+    cache_hits: Optional[int] = None
+    cache_misses: Optional[int] = None
+    shared: Optional[bool] = None
 
     def __str__(self):
         lines = [
@@ -23,12 +30,25 @@ class TaskMetadata(BaseModel, Generic[ResponseType]):
             f"Provider: {self.provider}",
             f"Latency: {self.latency:.2f}s",
         ]
+        if self.cost is not None:
+            lines.append(f"Estimated Cost: ${self.cost:.6f}")
         if self.reference:
             lines.append(f"Reference: {self.reference}")
         if self.normalized_reference:
             lines.append(f"Normalized Reference: {self.normalized_reference}")
         if self.normalized_prediction:
             lines.append(f"Normalized Prediction: {self.normalized_prediction}")
+        if self.hedged:
+            lines.append("Hedged: True")
+        if self.cache_hit is not None:
+            lines.append(
+                f"Cache: {'hit' if self.cache_hit else 'miss'} "
+                f"({self.cache_hits} hits, {self.cache_misses} misses)"
+            )
+        if self.shared:
+            lines.append("Shared: True")
+        if self.error:
+            lines.append(f"Error: {self.error}")
         if self.metrics:
             lines.append("Metrics:")
             for metric, value in self.metrics.items():
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
 # Request
 
@@ -12,3 +13,5 @@ class SentimentAnalysisRequest(BaseModel):
 
 class SentimentAnalysisResponse(BaseModel):
     score: float
+    # score of every chunk of a long text, when requested with chunk_scores
+    chunk_scores: Optional[List[float]] = None
@@ -1,11 +1,13 @@
+import asyncio
 import os
-import requests
 import tempfile
 
+from supercontrast.utils.http import get_shared_async_client, get_shared_session
+
 
 def load_audio_file(audio_file: str) -> str:
     if audio_file.startswith(("http://", "https://")):
-        response = requests.get(audio_file)
+        response = get_shared_session().get(audio_file)
         response.raise_for_status()
 
         # Extract the file extension from the URL
@@ -20,3 +22,22 @@ def load_audio_file(audio_file: str) -> str:
         return temp_file_path
     else:
         return audio_file
+
+
+async def load_audio_file_async(audio_file: str) -> str:
+    if audio_file.startswith(("http://", "https://")):
+        response = await get_shared_async_client().get(audio_file)
+        response.raise_for_status()
+
+        file_extension = os.path.splitext(audio_file)[1]
+
+        def write_temp_file() -> str:
+            with tempfile.NamedTemporaryFile(
+                delete=False, suffix=file_extension
+            ) as temp_file:
+                temp_file.write(response.content)
+                return temp_file.name
+
+        return await asyncio.to_thread(write_temp_file)
+    else:
+        return audio_file
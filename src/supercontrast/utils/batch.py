@@ -0,0 +1,38 @@
+from typing import Callable, Iterator, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def batched(
+    items: Sequence[T],
+    max_size: int,
+    max_weight: Optional[int] = None,
+    weight: Callable[[T], int] = lambda _: 1,
+) -> Iterator[List[T]]:
+    """
+    Split items into consecutive batches, preserving order.
+
+    Args:
+        items (Sequence[T]): The items to split.
+        max_size (int): The maximum number of items per batch.
+        max_weight (Optional[int]): The maximum total weight per batch, if any.
+            A single item heavier than max_weight still gets its own batch.
+        weight (Callable[[T], int]): Returns the weight of an item.
+
+    Returns:
+        Iterator[List[T]]: The batches.
+    """
+    batch: List[T] = []
+    batch_weight = 0
+    for item in items:
+        item_weight = weight(item)
+        if batch and (
+            len(batch) >= max_size
+            or (max_weight is not None and batch_weight + item_weight > max_weight)
+        ):
+            yield batch
+            batch, batch_weight = [], 0
+        batch.append(item)
+        batch_weight += item_weight
+    if batch:
+        yield batch
@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+# Constants
+
+# stops the collector thread
+_CLOSE = object()
+
+
+class BatchCoalescer:
+    # micro-batches single calls made from many threads: the first item starts
+    # a window of max_wait seconds and everything submitted during it, up to
+    # max_batch_size items, is sent in one batch call; each caller gets its own
+    # result, and if the batch call fails every item is retried with call_single
+    # so one bad item does not fail the others
+    def __init__(
+        self,
+        call_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        call_single: Optional[Callable[[Any], Any]] = None,
+        max_wait: float = 0.005,
+        max_concurrent_batches: int = 4,
+        name: str = "supercontrast-batch",
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait < 0:
+            raise ValueError("max_wait must not be negative")
+
+        self.call_batch = call_batch
+        self.call_single = call_single
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_concurrent_batches = max_concurrent_batches
+        self.name = name
+        self.batches = 0
+        self.items = 0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queue an item for the next batch.
+
+        Args:
+            item (Any): The item to send.
+
+        Returns:
+            Future: Resolves to the result for the item.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchCoalescer is closed")
+            if self._thread is None:
+                # batches are sent on a pool so a slow one does not hold up the
+                # next window
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent_batches,
+                    thread_name_prefix=self.name,
+                )
+                self._thread = threading.Thread(
+                    target=self._collect, name=f"{self.name}-collector", daemon=True
+                )
+                self._thread.start()
+            self._queue.put((item, future))
+        return future
+
+    def _collect(self) -> None:
+        closing = False
+        while not closing:
+            entry = self._queue.get()
+            if entry is _CLOSE:
+                return
+
+            batch: List[Tuple[Any, Future]] = [entry]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _CLOSE:
+                    closing = True
+                    break
+                batch.append(entry)
+
+            self.batches += 1
+            self.items += len(batch)
+            self._executor.submit(self._dispatch, batch)  # type: ignore
+
+    def _dispatch(self, batch: List[Tuple[Any, Future]]) -> None:
+        # items whose caller cancelled while they were queued are not sent, the
+        # others can no longer be cancelled
+        batch = [
+            (item, future)
+            for item, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        try:
+            results = self.call_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch call returned {len(results)} results for {len(batch)} items"
+                )
+        except BaseException as e:
+            if self.call_single is None or len(batch) == 1:
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+            for item, future in batch:
+                self._call_single(item, future)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _call_single(self, item: Any, future: Future) -> None:
+        try:
+            future.set_result(self.call_single(item))  # type: ignore
+        except BaseException as e:
+            future.set_exception(e)
+
+    def close(self) -> None:
+        # items already submitted are still sent
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread, executor = self._thread, self._executor
+        if thread is not None:
+            self._queue.put(_CLOSE)
+            thread.join()
+        if executor is not None:
+            executor.shutdown(wait=True)
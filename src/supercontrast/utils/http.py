@@ -0,0 +1,210 @@
+import asyncio
+import httpx
+import requests
+import threading
+import weakref
+
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, Optional, Tuple, Union
+from urllib3.util.retry import Retry
+
+# Constants
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (5.0, 60.0)
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 3
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class TimeoutSession(requests.Session):
+    # requests has no session-wide timeout, so apply one to every call that
+    # does not set its own
+    def __init__(self, timeout: Optional[Timeout] = DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class ProviderRetry(Retry):
+    # a POST answered with a 5xx may already have been processed (and billed),
+    # so it is only retried on 429, which providers send before doing any work
+    def is_retry(
+        self, method: str, status_code: int, has_retry_after: bool = False
+    ) -> bool:
+        if method.upper() not in Retry.DEFAULT_ALLOWED_METHODS and status_code != 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def create_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_factor: float = 0.5,
+    timeout: Optional[Timeout] = DEFAULT_TIMEOUT,
+) -> requests.Session:
+    """
+    Create a keep-alive session with a connection pool, retries and timeouts.
+
+    Connection errors and retryable status codes are retried with exponential
+    backoff, honouring Retry-After. Read errors, and server errors on non-idempotent
+    methods such as POST, are not retried, since the provider may already have
+    processed (and billed) the request. After the last
+    retry the response is returned as is, so throttling stays visible to callers.
+
+    Args:
+        pool_size (int): The number of connections kept per host.
+        max_retries (int): The number of retries for connection errors and retryable statuses.
+        backoff_factor (float): The base of the exponential backoff in seconds.
+        timeout (Optional[Timeout]): The default (connect, read) timeout in seconds.
+
+    Returns:
+        requests.Session: A session safe to share between threads.
+    """
+    retry = ProviderRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=max_retries,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=None,
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+
+    session = TimeoutSession(timeout=timeout)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_session_from_config(**config) -> requests.Session:
+    return create_session(
+        pool_size=config.get("http_pool_size", DEFAULT_POOL_SIZE),
+        max_retries=config.get("http_max_retries", DEFAULT_MAX_RETRIES),
+        timeout=config.get("http_timeout", DEFAULT_TIMEOUT),
+    )
+
+
+def raise_for_status(response: Union[requests.Response, httpx.Response]) -> None:
+    # anything but 200 is an error; the HTTP error types carry the response, so
+    # the rate limiter can tell a 429 apart from other failures
+    if response.status_code == 200:
+        return
+    message = f"Error: {response.status_code} - {response.text}"
+    if isinstance(response, httpx.Response):
+        raise httpx.HTTPStatusError(
+            message, request=response.request, response=response
+        )
+    raise requests.HTTPError(message, response=response)
+
+
+class LoopBoundClient:
+    # async clients keep connections tied to the event loop they were created
+    # on, so one is built lazily per running loop and reused by its requests
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self.clients: "weakref.WeakKeyDictionary[Any, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.lock = threading.Lock()
+
+    def get(self) -> Any:
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if loop not in self.clients:
+                self.clients[loop] = self.factory()
+            return self.clients[loop]
+
+    async def aclose(self) -> None:
+        # a client can only be closed on its own loop, so this closes the one of
+        # the running loop
+        with self.lock:
+            client = self.clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.__aexit__(None, None, None)
+
+    def close(self) -> None:
+        # sync code cannot await the clients, they are only released
+        with self.lock:
+            self.clients.clear()
+
+
+def get_httpx_timeout(timeout: Optional[Timeout]) -> httpx.Timeout:
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def create_async_client(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    timeout: Optional[Timeout] = DEFAULT_TIMEOUT,
+    follow_redirects: bool = False,
+) -> LoopBoundClient:
+    """
+    Create a keep-alive async HTTP client, built once per event loop.
+
+    The async counterpart of create_session: connections are kept alive across
+    requests, connection errors are retried and the same default timeouts apply.
+
+    Args:
+        pool_size (int): The number of idle connections kept alive.
+        max_retries (int): The number of retries for connection errors.
+        timeout (Optional[Timeout]): The default (connect, read) timeout in seconds.
+        follow_redirects (bool): Follow redirects, as requests does by default.
+
+    Returns:
+        LoopBoundClient: Returns the httpx.AsyncClient of the running loop from get().
+    """
+    return LoopBoundClient(
+        lambda: httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=None, max_keepalive_connections=pool_size
+                ),
+                retries=max_retries,
+            ),
+            timeout=get_httpx_timeout(timeout),
+            follow_redirects=follow_redirects,
+        )
+    )
+
+
+def create_async_client_from_config(**config) -> LoopBoundClient:
+    return create_async_client(
+        pool_size=config.get("http_pool_size", DEFAULT_POOL_SIZE),
+        max_retries=config.get("http_max_retries", DEFAULT_MAX_RETRIES),
+        timeout=config.get("http_timeout", DEFAULT_TIMEOUT),
+    )
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> requests.Session:
+    # process-wide session for fetching input media
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
+
+_shared_async_client = create_async_client(follow_redirects=True)
+
+
+def get_shared_async_client() -> httpx.AsyncClient:
+    # process-wide async client of the running loop for fetching input media
+    return _shared_async_client.get()
@@ -1,11 +1,13 @@
+import asyncio
 import base64
 import os
-import requests
 
 from io import BytesIO
 from PIL import Image
 from typing import Tuple, Union
 
+from supercontrast.utils.http import get_shared_async_client, get_shared_session
+
 
 def get_image_size(image: Union[str, bytes]) -> Tuple[int, int]:
     """
@@ -22,11 +24,13 @@ def get_image_size(image: Union[str, bytes]) -> Tuple[int, int]:
     """
     if isinstance(image, str):
         if image.startswith(("http://", "https://")):
-            response = requests.get(image)
+            response = get_shared_session().get(image)
             img = Image.open(BytesIO(response.content))
         else:
             img = Image.open(image)
     elif isinstance(image, bytes):
+        # Image.open only parses the header, which is cheaper than keeping the
+        # bytes alive in a cache keyed on them
         img = Image.open(BytesIO(image))
     else:
         raise ValueError("Unsupported image type")
@@ -49,7 +53,7 @@ def load_image_data(image: Union[str, bytes]) -> bytes:
     """
     if isinstance(image, str):
         if image.startswith(("http://", "https://")):
-            return requests.get(image).content
+            return get_shared_session().get(image).content
         else:
             with open(image, "rb") as image_file:
                 return image_file.read()
@@ -59,6 +63,28 @@ def load_image_data(image: Union[str, bytes]) -> bytes:
         raise ValueError("Unsupported image type")
 
 
+async def load_image_data_async(image: Union[str, bytes]) -> bytes:
+    """
+    Load image data from various sources without blocking the event loop.
+
+    Args:
+        image (Union[str, bytes]): The image to load. Can be a URL, a local file path, or bytes.
+
+    Returns:
+        bytes: The image data as bytes.
+
+    Raises:
+        ValueError: If the image type is unsupported.
+    """
+    if isinstance(image, str) and image.startswith(("http://", "https://")):
+        response = await get_shared_async_client().get(image)
+        response.raise_for_status()
+        return response.content
+    elif isinstance(image, str):
+        return await asyncio.to_thread(load_image_data, image)
+    return load_image_data(image)
+
+
 # Image processing for LLMs
 
 
@@ -0,0 +1,78 @@
+import os
+import threading
+
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+from supercontrast.utils.audio import load_audio_file
+from supercontrast.utils.image import load_image_data
+
+T = TypeVar("T")
+
+
+class MediaEntry(Generic[T]):
+    def __init__(self):
+        self.value: Optional[T] = None
+        self.refs = 0
+        self.lock = threading.Lock()
+
+
+class MediaRegistry:
+    # inputs resolved once and shared by every request that uses them at the
+    # same time; an entry is dropped, and a downloaded audio file deleted, when
+    # its last user releases it
+    def __init__(self):
+        self.entries: Dict[str, MediaEntry] = {}
+        self.lock = threading.Lock()
+
+    def _acquire(self, key: str, loader: Callable[[], T]) -> T:
+        with self.lock:
+            entry = self.entries.setdefault(key, MediaEntry())
+            entry.refs += 1
+
+        try:
+            # concurrent users of the same source wait for the first load
+            with entry.lock:
+                if entry.value is None:
+                    entry.value = loader()
+                return entry.value
+        except Exception:
+            self.release(key)
+            raise
+
+    def acquire_image(self, image: str) -> bytes:
+        """
+        Resolve an image URL or path to bytes, loading it only once while in use.
+
+        Args:
+            image (str): A URL or a local file path.
+
+        Returns:
+            bytes: The image data, shared with the other users of the source.
+        """
+        return self._acquire(f"image:{image}", lambda: load_image_data(image))
+
+    def acquire_audio(self, audio_file: str) -> str:
+        """
+        Resolve an audio URL to a local file, downloading it only once while in use.
+
+        Args:
+            audio_file (str): A URL or a local file path.
+
+        Returns:
+            str: The path of a local file with the audio.
+        """
+        return self._acquire(f"audio:{audio_file}", lambda: load_audio_file(audio_file))
+
+    def release(self, key: str) -> None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self.entries[key]
+
+        source = key.split(":", 1)[1]
+        if key.startswith("audio:") and entry.value and entry.value != source:
+            os.unlink(entry.value)
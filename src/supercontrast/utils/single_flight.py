@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+
+
+class SingleFlight:
+    # coalesces concurrent calls with the same key: the first caller runs the
+    # call and every caller that arrives while it is in flight gets its result;
+    # sync and async callers share the same in-flight futures
+    def __init__(self):
+        self.in_flight: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        # async calls in flight, referenced until they finish
+        self.tasks: Set[asyncio.Task] = set()
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self.in_flight[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: Future) -> None:
+        with self.lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+    def do(self, key: str, call: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run a call unless an identical one is in flight.
+
+        Args:
+            key (str): Identifies identical calls.
+            call (Callable[[], Any]): The call to run if this caller leads.
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared from another caller.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(call())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._finish(key, future)
+        return future.result(), False
+
+    async def ado(
+        self, key: str, call: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        future, leader = self._join(key)
+        if leader:
+            # the call is owned by the flight rather than by the first caller, so
+            # cancelling that caller does not fail the others waiting on it
+            task = asyncio.ensure_future(call())
+            self.tasks.add(task)
+            task.add_done_callback(lambda task: self._settle(key, future, task))
+
+        # shielded as cancelling a wrapped future cancels the shared one
+        return await asyncio.shield(asyncio.wrap_future(future)), not leader
+
+    def _settle(self, key: str, future: Future, task: asyncio.Task) -> None:
+        self.tasks.discard(task)
+        try:
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+        finally:
+            self._finish(key, future)
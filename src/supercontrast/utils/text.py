@@ -2,6 +2,22 @@ import re
 import unicodedata
 
 from num2words import num2words
+from typing import Iterator, List
+
+# Constants
+
+# boundaries text is split on, from the most to the least preferred; each
+# piece keeps the separator that follows it
+SPLIT_BOUNDARIES = [
+    # paragraphs
+    re.compile(r"\n\s*\n"),
+    # lines
+    re.compile(r"\n"),
+    # sentences, including closing quotes and CJK full stops
+    re.compile(r"(?<=[.!?])[\"')\]\u2019\u201d]*\s+|(?<=[\u3002\uff01\uff1f])"),
+    # words
+    re.compile(r"\s+"),
+]
 
 
 def truncate_text(text: str, max_bytes: int = 5000):
@@ -9,6 +25,67 @@ def truncate_text(text: str, max_bytes: int = 5000):
     return text.encode("utf-8")[:max_bytes].decode("utf-8", "ignore")
 
 
+def get_byte_length(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _split_after(text: str, boundary: re.Pattern) -> List[str]:
+    pieces = []
+    start = 0
+    for match in boundary.finditer(text):
+        if match.end() > start:
+            pieces.append(text[start : match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _split_pieces(text: str, max_bytes: int, level: int = 0) -> Iterator[str]:
+    if get_byte_length(text) <= max_bytes:
+        yield text
+    elif level < len(SPLIT_BOUNDARIES):
+        for piece in _split_after(text, SPLIT_BOUNDARIES[level]):
+            yield from _split_pieces(piece, max_bytes, level + 1)
+    else:
+        # no boundary left, cut between characters
+        piece = ""
+        for character in text:
+            if piece and get_byte_length(piece + character) > max_bytes:
+                yield piece
+                piece = ""
+            piece += character
+        if piece:
+            yield piece
+
+
+def split_text(text: str, max_bytes: int) -> List[str]:
+    """
+    Split text into chunks of at most max_bytes UTF-8 bytes, preferring
+    paragraph, line, sentence and word boundaries in that order.
+
+    Args:
+        text (str): The text to split.
+        max_bytes (int): The maximum size of a chunk in bytes.
+
+    Returns:
+        List[str]: The chunks, which join back into the original text.
+    """
+    if max_bytes < 1:
+        raise ValueError("max_bytes must be at least 1")
+
+    chunks: List[str] = []
+    chunk = ""
+    for piece in _split_pieces(text, max_bytes):
+        if chunk and get_byte_length(chunk + piece) > max_bytes:
+            chunks.append(chunk)
+            chunk = ""
+        chunk += piece
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
 def normalize_text(text: str, task: str = "transcription") -> str:
     """Normalize text for comparison."""
     # Convert to lowercase
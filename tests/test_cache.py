@@ -0,0 +1,101 @@
+import os
+import pytest
+import time
+
+from supercontrast import OCRRequest, Provider, Task, TranslationRequest
+from supercontrast.cache.cache_utils import get_cache_key
+from supercontrast.cache.handlers.disk import DiskCache
+from supercontrast.cache.handlers.memory import MemoryCache
+
+# cache key
+
+
+def test_cache_key_depends_on_body_provider_and_params():
+    body = TranslationRequest(text="Hello")
+    params = {"src_language": "en", "target_language": "es"}
+    key = get_cache_key(Task.TRANSLATION, Provider.AWS, params, body)
+
+    assert key == get_cache_key(
+        Task.TRANSLATION, Provider.AWS, dict(params), TranslationRequest(text="Hello")
+    )
+    assert key != get_cache_key(Task.TRANSLATION, Provider.GCP, params, body)
+    assert key != get_cache_key(
+        Task.TRANSLATION, Provider.AWS, {**params, "target_language": "fr"}, body
+    )
+    assert key != get_cache_key(
+        Task.TRANSLATION, Provider.AWS, params, TranslationRequest(text="Hello!")
+    )
+
+
+# memory cache
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_bytes=25)
+    cache.set("a", b"x" * 9)
+    cache.set("b", b"x" * 9)
+    assert cache.get("a") is not None
+    cache.set("c", b"x" * 9)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.size == 20
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_memory_cache_expires_entries():
+    cache = MemoryCache(ttl=0.05)
+    cache.set("a", b"value")
+    assert cache.get("a") == b"value"
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.size == 0
+
+
+def test_cache_key_hashes_media_content(tmp_path):
+    first_path = tmp_path / "first.png"
+    second_path = tmp_path / "second.png"
+    first_path.write_bytes(b"image bytes")
+    second_path.write_bytes(b"image bytes")
+
+    def key(image):
+        return get_cache_key(Task.OCR, Provider.AWS, {}, OCRRequest(image=image))
+
+    assert key(str(first_path)) == key(str(second_path)) == key(b"image bytes")
+    second_path.write_bytes(b"other bytes")
+    assert key(str(first_path)) != key(str(second_path))
+
+
+# disk cache
+
+
+def test_disk_cache_round_trip_and_eviction(tmp_path):
+    cache_path = str(tmp_path / "cache.db")
+    cache = DiskCache(cache_path, max_bytes=1500)
+    cache.set("a", b"a" * 1000)
+    assert cache.get("a") == b"a" * 1000
+
+    # incompressible values fill the budget, evicting the least recently used
+    cache.set("b", os.urandom(1000))
+    cache.get("a")
+    cache.set("c", os.urandom(1000))
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a" * 1000
+    assert cache.get("c") is not None
+    cache.close()
+
+
+def test_disk_cache_read_only(tmp_path):
+    cache_path = str(tmp_path / "cache.db")
+    cache = DiskCache(cache_path)
+    cache.set("a", b"value")
+    cache.close()
+
+    read_only_cache = DiskCache(cache_path, read_only=True)
+    assert read_only_cache.get("a") == b"value"
+    read_only_cache.set("b", b"value")
+    assert read_only_cache.get("b") is None
+    with pytest.raises(ValueError):
+        read_only_cache.clear()
+    read_only_cache.close()
@@ -0,0 +1,41 @@
+import threading
+
+from supercontrast import Provider
+from supercontrast.provider.client_registry import ClientRegistry
+
+
+def test_client_is_built_once_per_key():
+    registry = ClientRegistry()
+    builds = []
+
+    def factory():
+        builds.append(1)
+        return object()
+
+    clients = []
+    threads = [
+        threading.Thread(
+            target=lambda: clients.append(
+                registry.get(Provider.AWS, "comprehend", factory, ("id", "secret"))
+            )
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert all(client is clients[0] for client in clients)
+
+    # other credentials, regions or services get their own client
+    other = registry.get(Provider.AWS, "comprehend", factory, ("id", "other"))
+    regional = registry.get(
+        Provider.AWS, "comprehend", factory, ("id", "secret"), region="eu-west-1"
+    )
+    assert other is not clients[0] and regional is not clients[0]
+    assert len(builds) == 3
+
+    # secrets never appear in the keys
+    assert not any("secret" in repr(key) for key in registry.clients)
@@ -0,0 +1,79 @@
+import asyncio
+import httpx
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from supercontrast.utils.http import create_async_client, create_session
+
+
+def test_session_applies_default_timeout_and_pools(monkeypatch):
+    sent = {}
+
+    def send(self, request, **kwargs):
+        sent["timeout"] = kwargs["timeout"]
+        sent["adapter"] = self
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", send)
+    session = create_session(pool_size=4, timeout=(1.0, 2.0))
+
+    session.get("https://example.com")
+    assert sent["timeout"] == (1.0, 2.0)
+    session.get("https://example.com", timeout=5)
+    assert sent["timeout"] == 5
+
+    # one adapter, and so one pool per host, serves every request
+    assert sent["adapter"] is session.get_adapter("https://example.com")
+    assert sent["adapter"]._pool_maxsize == 4
+    assert sent["adapter"].max_retries.read == 0
+
+
+def test_session_only_retries_post_when_throttled():
+    retry = create_session().get_adapter("https://example.com").max_retries
+
+    assert retry.is_retry("GET", 503)
+    assert retry.is_retry("POST", 429)
+    # the provider may already have processed a POST that failed with a 5xx
+    assert not retry.is_retry("POST", 503)
+
+
+def test_async_client_is_reused_per_loop_with_session_timeouts(monkeypatch):
+    sent = []
+
+    async def handle_async_request(self, request):
+        sent.append((self, request.extensions["timeout"]))
+        return httpx.Response(200)
+
+    monkeypatch.setattr(
+        httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request
+    )
+    async_client = create_async_client(timeout=(1.0, 2.0))
+
+    async def send_twice():
+        for _ in range(2):
+            await async_client.get().get("https://example.com")
+        return async_client.get()
+
+    first_client = asyncio.run(send_twice())
+    second_client = asyncio.run(send_twice())
+
+    # one client, and so one connection pool, per event loop
+    assert first_client is not second_client
+    assert sent[0][0] is sent[1][0] and sent[2][0] is sent[3][0]
+    assert sent[0][1] == {"connect": 1.0, "read": 2.0, "write": 2.0, "pool": 2.0}
+
+
+def test_async_client_is_closed_on_its_loop():
+    async_client = create_async_client()
+
+    async def use_and_close():
+        client = async_client.get()
+        await async_client.aclose()
+        return client
+
+    client = asyncio.run(use_and_close())
+    assert client.is_closed
+    assert len(async_client.clients) == 0
@@ -0,0 +1,27 @@
+import pytest
+
+from supercontrast import Metric, TranslationResponse
+from supercontrast.metrics.metrics_handler import (
+    OCRMetricsHandler,
+    TranslationMetricsHandler,
+)
+
+
+def test_metrics_calculators_are_built_on_first_use():
+    metrics_handler = TranslationMetricsHandler()
+    assert metrics_handler.metrics_calculators == {}
+
+    metrics_response = metrics_handler.calculate_metrics(
+        TranslationResponse(text="The cat sat on the mat."),
+        TranslationResponse(text="The cat sat on a mat."),
+        metrics=[Metric.CHRF],
+    )
+
+    assert list(metrics_response.metrics) == [Metric.CHRF]
+    assert 0 < metrics_response.metrics[Metric.CHRF] < 1
+    assert list(metrics_handler.metrics_calculators) == [Metric.CHRF]
+
+
+def test_metrics_selection_rejects_unsupported_metrics():
+    with pytest.raises(ValueError):
+        OCRMetricsHandler().get_selected_metrics([Metric.BLEU])
@@ -67,3 +67,152 @@ def test_get_supported_tasks_for_provider():
         Task.TRANSLATION,
     }
     assert set(get_supported_tasks_for_provider(Provider.SENTISIGHT)) == {Task.OCR}
+
+
+# lazy provider imports
+
+PROVIDER_SDK_MODULES = [
+    "anthropic",
+    "azure.cognitiveservices.speech",
+    "boto3",
+    "google.cloud.language_v1",
+    "langchain_anthropic",
+    "langchain_openai",
+    "nltk",
+    "openai",
+    "pyzerox",
+]
+
+
+def test_import_does_not_load_provider_sdks():
+    import subprocess
+    import sys
+
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import supercontrast\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {PROVIDER_SDK_MODULES!r} if m in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    import_time, loaded = float(output[0]), output[1]
+
+    assert loaded == "", f"import supercontrast loaded {loaded} in {import_time:.2f}s"
+    # about 0.4s here against close to 3s with every SDK loaded eagerly
+    assert import_time < 2.0, f"import supercontrast took {import_time:.2f}s"
+
+
+def test_static_provider_tasks_match_handlers():
+    import importlib
+
+    from supercontrast.provider.provider_factory import (
+        HANDLERS_PACKAGE,
+        PROVIDER_FACTORIES,
+    )
+
+    for provider, (module_name, _) in PROVIDER_FACTORIES.items():
+        module = importlib.import_module(f"{HANDLERS_PACKAGE}.{module_name}")
+        supported_tasks = next(
+            value for name, value in vars(module).items() if name.endswith("_TASKS")
+        )
+        assert get_supported_tasks_for_provider(provider) == supported_tasks
+
+
+# text chunking
+
+
+def test_split_text_keeps_boundaries_and_limits():
+    from supercontrast.utils.text import split_text
+
+    text = "First sentence. Second one!\n\nNew paragraph. 日本語です。次の文。" * 10
+
+    for max_bytes in [5, 30, 100]:
+        chunks = split_text(text, max_bytes)
+        assert "".join(chunks) == text
+        assert all(len(chunk.encode("utf-8")) <= max_bytes for chunk in chunks)
+
+    assert split_text(text, 100)[0] == "First sentence. Second one!\n\n"
+    assert split_text(text, 20)[:2] == ["First sentence. ", "Second one!\n\n"]
+
+
+# prompt packing
+
+
+def test_packed_requests_split_in_half_on_count_mismatch():
+    from supercontrast import TranslationRequest, TranslationResponse
+    from supercontrast.provider.prompt_packing import packed_batch_request
+
+    packed_calls = []
+
+    def call_packed(requests):
+        packed_calls.append([request.text for request in requests])
+        # the model drops an item whenever more than two are packed
+        responses = [
+            TranslationResponse(text=request.text.upper()) for request in requests
+        ]
+        return responses[:-1] if len(requests) > 2 else responses
+
+    def call_single(request):
+        return TranslationResponse(text=f"single {request.text}")
+
+    requests = [TranslationRequest(text=text) for text in "abcde"]
+    responses = packed_batch_request(requests, 5, call_packed, call_single)
+
+    assert [response.text for response in responses] == ["A", "B", "single c", "D", "E"]
+    assert packed_calls == [list("abcde"), ["a", "b"], ["c", "d", "e"], ["d", "e"]]
+
+
+def test_structured_output_repairs_locally():
+    import pydantic
+    import pytest
+
+    from langchain_core.exceptions import OutputParserException
+    from langchain_core.messages import AIMessage
+    from langchain_core.prompts import PromptTemplate
+    from langchain_core.runnables import RunnableLambda
+
+    from supercontrast.provider.structured_output import StructuredGenerator
+
+    class Output(pydantic.BaseModel):
+        score: float
+
+    calls = []
+
+    class FakeModel:
+        def with_structured_output(self, schema, include_raw=False, **kwargs):
+            assert include_raw
+
+            def respond(prompt):
+                calls.append(prompt.to_string())
+                text = prompt.to_string()
+                if text == "ok":
+                    return {
+                        "raw": None,
+                        "parsed": Output(score=1),
+                        "parsing_error": None,
+                    }
+                # the schema was not followed, but the message text holds the JSON
+                content = '{"score": 0.5}' if text == "repair" else "not json"
+                return {
+                    "raw": AIMessage(content=content),
+                    "parsed": None,
+                    "parsing_error": ValueError("no tool call"),
+                }
+
+            return RunnableLambda(respond)
+
+    generator = StructuredGenerator(
+        PromptTemplate.from_template("{text}"), FakeModel(), Output
+    )
+
+    assert generator.invoke({"text": "ok"}).score == 1
+    assert generator.invoke({"text": "repair"}).score == 0.5
+    with pytest.raises(OutputParserException):
+        generator.invoke({"text": "broken"})
+
+    # repairs happen without another model call
+    assert calls == ["ok", "repair", "broken"]
+    assert generator.get_stats() == {"calls": 3, "repairs": 2, "failures": 1}
@@ -0,0 +1,170 @@
+import pytest
+import sqlite3
+import threading
+
+from supercontrast import Optimizer, Provider, Task, TranslationRequest
+from supercontrast.metrics.metrics_enum import Metric
+from supercontrast.optimizer.optimizer_factory import optimizer_factory
+from supercontrast.optimizer.pricing import estimate_cost
+from supercontrast.optimizer.quality import quality_score
+
+# latency
+
+
+def test_latency_optimizer_explores_then_picks_fastest():
+    optimizer_handler = optimizer_factory(
+        Task.TRANSLATION,
+        [Provider.AWS, Provider.AZURE, Provider.GCP],
+        Optimizer.LATENCY,
+        exploration_rate=0,
+    )
+
+    # every provider is tried once before the estimates are trusted
+    for provider, latency in [
+        (Provider.AWS, 0.3),
+        (Provider.AZURE, 0.1),
+        (Provider.GCP, 0.2),
+    ]:
+        assert optimizer_handler.get_provider() == provider
+        optimizer_handler.record_success(provider, latency)
+
+    assert optimizer_handler.get_provider() == Provider.AZURE
+    assert optimizer_handler.rank_providers() == [
+        Provider.AZURE,
+        Provider.GCP,
+        Provider.AWS,
+    ]
+
+    for _ in range(20):
+        optimizer_handler.record_success(Provider.AZURE, 1.0)
+    assert optimizer_handler.get_provider() == Provider.GCP
+
+
+# cost
+
+
+def test_cost_optimizer_ranks_by_estimated_cost():
+    optimizer_handler = optimizer_factory(
+        Task.TRANSLATION,
+        [Provider.GCP, Provider.AWS, Provider.AZURE],
+        Optimizer.COST,
+    )
+    body = TranslationRequest(text="Hello, world!")
+
+    assert optimizer_handler.get_provider(body) == Provider.AZURE
+    assert optimizer_handler.rank_providers(body) == [
+        Provider.AZURE,
+        Provider.AWS,
+        Provider.GCP,
+    ]
+    assert estimate_cost(Task.TRANSLATION, Provider.AZURE, body) == pytest.approx(
+        13 * 10 / 1e6
+    )
+
+
+def test_cost_optimizer_respects_latency_ceiling():
+    optimizer_handler = optimizer_factory(
+        Task.TRANSLATION,
+        [Provider.AWS, Provider.AZURE],
+        Optimizer.COST,
+        max_latency=0.5,
+    )
+    optimizer_handler.record_success(Provider.AZURE, 2.0)
+
+    assert optimizer_handler.get_provider() == Provider.AWS
+
+
+# quality
+
+
+def test_quality_score_per_task():
+    assert quality_score(Task.OCR, {Metric.CER: 0.25}) == 0.75
+    assert quality_score(Task.TRANSLATION, {Metric.CHRF: 0.6}) == 0.6
+    assert quality_score(Task.TRANSCRIPTION, {Metric.WER: 1.5}) == 0.0
+    assert quality_score(Task.SENTIMENT_ANALYSIS, None) is None
+
+
+def test_quality_optimizer_learns_best_provider():
+    optimizer_handler = optimizer_factory(
+        Task.TRANSLATION,
+        [Provider.AWS, Provider.AZURE],
+        Optimizer.QUALITY,
+        quality_exploration=0.1,
+    )
+    qualities = {Provider.AWS: 0.4, Provider.AZURE: 0.9}
+
+    for _ in range(50):
+        provider = optimizer_handler.get_provider()
+        optimizer_handler.record_quality(provider, qualities[provider])
+
+    assert optimizer_handler.get_provider() == Provider.AZURE
+    assert optimizer_handler.stats[Provider.AZURE].quality_samples > 40
+    assert optimizer_handler.rank_providers() == [Provider.AZURE, Provider.AWS]
+
+
+def test_quality_optimizer_rejects_task_without_quality_metric():
+    with pytest.raises(ValueError, match="no quality metric"):
+        optimizer_factory(
+            Task.SENTIMENT_ANALYSIS, [Provider.AWS, Provider.AZURE], Optimizer.QUALITY
+        )
+
+
+# state store
+
+
+def test_optimizer_state_is_shared_through_sqlite(tmp_path):
+    state_path = str(tmp_path / "optimizer.db")
+    providers = [Provider.AWS, Provider.AZURE]
+
+    first = optimizer_factory(
+        Task.TRANSLATION, providers, Optimizer.LATENCY, optimizer_state_path=state_path
+    )
+    first.record_success(Provider.AWS, 0.5)
+    first.record_success(Provider.AZURE, 0.1)
+    first.record_error(Provider.AWS)
+    first.flush()
+
+    # a second worker warm-starts from the file, and its flushes add up
+    second = optimizer_factory(
+        Task.TRANSLATION,
+        providers,
+        Optimizer.LATENCY,
+        optimizer_state_path=state_path,
+        exploration_rate=0,
+    )
+    assert second.stats[Provider.AWS].requests == 2
+    assert second.stats[Provider.AWS].errors == 1
+    assert second.stats[Provider.AZURE].ewma_latency == pytest.approx(0.1)
+    assert second.get_provider() == Provider.AZURE
+
+    second.record_success(Provider.AZURE, 0.3)
+    second.flush()
+    first.flush()
+    assert first.stats[Provider.AZURE].requests == 2
+    assert first.stats[Provider.AZURE].samples == 2
+
+
+def test_optimizer_flushes_in_the_background_and_closes_its_store(tmp_path):
+    optimizer_handler = optimizer_factory(
+        Task.TRANSLATION,
+        [Provider.AWS],
+        Optimizer.LATENCY,
+        optimizer_state_path=str(tmp_path / "optimizer.db"),
+        optimizer_flush_interval=0,
+    )
+    state_store = optimizer_handler.state_store
+    merge = state_store.merge
+    threads = []
+
+    def recording_merge(*args):
+        threads.append(threading.current_thread().name)
+        return merge(*args)
+
+    state_store.merge = recording_merge
+    optimizer_handler.record_success(Provider.AWS, 0.5)
+    optimizer_handler._flush_thread.join()
+    assert threads == ["supercontrast-flush"]
+
+    optimizer_handler.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        state_store.connection.execute("SELECT 1")
@@ -0,0 +1,70 @@
+import httpx
+import pytest
+import requests
+import time
+
+from supercontrast.provider.handlers.modern_mt_handler import ModernMTException
+from supercontrast.provider.rate_limiter import AdaptiveRateLimiter, is_throttling_error
+from supercontrast.utils.http import raise_for_status
+
+
+class ThrottlingException(Exception):
+    pass
+
+
+class ClientError(Exception):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+def test_is_throttling_error():
+    assert is_throttling_error(ModernMTException(429, "TooManyRequests", "slow down"))
+    assert is_throttling_error(ClientError("ThrottlingException"))
+    assert is_throttling_error(ThrottlingException())
+    assert not is_throttling_error(ModernMTException(400, "BadRequest", "no"))
+    assert not is_throttling_error(ValueError("failed"))
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_raise_for_status_errors_are_recognized(is_async):
+    def error_for(status_code):
+        if is_async:
+            request = httpx.Request("POST", "https://example.com")
+            response = httpx.Response(status_code, request=request)
+        else:
+            response = requests.Response()
+            response.status_code = status_code
+        with pytest.raises(Exception) as excinfo:
+            raise_for_status(response)
+        return excinfo.value
+
+    assert is_throttling_error(error_for(429))
+    assert not is_throttling_error(error_for(500))
+
+
+def test_rate_limiter_aimd():
+    rate_limiter = AdaptiveRateLimiter(10, min_rate=1, additive_increase=1)
+
+    rate_limiter.record_error(ClientError("ThrottlingException"))
+    assert rate_limiter.rate == 5
+    rate_limiter.record_error(ValueError("failed"))
+    assert rate_limiter.rate == 5
+    for _ in range(10):
+        rate_limiter.record_success()
+    assert rate_limiter.rate == 10
+
+    for _ in range(10):
+        rate_limiter.record_throttle()
+    assert rate_limiter.rate == 1
+
+
+def test_rate_limiter_paces_requests():
+    rate_limiter = AdaptiveRateLimiter(20, burst=1)
+
+    start_time = time.monotonic()
+    for _ in range(5):
+        rate_limiter.acquire()
+
+    # the first token is free, the next four wait 1 / 20 s each
+    assert time.monotonic() - start_time == pytest.approx(0.2, abs=0.1)
@@ -160,3 +160,51 @@ def test_sentiment_analysis_evaluate():
         assert metadata.task == Task.SENTIMENT_ANALYSIS
         assert metadata.provider == provider
         assert metadata.latency > 0
+
+
+async def test_sentiment_analysis_aevaluate():
+    sentiment_analysis_client = SuperContrastClient(
+        task=Task.SENTIMENT_ANALYSIS,
+        providers=get_supported_providers_for_task(Task.SENTIMENT_ANALYSIS),
+    )
+    request = SentimentAnalysisRequest(text=TEST_TEXT)
+    responses = await sentiment_analysis_client.aevaluate(request)
+
+    assert responses is not None
+    assert isinstance(responses, dict)
+
+    for provider, (response, metadata) in responses.items():
+        print_request_response_and_metadata(
+            Task.SENTIMENT_ANALYSIS, request, response, metadata
+        )
+
+        assert isinstance(response, SentimentAnalysisResponse)
+        assert response.score > 0
+
+        assert metadata.task == Task.SENTIMENT_ANALYSIS
+        assert metadata.provider == provider
+        assert metadata.latency > 0
+
+
+# batch
+
+
+def test_sentiment_analysis_batch_aws():
+    sentiment_analysis_aws_client = SuperContrastClient(
+        task=Task.SENTIMENT_ANALYSIS, providers=[Provider.AWS]
+    )
+    requests = [SentimentAnalysisRequest(text=TEST_TEXT) for _ in range(30)]
+    results = sentiment_analysis_aws_client.batch_request(requests)
+
+    assert len(results) == len(requests)
+    for request, (response, metadata) in zip(requests, results):
+        assert isinstance(response, SentimentAnalysisResponse)
+        assert response.score > 0
+
+        assert metadata.task == Task.SENTIMENT_ANALYSIS
+        assert metadata.provider == Provider.AWS
+        assert metadata.latency > 0
+
+        print_request_response_and_metadata(
+            Task.SENTIMENT_ANALYSIS, request, response, metadata
+        )
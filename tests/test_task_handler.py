@@ -0,0 +1,935 @@
+import asyncio
+import pytest
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Set
+
+import supercontrast.task.task_handler as task_handler_module
+import supercontrast.utils.media as media_module
+
+from supercontrast import (
+    OCRRequest,
+    OCRResponse,
+    Provider,
+    RequestMode,
+    SentimentAnalysisRequest,
+    SentimentAnalysisResponse,
+    Task,
+    TaskHandler,
+    TranslationRequest,
+    TranslationResponse,
+)
+from supercontrast.metrics.metrics_enum import Metric
+from supercontrast.optimizer.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+from supercontrast.provider.provider_handler import ProviderHandler
+
+# helpers
+
+
+class FakeSentimentAnalysis(ProviderHandler):
+    def __init__(
+        self,
+        provider: Provider,
+        delay: float = 0.0,
+        fail_on: Optional[Set[str]] = None,
+    ):
+        super().__init__(provider=provider, task=Task.SENTIMENT_ANALYSIS)
+        self.delay = delay
+        self.fail_on = fail_on or set()
+        self.calls = 0
+
+    def request(self, request: SentimentAnalysisRequest) -> SentimentAnalysisResponse:
+        self.calls += 1
+        time.sleep(self.delay)
+        if request.text in self.fail_on:
+            raise ValueError(f"failed on {request.text}")
+        return SentimentAnalysisResponse(score=float(len(request.text)))
+
+    def get_name(self) -> str:
+        return f"Fake - {self.provider}"
+
+    @classmethod
+    def init_from_env(cls, provider: Provider) -> "FakeSentimentAnalysis":
+        return cls(provider)
+
+
+def create_task_handler(
+    monkeypatch, handlers: Dict[Provider, ProviderHandler], **config
+) -> TaskHandler:
+    monkeypatch.setattr(
+        task_handler_module,
+        "provider_factory",
+        lambda task, provider, **config: handlers[provider],
+    )
+    return TaskHandler(Task.SENTIMENT_ANALYSIS, list(handlers), **config)
+
+
+# request_many
+
+
+def test_request_many_ordered_reports_errors(monkeypatch):
+    handler = FakeSentimentAnalysis(Provider.AWS, delay=0.01, fail_on={"bad"})
+    task_handler = create_task_handler(monkeypatch, {Provider.AWS: handler})
+    texts = ["a", "bb", "bad", "dddd"] * 5
+
+    results = list(
+        task_handler.request_many(
+            (SentimentAnalysisRequest(text=text) for text in texts),
+            concurrency=3,
+            ordered=True,
+        )
+    )
+
+    assert [index for index, _, _ in results] == list(range(len(texts)))
+    for index, response, metadata in results:
+        if texts[index] == "bad":
+            assert response is None
+            assert "failed on bad" in metadata.error
+        else:
+            assert response.score == len(texts[index])
+            assert metadata.error is None
+
+
+def test_request_many_is_lazy(monkeypatch):
+    handler = FakeSentimentAnalysis(Provider.AWS)
+    task_handler = create_task_handler(monkeypatch, {Provider.AWS: handler})
+    pulled = 0
+
+    def bodies():
+        nonlocal pulled
+        while True:
+            pulled += 1
+            yield SentimentAnalysisRequest(text="text")
+
+    stream = task_handler.request_many(bodies(), concurrency=4)
+    for _ in range(10):
+        next(stream)
+    stream.close()
+
+    assert pulled <= 10 + 4
+
+
+def test_request_many_rejects_invalid_concurrency(monkeypatch):
+    handler = FakeSentimentAnalysis(Provider.AWS)
+    task_handler = create_task_handler(monkeypatch, {Provider.AWS: handler})
+
+    with pytest.raises(ValueError):
+        list(task_handler.request_many([], concurrency=0))
+
+
+def test_request_many_runs_items_on_its_own_pool(monkeypatch):
+    threads = set()
+
+    class RecordingSentimentAnalysis(FakeSentimentAnalysis):
+        def request(self, request):
+            threads.add(threading.current_thread().name)
+            return super().request(request)
+
+    handlers = {
+        Provider.AWS: RecordingSentimentAnalysis(Provider.AWS, fail_on={"hi"}),
+        Provider.AZURE: RecordingSentimentAnalysis(Provider.AZURE),
+    }
+    with create_task_handler(monkeypatch, handlers) as task_handler:
+        results = list(
+            task_handler.request_many(
+                (SentimentAnalysisRequest(text="hi") for _ in range(8)), concurrency=4
+            )
+        )
+
+        # items failed over from AWS to Azure without touching the provider pools
+        assert all(metadata.provider == Provider.AZURE for _, _, metadata in results)
+        assert all(name.startswith("supercontrast-stream") for name in threads)
+        assert task_handler._executors == {}
+
+
+# executors
+
+
+def test_evaluate_reuses_provider_executors(monkeypatch):
+    handlers = {
+        Provider.AWS: FakeSentimentAnalysis(Provider.AWS),
+        Provider.AZURE: FakeSentimentAnalysis(Provider.AZURE),
+    }
+    with create_task_handler(
+        monkeypatch, handlers, max_workers=2, provider_max_workers={Provider.AWS: 1}
+    ) as task_handler:
+        request = SentimentAnalysisRequest(text="text")
+        assert set(task_handler.evaluate(request)) == set(handlers)
+        executors = dict(task_handler._executors)
+        assert set(task_handler.evaluate(request)) == set(handlers)
+
+        assert task_handler._executors == executors
+        assert executors[Provider.AWS]._max_workers == 1
+        assert executors[Provider.AZURE]._max_workers == 2
+
+    with pytest.raises(RuntimeError):
+        task_handler.evaluate(request)
+
+
+# race
+
+
+def test_request_race_returns_first_success(monkeypatch):
+    handlers = {
+        Provider.AWS: FakeSentimentAnalysis(Provider.AWS, delay=0.5),
+        Provider.AZURE: FakeSentimentAnalysis(Provider.AZURE, delay=0.01),
+        Provider.GCP: FakeSentimentAnalysis(Provider.GCP, fail_on={"text"}),
+    }
+    with create_task_handler(monkeypatch, handlers) as task_handler:
+        response, metadata = task_handler.request(
+            SentimentAnalysisRequest(text="text"), mode=RequestMode.RACE
+        )
+
+    assert response.score == 4
+    assert metadata.provider == Provider.AZURE
+    assert metadata.latency < 0.5
+
+
+def test_request_race_raises_when_all_fail(monkeypatch):
+    handlers = {
+        Provider.AWS: FakeSentimentAnalysis(Provider.AWS, fail_on={"text"}),
+        Provider.AZURE: FakeSentimentAnalysis(Provider.AZURE, fail_on={"text"}),
+    }
+    with create_task_handler(monkeypatch, handlers) as task_handler:
+        with pytest.raises(RuntimeError):
+            task_handler.request(SentimentAnalysisRequest(text="text"), mode="race")
+
+
+# hedge
+
+
+def test_request_hedge_fires_backup_after_percentile(monkeypatch):
+    handlers = {
+        Provider.AWS: FakeSentimentAnalysis(Provider.AWS, delay=0.01),
+        Provider.AZURE: FakeSentimentAnalysis(Provider.AZURE, delay=0.01),
+    }
+    with create_task_handler(
+        monkeypatch, handlers, hedge_min_samples=5, hedge_budget=0.5
+    ) as task_handler:
+        request = SentimentAnalysisRequest(text="text")
+        for _ in range(5):
+            _, metadata = task_handler.request(request, mode=RequestMode.HEDGE)
+            assert not metadata.hedged
+
+        handlers[Provider.AWS].delay = 1.0
+        _, metadata = task_handler.request(request, mode=RequestMode.HEDGE)
+        assert metadata.hedged
+        assert metadata.provider == Provider.AZURE
+
+
+def test_request_hedge_respects_budget(monkeypatch):
+    handlers = {
+        Provider.AWS: FakeSentimentAnalysis(Provider.AWS, delay=0.01),
+        Provider.AZURE: FakeSentimentAnalysis(Provider.AZURE),
+    }
+    with create_task_handler(
+        monkeypatch, handlers, hedge_min_samples=1, hedge_budget=0
+    ) as task_handler:
+        request = SentimentAnalysisRequest(text="text")
+        task_handler.request(request, mode=RequestMode.HEDGE)
+
+        handlers[Provider.AWS].delay = 0.2
+        _, metadata = task_handler.request(request, mode=RequestMode.HEDGE)
+        assert not metadata.hedged
+        assert metadata.provider == Provider.AWS
+        assert handlers[Provider.AZURE].calls == 0
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_request_hedge_fails_over_before_the_hedge_delay(monkeypatch, is_async):
+    handlers = {
+        Provider.AWS: FakeSentimentAnalysis(Provider.AWS, delay=0.2, fail_on={"hi"}),
+        Provider.AZURE: FakeSentimentAnalysis(Provider.AZURE),
+    }
+    with create_task_handler(
+        monkeypatch, handlers, hedge_min_samples=1, hedge_budget=1
+    ) as task_handler:
+        task_handler.request(
+            SentimentAnalysisRequest(text="text"), provider=Provider.AWS
+        )
+
+        handlers[Provider.AWS].delay = 0.0
+        request = SentimentAnalysisRequest(text="hi")
+        if is_async:
+            _, metadata = asyncio.run(
+                task_handler.arequest(request, mode=RequestMode.HEDGE)
+            )
+        else:
+            _, metadata = task_handler.request(request, mode=RequestMode.HEDGE)
+
+    assert metadata.provider == Provider.AZURE
+    assert not metadata.hedged
+
+
+def test_request_hedge_uses_response_cache(monkeypatch):
+    handlers = {
+        Provider.AWS: FakeSentimentAnalysis(Provider.AWS),
+        Provider.AZURE: FakeSentimentAnalysis(Provider.AZURE),
+    }
+    with create_task_handler(monkeypatch, handlers, cache="memory") as task_handler:
+        request = SentimentAnalysisRequest(text="hi")
+        _, first = task_handler.request(request, mode=RequestMode.HEDGE)
+        _, second = task_handler.request(request, mode=RequestMode.HEDGE)
+
+    assert handlers[Provider.AWS].calls == 1
+    assert (first.cache_hit, second.cache_hit) == (False, True)
+
+
+def test_request_many_in_hedge_mode_does_not_exhaust_provider_pools(monkeypatch):
+    handlers = {
+        Provider.AWS: FakeSentimentAnalysis(Provider.AWS, delay=0.01),
+        Provider.AZURE: FakeSentimentAnalysis(Provider.AZURE, delay=0.01),
+    }
+    with create_task_handler(
+        monkeypatch,
+        handlers,
+        max_workers=2,
+        request_mode=RequestMode.HEDGE,
+        hedge_min_samples=1,
+        hedge_budget=1,
+    ) as task_handler:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(
+                lambda: list(
+                    task_handler.request_many(
+                        (SentimentAnalysisRequest(text="text") for _ in range(32)),
+                        concurrency=16,
+                    )
+                )
+            )
+            results = future.result(timeout=10)
+
+    assert len(results) == 32
+    assert all(metadata.error is None for _, _, metadata in results)
+
+
+# circuit breakers and failover
+
+
+def test_request_fails_over_and_opens_circuit(monkeypatch):
+    failing = FakeSentimentAnalysis(Provider.AWS, fail_on={"hi"})
+    healthy = FakeSentimentAnalysis(Provider.AZURE)
+    task_handler = create_task_handler(
+        monkeypatch,
+        {Provider.AWS: failing, Provider.AZURE: healthy},
+        circuit_failure_threshold=2,
+        circuit_recovery_timeout=60,
+    )
+
+    with task_handler:
+        for _ in range(3):
+            _, metadata = task_handler.request(SentimentAnalysisRequest(text="hi"))
+            assert metadata.provider == Provider.AZURE
+
+    # the breaker opened after two failures, so the third request skipped AWS
+    assert failing.calls == 2
+    assert task_handler.optimizer_handler.breakers[Provider.AWS].state == (
+        CircuitState.OPEN
+    )
+    with pytest.raises(CircuitOpenError):
+        task_handler.request(SentimentAnalysisRequest(text="hi"), provider=Provider.AWS)
+
+
+def test_circuit_breaker_half_open_probe_closes_it():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.acquire()
+    assert not breaker.acquire()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_circuit_breaker_reopens_after_a_lost_probe():
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=0.05, probe_timeout=0.05
+    )
+    breaker.record_failure()
+    time.sleep(0.05)
+
+    # the probe never reports back
+    assert breaker.acquire()
+    assert not breaker.is_available()
+    time.sleep(0.05)
+    assert breaker.state == CircuitState.OPEN
+    time.sleep(0.05)
+    assert breaker.acquire()
+
+
+def test_request_timeout_counts_as_failure(monkeypatch):
+    slow = FakeSentimentAnalysis(Provider.AWS, delay=0.5)
+    task_handler = create_task_handler(
+        monkeypatch, {Provider.AWS: slow}, request_timeout=0.05
+    )
+
+    with task_handler, pytest.raises(RuntimeError, match="timed out"):
+        task_handler.request(SentimentAnalysisRequest(text="hi"))
+    assert task_handler.optimizer_handler.stats[Provider.AWS].errors == 1
+
+
+def test_request_timeout_is_isolated_per_provider(monkeypatch):
+    hung = FakeSentimentAnalysis(Provider.AZURE, delay=1.0)
+    healthy = FakeSentimentAnalysis(Provider.GCP)
+    task_handler = create_task_handler(
+        monkeypatch,
+        {Provider.AZURE: hung, Provider.GCP: healthy},
+        max_workers=2,
+        request_timeout=0.2,
+        circuit_failure_threshold=100,
+    )
+
+    with task_handler, ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(
+            executor.map(
+                lambda _: task_handler.request(SentimentAnalysisRequest(text="hi")),
+                range(6),
+            )
+        )
+
+        assert all(metadata.provider == Provider.GCP for _, metadata in results)
+        assert healthy.calls == 6
+        assert task_handler.optimizer_handler.stats[Provider.GCP].errors == 0
+        # calls still queued behind the hung ones were cancelled, not sent late
+        time.sleep(1.0)
+        assert hung.calls == 2
+
+
+async def test_arequest_cancelled_on_rate_limiter_keeps_probe_slot(monkeypatch):
+    handler = FakeSentimentAnalysis(Provider.AWS)
+    task_handler = create_task_handler(
+        monkeypatch,
+        {Provider.AWS: handler},
+        rate_limits={Provider.AWS: 1},
+        circuit_failure_threshold=1,
+        circuit_recovery_timeout=0,
+    )
+    breaker = task_handler.optimizer_handler.breakers[Provider.AWS]
+    breaker.record_failure()
+
+    with task_handler:
+        # the first request spends the only token, the second waits a second
+        await task_handler.arequest(SentimentAnalysisRequest(text="hi"))
+        breaker.record_failure()
+        waiting = asyncio.create_task(
+            task_handler.arequest(SentimentAnalysisRequest(text="hi"))
+        )
+        await asyncio.sleep(0.1)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.half_open_calls == 0
+    assert task_handler.optimizer_handler.is_available(Provider.AWS)
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_provider_timeout_error_is_not_a_request_timeout(monkeypatch, is_async):
+    class TimingOutSentimentAnalysis(FakeSentimentAnalysis):
+        def request(self, request):
+            raise TimeoutError("read timed out")
+
+    task_handler = create_task_handler(
+        monkeypatch,
+        {Provider.AWS: TimingOutSentimentAnalysis(Provider.AWS)},
+        request_timeout=5,
+        rate_limits={Provider.AWS: 100},
+    )
+    errors = []
+    monkeypatch.setattr(
+        task_handler.rate_limiters[Provider.AWS], "record_error", errors.append
+    )
+    request = SentimentAnalysisRequest(text="hi")
+
+    with task_handler, pytest.raises(TimeoutError, match="read timed out"):
+        if is_async:
+            asyncio.run(task_handler.arequest(request, provider=Provider.AWS))
+        else:
+            task_handler.request(request, provider=Provider.AWS)
+    assert len(errors) == 1
+
+
+# response cache
+
+
+def test_request_uses_response_cache(monkeypatch):
+    handler = FakeSentimentAnalysis(Provider.AWS)
+    task_handler = create_task_handler(
+        monkeypatch, {Provider.AWS: handler}, cache="memory"
+    )
+
+    with task_handler:
+        first, first_metadata = task_handler.request(
+            SentimentAnalysisRequest(text="hi")
+        )
+        second, second_metadata = task_handler.request(
+            SentimentAnalysisRequest(text="hi")
+        )
+
+    assert handler.calls == 1
+    assert isinstance(second, SentimentAnalysisResponse)
+    assert second == first
+    assert first_metadata.cache_hit is False
+    assert second_metadata.cache_hit is True
+    assert (second_metadata.cache_hits, second_metadata.cache_misses) == (1, 1)
+
+
+# media materialization
+
+
+class FakeOCR(ProviderHandler):
+    def __init__(self, provider: Provider):
+        super().__init__(provider=provider, task=Task.OCR)
+        self.images = []
+
+    def request(self, request: OCRRequest) -> OCRResponse:
+        self.images.append(request.image)
+        return OCRResponse(all_text="text", bounding_boxes=[])
+
+    def get_name(self) -> str:
+        return f"Fake OCR - {self.provider}"
+
+    @classmethod
+    def init_from_env(cls, provider: Provider) -> "FakeOCR":
+        return cls(provider)
+
+
+def test_evaluate_loads_media_once(monkeypatch):
+    loads = []
+
+    def load_image_data(image):
+        loads.append(image)
+        return b"image bytes"
+
+    monkeypatch.setattr(media_module, "load_image_data", load_image_data)
+    handlers = {
+        provider: FakeOCR(provider) for provider in [Provider.AWS, Provider.GCP]
+    }
+    monkeypatch.setattr(
+        task_handler_module,
+        "provider_factory",
+        lambda task, provider, **config: handlers[provider],
+    )
+
+    with TaskHandler(Task.OCR, list(handlers)) as task_handler:
+        results = task_handler.evaluate(OCRRequest(image="https://example.com/a.png"))
+
+    assert set(results) == {Provider.AWS, Provider.GCP}
+    assert loads == ["https://example.com/a.png"]
+    assert all(handler.images == [b"image bytes"] for handler in handlers.values())
+    assert task_handler.media_registry.entries == {}
+
+
+def test_request_with_cache_loads_media_once(monkeypatch):
+    import supercontrast.cache.cache_utils as cache_utils_module
+
+    loads = []
+
+    def load_image_data(image):
+        loads.append(image)
+        return b"image bytes"
+
+    def get_shared_session():
+        raise AssertionError("the cache key should hash the loaded bytes")
+
+    monkeypatch.setattr(media_module, "load_image_data", load_image_data)
+    monkeypatch.setattr(cache_utils_module, "get_shared_session", get_shared_session)
+    handler = FakeOCR(Provider.AWS)
+    monkeypatch.setattr(
+        task_handler_module,
+        "provider_factory",
+        lambda task, provider, **config: handler,
+    )
+
+    with TaskHandler(Task.OCR, [Provider.AWS], cache="memory") as task_handler:
+        request = OCRRequest(image="https://example.com/a.png")
+        _, miss = task_handler.request(request)
+        _, hit = task_handler.request(request)
+
+    assert not miss.cache_hit and hit.cache_hit
+    assert loads == ["https://example.com/a.png"] * 2
+    assert handler.images == [b"image bytes"]
+
+
+# single-flight
+
+
+def test_request_coalesces_identical_in_flight_requests(monkeypatch):
+    handler = FakeSentimentAnalysis(Provider.AWS, delay=0.2)
+    task_handler = create_task_handler(
+        monkeypatch, {Provider.AWS: handler}, coalesce_requests=True
+    )
+
+    with task_handler, ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(task_handler.request, SentimentAnalysisRequest(text="hi"))
+            for _ in range(4)
+        ]
+        results = [future.result() for future in futures]
+
+    assert handler.calls == 1
+    assert all(response.score == 2.0 for response, _ in results)
+    assert sorted(bool(metadata.shared) for _, metadata in results) == [
+        False,
+        True,
+        True,
+        True,
+    ]
+
+
+async def test_arequest_coalescing_survives_a_cancelled_leader(monkeypatch):
+    handler = FakeSentimentAnalysis(Provider.AWS, delay=0.2)
+    task_handler = create_task_handler(
+        monkeypatch, {Provider.AWS: handler}, coalesce_requests=True
+    )
+
+    with task_handler:
+        request = SentimentAnalysisRequest(text="hi")
+        leader = asyncio.create_task(task_handler.arequest(request))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(task_handler.arequest(request))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+
+        response, metadata = await follower
+
+    assert leader.cancelled()
+    assert response.score == 2.0
+    assert metadata.shared
+    assert handler.calls == 1
+
+
+# chunking
+
+
+class FakeTranslation(ProviderHandler):
+    max_request_bytes = 40
+
+    def __init__(self, provider: Provider, delay: float = 0.0):
+        super().__init__(provider=provider, task=Task.TRANSLATION)
+        self.delay = delay
+        self.texts = []
+
+    def request(self, request: TranslationRequest) -> TranslationResponse:
+        assert len(request.text.encode("utf-8")) <= self.max_request_bytes
+        self.texts.append(request.text)
+        time.sleep(self.delay)
+        return TranslationResponse(text=request.text.upper())
+
+    def get_name(self) -> str:
+        return f"Fake Translation - {self.provider}"
+
+    @classmethod
+    def init_from_env(cls, provider: Provider) -> "FakeTranslation":
+        return cls(provider)
+
+
+LONG_TEXT = (
+    "The first sentence is here. The second one follows it!\n\n"
+    "A new paragraph starts. It has two sentences.\n"
+    "And a final line without punctuation"
+)
+
+
+def create_translation_handler(monkeypatch, handler, **config) -> TaskHandler:
+    monkeypatch.setattr(
+        task_handler_module,
+        "provider_factory",
+        lambda task, provider, **config: handler,
+    )
+    return TaskHandler(Task.TRANSLATION, [handler.provider], **config)
+
+
+def test_request_chunks_long_text_in_parallel(monkeypatch):
+    handler = FakeTranslation(Provider.AWS, delay=0.2)
+
+    with create_translation_handler(monkeypatch, handler) as task_handler:
+        start_time = time.time()
+        response, metadata = task_handler.request(TranslationRequest(text=LONG_TEXT))
+        elapsed = time.time() - start_time
+
+    assert response.text == LONG_TEXT.upper()
+    assert len(handler.texts) == 5
+    assert all(text == text.strip() for text in handler.texts)
+    assert elapsed < 0.2 * len(handler.texts) / 2
+
+
+async def test_arequest_chunks_long_text(monkeypatch):
+    handler = FakeTranslation(Provider.AWS)
+
+    with create_translation_handler(monkeypatch, handler) as task_handler:
+        response, _ = await task_handler.arequest(TranslationRequest(text=LONG_TEXT))
+
+    assert response.text == LONG_TEXT.upper()
+    assert len(handler.texts) == 5
+
+
+def test_request_chunking_can_be_disabled(monkeypatch):
+    handler = FakeTranslation(Provider.AWS)
+    handler.max_request_bytes = len(LONG_TEXT)
+
+    with create_translation_handler(
+        monkeypatch, handler, chunk_long_inputs=False
+    ) as task_handler:
+        task_handler.request(TranslationRequest(text=LONG_TEXT))
+
+    assert handler.texts == [LONG_TEXT]
+
+
+def test_cache_key_depends_on_chunking(monkeypatch):
+    handler = FakeTranslation(Provider.AWS)
+    body = TranslationRequest(text=LONG_TEXT)
+    keys = set()
+    for chunk_long_inputs in [True, False]:
+        with create_translation_handler(
+            monkeypatch, handler, cache="memory", chunk_long_inputs=chunk_long_inputs
+        ) as task_handler:
+            keys.add(task_handler._get_cache_key(Provider.AWS, body))
+
+    assert len(keys) == 2
+
+
+def test_cache_hits_do_not_record_quality_again(monkeypatch):
+    handler = FakeTranslation(Provider.AWS)
+    body = TranslationRequest(text="hello")
+    reference = TranslationResponse(text="HELLO")
+
+    with create_translation_handler(
+        monkeypatch, handler, cache="memory", metrics=[Metric.CHRF]
+    ) as task_handler:
+        for _ in range(3):
+            _, metadata = task_handler.request(body, reference=reference)
+        stats = task_handler.optimizer_handler.stats[Provider.AWS]
+
+    assert metadata.cache_hit is True
+    assert Metric.CHRF in metadata.metrics
+    assert stats.quality_samples == 1
+
+
+class FakeBatchSentimentAnalysis(FakeSentimentAnalysis):
+    max_batch_size = 2
+    max_request_bytes = 20
+
+    def __init__(self, provider: Provider):
+        super().__init__(provider)
+        self.batches = []
+
+    def request(self, request: SentimentAnalysisRequest) -> SentimentAnalysisResponse:
+        return self.batch_request([request])[0]
+
+    def batch_request(self, requests):
+        self.batches.append([request.text for request in requests])
+        return [
+            SentimentAnalysisResponse(score=1.0 if "good" in request.text else -1.0)
+            for request in requests
+        ]
+
+
+def test_request_scores_long_sentiment_in_batched_chunks(monkeypatch):
+    handler = FakeBatchSentimentAnalysis(Provider.AWS)
+    task_handler = create_task_handler(
+        monkeypatch, {Provider.AWS: handler}, chunk_scores=True
+    )
+    text = "This is good stuff. Very good again. Bad. Really quite bad."
+
+    with task_handler:
+        response, _ = task_handler.request(SentimentAnalysisRequest(text=text))
+
+    assert handler.batches == [
+        ["This is good stuff.", "Very good again."],
+        ["Bad.", "Really quite bad."],
+    ]
+    assert response.chunk_scores == [1.0, 1.0, -1.0, -1.0]
+    # weighted by chunk length: (19 + 16 - 4 - 17) / 56
+    assert response.score == pytest.approx(14 / 56)
+
+
+async def test_arequest_scores_long_sentiment_in_batched_chunks(monkeypatch):
+    handler = FakeBatchSentimentAnalysis(Provider.AWS)
+    task_handler = create_task_handler(monkeypatch, {Provider.AWS: handler})
+
+    with task_handler:
+        response, _ = await task_handler.arequest(
+            SentimentAnalysisRequest(text="This is good stuff. Bad.")
+        )
+
+    assert handler.batches == [["This is good stuff.", "Bad."]]
+    assert response.chunk_scores is None
+    assert response.score == pytest.approx((19 - 4) / 23)
+
+
+# batch coalescing
+
+
+def test_request_coalesces_concurrent_requests_into_batches(monkeypatch):
+    handler = FakeBatchSentimentAnalysis(Provider.AWS)
+    handler.max_batch_size = 4
+    task_handler = create_task_handler(
+        monkeypatch, {Provider.AWS: handler}, coalesce_batches=True, batch_window=0.1
+    )
+    texts = ["good", "bad", "good day", "bad day", "so good", "so bad"]
+
+    with task_handler, ThreadPoolExecutor(max_workers=len(texts)) as executor:
+        results = list(
+            executor.map(
+                lambda text: task_handler.request(SentimentAnalysisRequest(text=text)),
+                texts,
+            )
+        )
+
+    assert [response.score for response, _ in results] == [1.0, -1.0] * 3
+    assert sorted(len(batch) for batch in handler.batches) == [2, 4]
+    assert task_handler.optimizer_handler.stats[Provider.AWS].requests == 2
+
+
+def test_batch_coalescer_fails_every_caller_of_a_failed_batch():
+    from supercontrast.utils.batch_coalescer import BatchCoalescer
+
+    def call_batch(items):
+        raise ValueError("batch failed")
+
+    coalescer = BatchCoalescer(call_batch, max_batch_size=4, max_wait=0.05)
+    futures = [coalescer.submit(item) for item in range(3)]
+    coalescer.close()
+
+    assert coalescer.batches == 1
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result()
+
+
+def test_batch_coalescer_falls_back_to_single_calls():
+    from supercontrast.utils.batch_coalescer import BatchCoalescer
+
+    def call_batch(items):
+        if "bad" in items:
+            raise ValueError("batch failed")
+        return [item.upper() for item in items]
+
+    def call_single(item):
+        if item == "bad":
+            raise ValueError("bad item")
+        return item.upper()
+
+    coalescer = BatchCoalescer(
+        call_batch, max_batch_size=4, call_single=call_single, max_wait=0.05
+    )
+    futures = [coalescer.submit(item) for item in ["a", "bad", "c"]]
+    coalescer.close()
+
+    assert futures[0].result() == "A" and futures[2].result() == "C"
+    with pytest.raises(ValueError, match="bad item"):
+        futures[1].result()
+
+
+async def test_batch_coalescer_survives_a_cancelled_caller():
+    from supercontrast.utils.batch_coalescer import BatchCoalescer
+
+    batches = []
+
+    def call_batch(items):
+        batches.append(items)
+        time.sleep(0.1)
+        return [item.upper() for item in items]
+
+    coalescer = BatchCoalescer(call_batch, max_batch_size=4, max_wait=0.05)
+    queued = asyncio.ensure_future(asyncio.wrap_future(coalescer.submit("x")))
+    queued.cancel()
+    # the cancellation reaches the coalescer's future on the next loop iteration
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.ensure_future(asyncio.wrap_future(coalescer.submit(item)))
+        for item in "abc"
+    ]
+    await asyncio.sleep(0.1)
+    # cancelled while its batch is in flight
+    tasks[0].cancel()
+
+    assert await asyncio.gather(*tasks[1:]) == ["B", "C"]
+    coalescer.close()
+    # the item cancelled while queued was never sent
+    assert batches == [["a", "b", "c"]]
+
+
+# batch requests
+
+
+def test_batch_request_limits_and_records_every_provider_call(monkeypatch):
+    handlers = {
+        Provider.AWS: FakeBatchSentimentAnalysis(Provider.AWS),
+        Provider.MODERNMT: FakeSentimentAnalysis(Provider.MODERNMT),
+    }
+    task_handler = create_task_handler(
+        monkeypatch, handlers, rate_limits={Provider.AWS: 5, Provider.MODERNMT: 5}
+    )
+    acquired = {provider: 0 for provider in handlers}
+    for provider, rate_limiter in task_handler.rate_limiters.items():
+        monkeypatch.setattr(
+            rate_limiter,
+            "acquire",
+            lambda provider=provider: acquired.__setitem__(
+                provider, acquired[provider] + 1
+            ),
+        )
+    bodies = [SentimentAnalysisRequest(text=text) for text in ["good", "bad"] * 3]
+
+    with task_handler:
+        for provider in handlers:
+            results = task_handler.batch_request(bodies, provider=provider)
+            assert len(results) == len(bodies)
+
+    # the batch handler sends pairs, the other one every body on its own
+    assert handlers[Provider.AWS].batches == [["good", "bad"]] * 3
+    assert acquired == {Provider.AWS: 3, Provider.MODERNMT: 6}
+    stats = task_handler.optimizer_handler.stats
+    assert stats[Provider.AWS].requests == 3
+    assert stats[Provider.MODERNMT].requests == 6
+    # only single calls feed the latency window
+    assert stats[Provider.AWS].samples == 0
+    assert stats[Provider.MODERNMT].samples == 6
+
+
+def test_batch_request_reports_failed_items(monkeypatch):
+    class FailingBatchSentimentAnalysis(FakeBatchSentimentAnalysis):
+        def batch_request(self, requests):
+            if any(request.text == "bad" for request in requests):
+                raise ValueError("bad document")
+            return super().batch_request(requests)
+
+    handler = FailingBatchSentimentAnalysis(Provider.AWS)
+    bodies = [SentimentAnalysisRequest(text=text) for text in ["good", "bad", "good"]]
+
+    with create_task_handler(monkeypatch, {Provider.AWS: handler}) as task_handler:
+        results = task_handler.batch_request(bodies)
+
+    assert results[0][0].score == 1.0 and results[2][0].score == 1.0
+    assert results[1][0] is None
+    assert "bad document" in results[1][1].error
+    # the failed pair was resent one by one, the last batch went through as is
+    assert handler.batches == [["good"], ["good"]]
+
+
+# closing
+
+
+async def test_task_handler_aclose_closes_provider_clients(monkeypatch):
+    from supercontrast.utils.http import create_async_client, create_session
+
+    handler = FakeSentimentAnalysis(Provider.AWS)
+    handler.session = create_session()
+    handler.async_client = create_async_client()
+    closed = []
+    monkeypatch.setattr(handler.session, "close", lambda: closed.append("session"))
+
+    async with create_task_handler(monkeypatch, {Provider.AWS: handler}):
+        client = handler.async_client.get()
+
+    assert client.is_closed
+    assert closed == ["session"]
@@ -214,3 +214,32 @@ def test_translate_evaluate():
         print_request_response_and_metadata(
             Task.TRANSLATION, request, response, metadata
         )
+
+
+def test_translate_gcp_batch_request_respects_character_limit():
+    from google.auth.credentials import AnonymousCredentials
+
+    from supercontrast.provider.handlers.gcp_handler import GCPTranslation
+
+    class StubClient:
+        def __init__(self):
+            self.calls = []
+
+        def translate(self, values, source_language, target_language):
+            self.calls.append(values)
+            return [{"translatedText": value.upper()} for value in values]
+
+    handler = GCPTranslation(AnonymousCredentials(), "en", "fr")
+    handler.client = StubClient()
+    texts = ["a" * 2000, "b" * 2000, "c" * 2000, "d" * 6000] + list("efg")
+
+    responses = handler.batch_request([TranslationRequest(text=text) for text in texts])
+
+    assert [response.text for response in responses] == [text.upper() for text in texts]
+    # at most 5000 characters per call, an oversized text goes on its own
+    assert [len(values) for values in handler.client.calls] == [2, 1, 1, 3]
+    assert all(
+        sum(map(len, values)) <= 5000
+        for values in handler.client.calls
+        if len(values) > 1
+    )